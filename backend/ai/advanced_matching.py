@@ -4,8 +4,54 @@ Uses machine learning to find the best donor matches based on multiple factors
 Final Year Project Enhancement
 """
 
+import heapq
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
+
+from ai.geo import haversine_km
+
+# Donor group -> recipient groups it can give to
+BLOOD_COMPATIBILITY = {
+    'O+': ['O+', 'A+', 'B+', 'AB+'],
+    'O-': ['O-', 'O+', 'A-', 'A+', 'B-', 'B+', 'AB-', 'AB+'],
+    'A+': ['A+', 'AB+'],
+    'A-': ['A-', 'A+', 'AB-', 'AB+'],
+    'B+': ['B+', 'AB+'],
+    'B-': ['B-', 'B+', 'AB-', 'AB+'],
+    'AB+': ['AB+'],
+    'AB-': ['AB-', 'AB+']
+}
+
+# Recipient group -> donor groups it can receive from (BLOOD_COMPATIBILITY inverted)
+RECIPIENT_COMPATIBILITY = {
+    'O-': ['O-'],
+    'O+': ['O+', 'O-'],
+    'A-': ['A-', 'O-'],
+    'A+': ['A+', 'A-', 'O+', 'O-'],
+    'B-': ['B-', 'O-'],
+    'B+': ['B+', 'B-', 'O+', 'O-'],
+    'AB-': ['AB-', 'A-', 'B-', 'O-'],
+    'AB+': ['AB+', 'AB-', 'A+', 'A-', 'B+', 'B-', 'O+', 'O-']
+}
+
+# Order of the packed component vector carried by compact matches
+COMPONENT_KEYS = (
+    'blood_compatibility',
+    'genetic_compatibility',
+    'geographic_proximity',
+    'health_status',
+    'organ_match',
+    'urgency_factor',
+)
+
+
+def compatible_donor_groups(recipient_blood: str) -> List[str]:
+    """
+    Donor blood groups that blood_compatibility_score rates above zero
+    for this recipient; used to pre-filter candidates in the database.
+    """
+    return list(RECIPIENT_COMPATIBILITY.get(recipient_blood, [recipient_blood]))
+
 
 class AdvancedDonorMatcher:
     """
@@ -20,17 +66,13 @@ class AdvancedDonorMatcher:
     - Historical match success
     """
 
-    def __init__(self):
-        self.blood_compatibility = {
-            'O+': ['O+', 'A+', 'B+', 'AB+'],
-            'O-': ['O-', 'O+', 'A-', 'A+', 'B-', 'B+', 'AB-', 'AB+'],
-            'A+': ['A+', 'AB+'],
-            'A-': ['A-', 'A+', 'AB-', 'AB+'],
-            'B+': ['B+', 'AB+'],
-            'B-': ['B-', 'B+', 'AB-', 'AB+'],
-            'AB+': ['AB+'],
-            'AB-': ['AB-', 'AB+']
-        }
+    def __init__(self, parallel_threshold: int = 0, parallel_workers: int = 0):
+        # Pools with at least `parallel_threshold` donors are scored across
+        # `parallel_workers` processes (see ai.parallel_matching).
+        self.parallel_threshold = parallel_threshold
+        self.parallel_workers = parallel_workers
+
+        self.blood_compatibility = RECIPIENT_COMPATIBILITY
         
         # Organ compatibility scoring
         self.organ_compatibility = {
@@ -90,16 +132,37 @@ class AdvancedDonorMatcher:
         }
         return urgency_weights.get(urgency.lower(), 0.7)
 
-    def calculate_geographic_proximity(self, donor_location: str, recipient_location: str) -> float:
+    def calculate_geographic_proximity(
+        self,
+        donor_location: str,
+        recipient_location: str,
+        distance_km: Optional[float] = None
+    ) -> float:
         """
         Geographic proximity scoring
-        Same city = 1.0, different = 0.5
-        In production: use geolocation API
+        With coordinates: within 25 km = 1.0, decaying to a 0.3 floor
+        Without: same city = 1.0, different = 0.6
         """
-        if donor_location.lower() == recipient_location.lower():
+        if distance_km is not None:
+            if distance_km <= 25:
+                return 1.0
+            return max(0.3, 1.0 - (distance_km - 25) / 2000)
+
+        if (donor_location or '').lower() == (recipient_location or '').lower():
             return 1.0
         return 0.6
 
+    def _distance_km(self, donor: Dict, recipient: Dict) -> Optional[float]:
+        """Distance between geocoded donor and recipient, if both are known."""
+        if donor.get('distance_km') is not None:
+            return donor['distance_km']
+        if donor.get('latitude') is None or recipient.get('latitude') is None:
+            return None
+        return haversine_km(
+            (donor['latitude'], donor['longitude']),
+            (recipient['latitude'], recipient['longitude'])
+        )
+
     def calculate_overall_match_score(
         self, 
         donor: Dict, 
@@ -113,6 +176,20 @@ class AdvancedDonorMatcher:
         Returns:
             Tuple of (overall_score, breakdown_dict)
         """
+        overall_score, components = self.score_components(donor, recipient, urgency)
+        return overall_score, breakdown_from_components(overall_score, components)
+
+    def score_components(
+        self,
+        donor: Dict,
+        recipient: Dict,
+        urgency: str = 'medium'
+    ) -> Tuple[float, Tuple[float, ...]]:
+        """
+        Overall score plus the raw factor values, in COMPONENT_KEYS order.
+        Ranking works on this tuple; the breakdown dict is only built for
+        matches that are actually explained.
+        """
         
         # Blood compatibility (40% weight)
         blood_score = self.blood_compatibility_score(
@@ -128,7 +205,8 @@ class AdvancedDonorMatcher:
         # Geographic proximity (15% weight)
         location_score = self.calculate_geographic_proximity(
             donor.get('location', ''),
-            recipient.get('location', '')
+            recipient.get('location', ''),
+            self._distance_km(donor, recipient)
         )
         location_weight = 0.15
         
@@ -155,60 +233,157 @@ class AdvancedDonorMatcher:
         # Apply urgency threshold
         urgency_factor = self.calculate_urgency_factor(urgency)
         
-        breakdown = {
-            'blood_compatibility': round(blood_score, 3),
-            'genetic_compatibility': round(genetic_score, 3),
-            'geographic_proximity': round(location_score, 3),
-            'health_status': round(health_score, 3),
-            'organ_match': round(organ_score, 3),
-            'urgency_factor': round(urgency_factor, 3),
-            'overall_score': round(overall_score, 3),
-            'meets_urgency_threshold': overall_score >= urgency_factor,
-            'confidence': 'High' if overall_score > 0.8 else 'Medium' if overall_score > 0.6 else 'Low'
-        }
-        
-        return overall_score, breakdown
+        return overall_score, (
+            blood_score, genetic_score, location_score,
+            health_score, organ_score, urgency_factor
+        )
 
     def rank_donor_matches(
         self,
         donors: List[Dict],
         recipient: Dict,
         urgency: str = 'medium',
-        limit: int = 10
+        limit: int = 10,
+        compact: bool = False
     ) -> List[Dict]:
         """
         Rank all available donors by match score
         Returns top matches sorted by score
+        With compact=True each match is only donor id, score and the packed
+        component vector; expand it later with explain_match.
         """
-        matches = []
-        
-        for donor in donors:
+        if self._use_parallel(donors):
+            from ai.parallel_matching import rank_candidates_parallel
+            candidates = rank_candidates_parallel(
+                donors, recipient, urgency, limit, self.parallel_workers
+            )
+        else:
+            candidates = self.top_candidates(donors, recipient, urgency, limit)
+
+        return [
+            self._build_match(donor, score, components, compact)
+            for score, _, components, donor in candidates
+        ]
+
+    def iter_ranking_snapshots(
+        self,
+        donors: List[Dict],
+        recipient: Dict,
+        urgency: str = 'medium',
+        limit: int = 10,
+        first_partition: int = 500,
+        max_partition: int = 5000,
+        compact: bool = False
+    ) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Rank donors progressively, yielding (processed_count, top_matches)
+        after each partition. Partitions start small and double, so the
+        first snapshot is cheap; the last snapshot equals rank_donor_matches.
+        """
+        best: List[Tuple[float, int, Tuple[float, ...], Dict]] = []
+        processed = 0
+        size = first_partition
+
+        if self._use_parallel(donors):
+            from ai.parallel_matching import iter_candidates_parallel
+            partitions = iter_candidates_parallel(
+                donors, recipient, urgency, limit, self.parallel_workers
+            )
+        else:
+            partitions = self._iter_partitions(donors, recipient, urgency, limit, size, max_partition)
+
+        for partition_size, local_best in partitions:
+            processed += partition_size
+            best = heapq.nlargest(limit, best + local_best, key=_candidate_rank)
+            yield processed, [
+                self._build_match(donor, score, components, compact)
+                for score, _, components, donor in best
+            ]
+
+        if not processed:
+            yield 0, []
+
+    def _iter_partitions(self, donors, recipient, urgency, limit, size, max_partition):
+        start = 0
+        while start < len(donors):
+            partition = donors[start:start + size]
+            yield len(partition), self.top_candidates(partition, recipient, urgency, limit, start)
+            start += size
+            size = min(size * 2, max_partition)
+
+    def top_candidates(
+        self,
+        donors: List[Dict],
+        recipient: Dict,
+        urgency: str = 'medium',
+        limit: int = 10,
+        index_base: int = 0
+    ) -> List[Tuple[float, int, Tuple[float, ...], Dict]]:
+        """
+        Score a donor partition and keep only its local top-k
+        Returns (score, position, components, donor) tuples, best first.
+        Ties keep pool order, so merged partitions rank like a single pass.
+        """
+        scored = []
+        for position, donor in enumerate(donors, start=index_base):
             # STRICT FILTER: Only consider available donors
             if not donor.get('availability', True):
-                 continue
+                continue
 
-            score, breakdown = self.calculate_overall_match_score(
+            score, components = self.score_components(
                 donor, recipient, urgency
             )
-            
-            if score > 0:  # Only include compatible donors
-                match_result = {
-                    'donor_id': donor.get('id'),
-                    'donor_name': donor.get('name', 'Unknown'),
-                    'blood_group': donor.get('blood_group'),
-                    'organ': donor.get('organ'),
-                    'location': donor.get('location'),
-                    'match_score': score,
-                    'breakdown': breakdown,
-                    'match_timestamp': datetime.now().isoformat(),
-                    'recommendation': self._get_recommendation(score, breakdown)
-                }
-                matches.append(match_result)
-        
-        # Sort by match score (descending)
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
-        
-        return matches[:limit]
+
+            # Only include blood-compatible donors; the other factors never
+            # outweigh an incompatible group
+            if components[0] > 0 and score > 0:
+                scored.append((score, position, components, donor))
+
+        return heapq.nlargest(limit, scored, key=_candidate_rank)
+
+    def _use_parallel(self, donors: List[Dict]) -> bool:
+        return (
+            self.parallel_workers > 1
+            and self.parallel_threshold > 0
+            and len(donors) >= self.parallel_threshold
+        )
+
+    def _build_match(
+        self,
+        donor: Dict,
+        score: float,
+        components: Tuple[float, ...],
+        compact: bool = False
+    ) -> Dict:
+        match = {
+            'donor_id': donor.get('id'),
+            'match_score': round(score, 4) if compact else score,
+            'components': [round(c, 3) for c in components],
+        }
+        return match if compact else self.explain_match(match, donor)
+
+    def explain_match(self, match: Dict, donor: Optional[Dict] = None) -> Dict:
+        """
+        Expand a compact match into the full explained form
+        (donor details, breakdown and recommendation). Matches that
+        already carry a breakdown are returned unchanged.
+        """
+        if 'breakdown' in match or 'components' not in match:
+            return match
+        donor = donor or {}
+        score = match['match_score']
+        breakdown = breakdown_from_components(score, match['components'])
+        return {
+            'donor_id': match.get('donor_id'),
+            'donor_name': donor.get('name') or _full_name(donor) or 'Unknown',
+            'blood_group': donor.get('blood_group'),
+            'organ': donor.get('organ'),
+            'location': donor.get('location') or donor.get('address'),
+            'match_score': score,
+            'breakdown': breakdown,
+            'match_timestamp': match.get('match_timestamp') or datetime.now().isoformat(),
+            'recommendation': self._get_recommendation(score, breakdown)
+        }
 
     def _get_recommendation(self, score: float, breakdown: Dict) -> str:
         """
@@ -266,6 +441,27 @@ class AdvancedDonorMatcher:
         return risks if risks else ["No major risk factors identified"]
 
 
+def breakdown_from_components(score: float, components) -> Dict:
+    """Render the explained breakdown dict from a packed component vector."""
+    breakdown = {key: round(value, 3) for key, value in zip(COMPONENT_KEYS, components)}
+    urgency_factor = breakdown['urgency_factor']
+    breakdown.update({
+        'overall_score': round(score, 3),
+        'meets_urgency_threshold': score >= urgency_factor,
+        'confidence': 'High' if score > 0.8 else 'Medium' if score > 0.6 else 'Low'
+    })
+    return breakdown
+
+
+def _full_name(donor: Dict) -> str:
+    return f"{donor.get('first_name', '')} {donor.get('last_name', '')}".strip()
+
+
+def _candidate_rank(candidate: Tuple[float, int, Tuple[float, ...], Dict]) -> Tuple[float, int]:
+    # Highest score first; among equal scores the earlier pool position wins
+    return candidate[0], -candidate[1]
+
+
 # Utility function for quick matching
 def quick_match(donors: List[Dict], recipient: Dict, urgency: str = 'high') -> List[Dict]:
     """
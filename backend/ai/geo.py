@@ -0,0 +1,103 @@
+"""
+Offline geocoding and distance helpers for proximity matching
+Resolves free-text addresses against a bundled city/pincode gazetteer
+and bounds radius queries for the donor candidate search
+"""
+
+import json
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+GAZETTEER_FILE = Path(__file__).parent / "data" / "gazetteer.json"
+EARTH_RADIUS_KM = 6371.0088
+
+Coordinates = Tuple[float, float]
+
+_PINCODE_RE = re.compile(r"\b(\d{3})\s?\d{3}\b")
+
+
+class Gazetteer:
+    """City names, aliases and pincode prefixes mapped to coordinates."""
+
+    def __init__(self, cities: List[Dict]):
+        self.cities: List[Tuple[str, Coordinates]] = []
+        self.by_name: Dict[str, Coordinates] = {}
+        self.by_pincode_prefix: Dict[str, Coordinates] = {}
+        for city in cities:
+            coords = (city["lat"], city["lon"])
+            self.cities.append((city["name"], coords))
+            for name in [city["name"], *city.get("aliases", [])]:
+                self.by_name[name.lower()] = coords
+            for prefix in city.get("pincode_prefixes", []):
+                self.by_pincode_prefix[prefix] = coords
+
+        # Longest names first so "navi mumbai" wins over "mumbai"
+        names = sorted(self.by_name, key=len, reverse=True)
+        self._name_re = re.compile(r"\b(" + "|".join(re.escape(n) for n in names) + r")\b")
+
+    @classmethod
+    def load(cls, path: Path = GAZETTEER_FILE) -> "Gazetteer":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f)["cities"])
+
+    def geocode(self, text: Optional[str]) -> Optional[Coordinates]:
+        """
+        Resolve an address to coordinates
+        A 6-digit pincode takes precedence; otherwise the last city name
+        mentioned wins, since Indian addresses end with the city.
+        """
+        if not text:
+            return None
+
+        for match in _PINCODE_RE.finditer(text):
+            coords = self.by_pincode_prefix.get(match.group(1))
+            if coords:
+                return coords
+
+        matches = self._name_re.findall(text.lower())
+        if matches:
+            return self.by_name[matches[-1]]
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    return Gazetteer.load()
+
+
+def geocode(text: Optional[str]) -> Optional[Coordinates]:
+    """Geocode an address with the bundled gazetteer."""
+    return get_gazetteer().geocode(text)
+
+
+def haversine_km(a: Coordinates, b: Coordinates) -> float:
+    """Great-circle distance between two (lat, lon) points in kilometres."""
+    lat1, lon1 = map(math.radians, a)
+    lat2, lon2 = map(math.radians, b)
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def bounding_box(center: Coordinates, radius_km: float) -> Tuple[Coordinates, Coordinates]:
+    """
+    ((min_lat, min_lon), (max_lat, max_lon)) enclosing every point within
+    radius_km of center. The longitude span is None when the circle reaches
+    a pole or wraps the antimeridian.
+    """
+    lat, lon = center
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        return (max(min_lat, -90.0), None), (min(max_lat, 90.0), None)
+    # Widest longitude offset on the circle (at a latitude slightly poleward of center)
+    dlon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+    if lon - dlon < -180 or lon + dlon > 180:
+        return (min_lat, None), (max_lat, None)
+    return (min_lat, lon - dlon), (max_lat, lon + dlon)
@@ -1,15 +1,63 @@
-from typing import List
+from typing import List, Optional
 from models.request import DonationRequest
-from models.donor import Donor
 from core.db_instance import get_collection
 from utils.serialization import serialize_doc
+from ai.advanced_matching import compatible_donor_groups
+from ai.geo import bounding_box
 
+# Compound indexes provisioned by database.init_db; the equality fields come
+# first and last_donation last, so the query below is served in index order
+# (walked backwards for the ascending sort) without an in-memory sort.
+ORGAN_CANDIDATE_INDEX = [("organs", 1), ("availability", 1), ("blood_group", 1), ("last_donation", -1)]
+BLOOD_CANDIDATE_INDEX = [("donate_blood", 1), ("availability", 1), ("blood_group", 1), ("last_donation", -1)]
 
-def match_donors(req: DonationRequest, max_results: int = 10) -> List[dict]:
-    """Simple rule-based matching engine."""
-    query = {"organ": req.organ}
+
+def candidate_query(req: DonationRequest) -> dict:
+    """Indexed filter for available, blood-compatible donors of the requested organ."""
+    if req.organ == "Whole Blood":
+        query = {"donate_blood": True, "availability": True}
+    else:
+        # 'organs' is a list, so this uses the multikey index
+        query = {"organs": req.organ, "availability": True}
     if getattr(req, "blood_group", None):
-        query["blood_group"] = req.blood_group
+        query["blood_group"] = {"$in": compatible_donor_groups(req.blood_group)}
+    return query
+
+
+def match_donors(req: DonationRequest, max_results: int = 10, radius_km: float = 0) -> List[dict]:
+    """
+    Simple rule-based matching engine.
+    Also serves as the tier-1 candidate generator for MatchingService:
+    a bounded, index-backed pre-filter ahead of AdvancedDonorMatcher scoring.
+
+    Donors who never gave or gave longest ago come first, as they are the
+    most likely to be eligible again. With radius_km and a geocoded request
+    only donors inside the radius' bounding box count towards max_results;
+    donors without coordinates fill the remaining places.
+    """
+    donors = get_collection("donors")
+    query = candidate_query(req)
+    box = _radius_filter(req, radius_km)
+    if box is None:
+        cursor = donors.find(query).sort("last_donation", 1).limit(max_results)
+        return [serialize_doc(d) for d in cursor]
+
+    nearby = [
+        serialize_doc(d)
+        for d in donors.find({**query, **box}).sort("last_donation", 1).limit(max_results)
+    ]
+    if len(nearby) < max_results:
+        unlocated = donors.find({**query, "latitude": None}).sort("last_donation", 1).limit(max_results - len(nearby))
+        nearby.extend(serialize_doc(d) for d in unlocated)
+    return nearby
+
 
-    cursor = get_collection("donors").find(query).sort("last_donation", -1).limit(max_results)
-    return [serialize_doc(d) for d in cursor]
+def _radius_filter(req: DonationRequest, radius_km: float) -> Optional[dict]:
+    """Latitude/longitude range covering radius_km around the request, if it has coordinates."""
+    if radius_km <= 0 or getattr(req, "latitude", None) is None:
+        return None
+    (min_lat, min_lon), (max_lat, max_lon) = bounding_box((req.latitude, req.longitude), radius_km)
+    box = {"latitude": {"$gte": min_lat, "$lte": max_lat}}
+    if min_lon is not None:
+        box["longitude"] = {"$gte": min_lon, "$lte": max_lon}
+    return box
@@ -0,0 +1,148 @@
+"""
+Parallel donor scoring for large donor pools
+Splits the pool into partitions scored by a persistent process pool
+
+The donor list is pickled once per ranking call into a shared memory block.
+Workers only receive the block name and their byte range, score their
+partition and send back a local top-k, which is merged here.
+"""
+
+import atexit
+import heapq
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+# Per-process matcher used inside pool workers
+_worker_matcher = None
+
+
+def get_executor(max_workers: int) -> ProcessPoolExecutor:
+    """Get (or lazily create) the shared process pool."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != max_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=max_workers)
+            _executor_workers = max_workers
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the shared process pool (called on interpreter exit)."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+            _executor_workers = 0
+
+
+atexit.register(shutdown_executor)
+
+
+def _score_shared_partition(
+    shm_name: str,
+    start: int,
+    end: int,
+    index_base: int,
+    recipient: Dict,
+    urgency: str,
+    limit: int
+) -> List[Tuple[float, int, Tuple[float, ...], Dict]]:
+    """Worker entry point: decode one partition from shared memory and score it."""
+    global _worker_matcher
+    if _worker_matcher is None:
+        from ai.advanced_matching import AdvancedDonorMatcher
+        _worker_matcher = AdvancedDonorMatcher()
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        with shm.buf[start:end] as view:
+            donors = pickle.loads(view)
+    finally:
+        shm.close()
+
+    return _worker_matcher.top_candidates(donors, recipient, urgency, limit, index_base)
+
+
+def rank_candidates_parallel(
+    donors: List[Dict],
+    recipient: Dict,
+    urgency: str,
+    limit: int,
+    workers: int
+) -> List[Tuple[float, int, Tuple[float, ...], Dict]]:
+    """
+    Score `donors` across `workers` processes and merge the local top-k lists.
+    Produces the same ranking as AdvancedDonorMatcher.top_candidates.
+    """
+    from ai.advanced_matching import _candidate_rank
+
+    merged = [
+        candidate
+        for _, local_best in iter_candidates_parallel(donors, recipient, urgency, limit, workers)
+        for candidate in local_best
+    ]
+    return heapq.nlargest(limit, merged, key=_candidate_rank)
+
+
+def iter_candidates_parallel(
+    donors: List[Dict],
+    recipient: Dict,
+    urgency: str,
+    limit: int,
+    workers: int
+) -> Iterator[Tuple[int, List[Tuple[float, int, Tuple[float, ...], Dict]]]]:
+    """
+    Yield (partition_size, local_top_k) for each partition as its worker finishes.
+    The shared memory block lives until the generator is exhausted or closed.
+    """
+    partition_size = -(-len(donors) // workers) if donors else 0
+    partitions = []
+    for index_base in range(0, len(donors), partition_size or 1):
+        payload = pickle.dumps(
+            donors[index_base:index_base + partition_size],
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+        count = min(partition_size, len(donors) - index_base)
+        partitions.append((index_base, count, payload))
+
+    total_size = sum(len(payload) for _, _, payload in partitions)
+    shm = shared_memory.SharedMemory(create=True, size=max(total_size, 1))
+    try:
+        ranges = []
+        offset = 0
+        for index_base, count, payload in partitions:
+            shm.buf[offset:offset + len(payload)] = payload
+            ranges.append((offset, offset + len(payload), index_base, count))
+            offset += len(payload)
+        del partitions
+
+        executor = get_executor(workers)
+        futures = {
+            executor.submit(
+                _score_shared_partition,
+                shm.name, start, end, index_base, recipient, urgency, limit
+            ): count
+            for start, end, index_base, count in ranges
+        }
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Partitions still running when the caller stops iterating must
+            # finish before the block is unlinked
+            for future in futures:
+                future.cancel()
+            wait(futures)
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,143 @@
+"""
+Admin dashboard benchmark
+
+Times AdminService.get_dashboard_summary over mock collections of growing
+size, next to the reads the dashboard used to make (every request loaded
+four times and every donor twice through get_all, which also stops at
+1000 documents):
+
+  - snapshot: get_dashboard_summary (counters plus $group queries)
+  - legacy:   the former get_all() calls alone, without building the summary
+
+    python -m benchmarks.bench_dashboard --sizes 1000 10000 100000
+
+Targets whose dependencies cannot be imported are reported as skipped.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_matching import git_commit, measure
+from benchmarks.synthetic import PopulationGenerator
+
+DEFAULT_SIZES = [1_000, 10_000, 50_000]
+
+
+def populate(size: int, seed: int) -> None:
+    """Mock collections with `size` donors and requests, size/100 hospitals and 3 matches per request."""
+    from bson import ObjectId
+    from core.db_instance import set_collection
+    from repositories.repository import RepositoryFactory
+    from utils.mock_db import MockCollection
+
+    generator = PopulationGenerator(seed=seed)
+    hospital_count = max(1, size // 100)
+    collections = {name: MockCollection(name) for name in ("donors", "requests", "hospitals", "matches", "stats_counters", "activity_rollups")}
+    for name, collection in collections.items():
+        set_collection(name, collection)
+
+    # Same fields as database.seed_mock_data, so the legacy target can validate them
+    collections["hospitals"].insert_many([
+        {
+            "_id": ObjectId(),
+            "hospital_name": f"City Care Hospital {i}",
+            "city": "Pune",
+            "contact_number": f"+91998877{i:04d}",
+            "email": f"hospital{i}@connectlife.com",
+            "address": f"{100 + i}, Medical Square, Pune",
+            "is_active": True
+        }
+        for i in range(hospital_count)
+    ])
+    collections["donors"].insert_many([
+        {**{k: v for k, v in d.items() if k != "id"}, "_id": ObjectId()}
+        for d in generator.donors(size)
+    ])
+    requests = []
+    for i, r in enumerate(generator.requests(size)):
+        requests.append({**{k: v for k, v in r.items() if k != "id"}, "_id": ObjectId(), "user_id": f"user_{i % hospital_count}"})
+    collections["requests"].insert_many(requests)
+    collections["matches"].insert_many([
+        {"request_id": str(r["_id"]), "donor_id": f"donor_{rank}", "match_score": generator.rng.uniform(40, 100), "rank": rank}
+        for r in requests for rank in range(3)
+    ])
+    # Counters are maintained on write; bulk inserts are counted once here
+    RepositoryFactory.get_counter_repository().reconcile()
+
+
+def bench_snapshot():
+    from services.admin_service import AdminService
+    service = AdminService()
+    return service.get_dashboard_summary
+
+
+def bench_legacy():
+    from repositories.repository import RepositoryFactory
+    donor_repo = RepositoryFactory.get_donor_repository()
+    request_repo = RepositoryFactory.get_request_repository()
+    hospital_repo = RepositoryFactory.get_hospital_repository()
+
+    def reads():
+        for _ in range(4):
+            request_repo.get_all()
+        for _ in range(2):
+            donor_repo.get_all()
+        hospital_repo.get_all()
+    return reads
+
+
+TARGETS = {
+    "snapshot": bench_snapshot,
+    "legacy": bench_legacy,
+}
+
+
+def run(args):
+    results = []
+    for size in args.sizes:
+        try:
+            populate(size, args.seed)
+        except ImportError as e:
+            print(f"size={size:<7} skipped: {e}")
+            results.append({"size": size, "skipped": str(e)})
+            continue
+        for target in args.targets:
+            try:
+                stats = measure(TARGETS[target](), args.repeat)
+            except ImportError as e:
+                results.append({"target": target, "size": size, "skipped": str(e)})
+                print(f"{target:<9} size={size:<7} skipped: {e}")
+                continue
+            stats.update({
+                "target": target,
+                "size": size,
+                "us_per_request": round(stats["median_ms"] * 1000 / size, 3),
+            })
+            results.append(stats)
+            print(f"{target:<9} size={size:<7} median={stats['median_ms']:>9.2f}ms "
+                  f"p95={stats['p95_ms']:>9.2f}ms peak={stats['peak_kib']:>10.1f}KiB "
+                  f"({stats['us_per_request']:.2f}us/request)")
+    return {"meta": {"commit": git_commit(), "seed": args.seed, "repeat": args.repeat}, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admin dashboard benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
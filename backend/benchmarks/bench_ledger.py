@@ -0,0 +1,87 @@
+"""
+Ledger append and verify throughput
+
+Compares JSON-hashed blocks (version 0) with the binary encoding
+(version 1) for single-event blocks and Merkle batches, in memory and on
+a segment file.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ledger --events 20000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ledger.local_ledger import LocalLedger
+
+
+def make_events(count: int, seed: int):
+    rng = random.Random(seed)
+    kinds = ["DONOR_REGISTRATION", "HOSPITAL_REQUEST", "MATCH_FOUND"]
+    return [
+        {
+            "event_type": rng.choice(kinds),
+            "entity_type": "Request",
+            "entity_id": f"{rng.getrandbits(96):024x}",
+            "action": "matched",
+            "details": {
+                "donor_id": f"{rng.getrandbits(96):024x}",
+                "compatibility_score": round(rng.random(), 4),
+            },
+        }
+        for _ in range(count)
+    ]
+
+
+def run_case(events, version: int, batch_max: int, persistent: bool):
+    directory = tempfile.mkdtemp(prefix="bench-ledger-") if persistent else None
+    ledger = LocalLedger(directory, batch_max=batch_max, batch_window_ms=1000, block_version=version)
+    try:
+        started = time.perf_counter()
+        for data in events:
+            ledger.append_entry(data, durable=False)
+        ledger.flush()
+        append_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        report = ledger.verify(full=True)
+        verify_s = time.perf_counter() - started
+        if not report["valid"]:
+            raise SystemExit(f"verification failed: {report}")
+        return append_s, verify_s, ledger.height
+    finally:
+        ledger.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=20_000)
+    parser.add_argument('--batch', type=int, default=64, help='events per Merkle batch')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    events = make_events(args.events, args.seed)
+    print(f"events={args.events}")
+    print(f"{'storage':<8}{'blocks':<8}{'encoding':<10}{'append ev/s':>14}{'verify ev/s':>14}{'height':>9}")
+    for persistent in (False, True):
+        for batch_max in (0, args.batch):
+            for version in (0, 1):
+                append_s, verify_s, height = run_case(events, version, batch_max, persistent)
+                print(
+                    f"{'file' if persistent else 'memory':<8}"
+                    f"{'batched' if batch_max else 'single':<8}"
+                    f"{'json' if version == 0 else 'binary':<10}"
+                    f"{args.events / append_s:>14,.0f}"
+                    f"{args.events / verify_s:>14,.0f}"
+                    f"{height:>9}"
+                )
+
+
+if __name__ == '__main__':
+    main()
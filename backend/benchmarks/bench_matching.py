@@ -0,0 +1,213 @@
+"""
+Matching engine benchmark suite
+
+Measures rank latency, throughput and peak memory for the three matching
+entry points over seeded synthetic populations:
+
+  - matcher:  AdvancedDonorMatcher.rank_donor_matches on in-memory dicts
+  - service:  MatchingService.find_matches_for_request over mock collections
+  - rules:    ai.matching.match_donors over a mock collection
+
+Results are written as JSON so two commits can be compared:
+
+    python -m benchmarks.bench_matching --output before.json
+    (check out another commit)
+    python -m benchmarks.bench_matching --output after.json --compare before.json
+
+Targets whose dependencies cannot be imported are reported as skipped.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai.advanced_matching import AdvancedDonorMatcher
+from benchmarks.synthetic import PopulationGenerator, to_matcher_dict
+
+DEFAULT_SIZES = [1_000, 10_000, 50_000]
+DEFAULT_LIMITS = [5, 10, 50]
+
+
+def measure(fn, repeat: int):
+    """Run fn `repeat` times after a warm-up, then once more under tracemalloc for peak memory."""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def bench_matcher(donors, recipient, limits, repeat):
+    matcher = AdvancedDonorMatcher()
+    pool = [to_matcher_dict(d) for d in donors]
+    for limit in limits:
+        stats = measure(
+            lambda: matcher.rank_donor_matches(pool, recipient, recipient["urgency"], limit), repeat
+        )
+        yield limit, stats
+
+
+def _mock_collections(donors, request_doc):
+    from core.db_instance import set_collection
+    from utils.mock_db import MockCollection
+
+    donors_col = MockCollection("donors")
+    for d in donors:
+        doc = {k: v for k, v in d.items() if k != "id"}
+        doc["_id"] = d["id"]
+        donors_col.insert_one(doc)
+    requests_col = MockCollection("requests")
+    requests_col.insert_one({**{k: v for k, v in request_doc.items() if k != "id"}, "_id": request_doc["id"]})
+    set_collection("donors", donors_col)
+    set_collection("requests", requests_col)
+
+
+def bench_service(donors, request_doc, limits, repeat):
+    from services.matching_service import MatchingService
+
+    _mock_collections(donors, request_doc)
+    service = MatchingService()
+    # The service always returns its own top 5; limit is not configurable
+    stats = measure(lambda: service.find_matches_for_request(request_doc["id"]), repeat)
+    yield 5, stats
+
+
+def bench_rules(donors, request_doc, limits, repeat):
+    from ai.matching import match_donors
+    from models.request import DonationRequest
+
+    _mock_collections(donors, request_doc)
+    req = DonationRequest(**request_doc)
+    for limit in limits:
+        yield limit, measure(lambda: match_donors(req, max_results=limit), repeat)
+
+
+TARGETS = {
+    "matcher": bench_matcher,
+    "service": bench_service,
+    "rules": bench_rules,
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def run(args):
+    results = []
+    for size in args.sizes:
+        generator = PopulationGenerator(seed=args.seed)
+        donors = generator.donors(size)
+        request_doc = generator.request(0, organ=args.organ)
+        recipient = to_matcher_dict(request_doc)
+
+        for target in args.targets:
+            bench = TARGETS[target]
+            payload = (donors, recipient if target == "matcher" else request_doc, args.limits, args.repeat)
+            try:
+                for limit, stats in bench(*payload):
+                    stats.update({
+                        "target": target,
+                        "pool_size": size,
+                        "limit": limit,
+                        "throughput_per_s": round(size / (stats["median_ms"] / 1000), 1) if stats["median_ms"] else None,
+                    })
+                    results.append(stats)
+                    print(f"{target:<8} pool={size:<7} limit={limit:<4} "
+                          f"median={stats['median_ms']:>9.2f}ms p95={stats['p95_ms']:>9.2f}ms "
+                          f"peak={stats['peak_kib']:>10.1f}KiB")
+            except ImportError as e:
+                results.append({"target": target, "pool_size": size, "skipped": str(e)})
+                print(f"{target:<8} pool={size:<7} skipped: {e}")
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "organ": args.organ,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline_path: str, threshold: float) -> int:
+    """Print median deltas against a baseline report; return the regression count."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def key(r):
+        return r["target"], r["pool_size"], r.get("limit")
+
+    previous = {key(r): r for r in baseline["results"] if "median_ms" in r}
+    regressions = 0
+    print(f"\nComparison against {baseline['meta']['commit']} (threshold {threshold:.0%}):")
+    for r in report["results"]:
+        old = previous.get(key(r))
+        if "median_ms" not in r or not old:
+            continue
+        change = (r["median_ms"] - old["median_ms"]) / old["median_ms"] if old["median_ms"] else 0.0
+        flag = "REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"{r['target']:<8} pool={r['pool_size']:<7} limit={r['limit']:<4} "
+              f"{old['median_ms']:>9.2f}ms -> {r['median_ms']:>9.2f}ms ({change:+.1%}) {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matching engine benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--limits", type=int, nargs="+", default=DEFAULT_LIMITS)
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument("--organ", default="Kidney")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative median slowdown reported as a regression")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare and compare(report, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Seeded synthetic donor and request populations for benchmarks
+
+Distributions are rough approximations of Indian registry data: blood
+groups skew towards O+/B+, donors pledge zero to three organs (kidney
+and eyes most often), and cities are weighted towards the metros.
+The same seed always yields the same population.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from ai.geo import get_gazetteer
+
+BLOOD_GROUP_WEIGHTS = {
+    'O+': 32.5, 'B+': 30.9, 'A+': 22.1, 'AB+': 7.7,
+    'O-': 2.0, 'B-': 2.0, 'A-': 1.8, 'AB-': 1.0,
+}
+
+ORGAN_WEIGHTS = {
+    'Kidney': 30, 'Eyes': 25, 'Liver': 18, 'Skin': 10,
+    'Heart': 7, 'Lungs': 6, 'Pancreas': 4,
+}
+
+# Share of donors pledging 0, 1, 2 or 3 organs
+ORGAN_COUNT_WEIGHTS = [35, 40, 18, 7]
+
+METRO_CITIES = ['Mumbai', 'Delhi', 'Bengaluru', 'Chennai', 'Hyderabad', 'Kolkata', 'Pune', 'Ahmedabad']
+
+URGENCY_WEIGHTS = {'low': 25, 'medium': 40, 'high': 25, 'critical': 10}
+
+
+class PopulationGenerator:
+    """Deterministic generator of donor and request documents."""
+
+    def __init__(self, seed: int = 42, availability_rate: float = 0.85):
+        self.rng = random.Random(seed)
+        self.availability_rate = availability_rate
+        self.cities = get_gazetteer().cities
+        # Metros get 5x the weight of other cities
+        self.city_weights = [5 if name in METRO_CITIES else 1 for name, _ in self.cities]
+
+    def _choice(self, weights: Dict[str, float]) -> str:
+        return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _city(self):
+        return self.rng.choices(self.cities, weights=self.city_weights)[0]
+
+    def _age(self, mean: float, sd: float, low: int, high: int) -> int:
+        return int(min(high, max(low, self.rng.gauss(mean, sd))))
+
+    def donor(self, i: int) -> Dict:
+        city, (lat, lon) = self._city()
+        organ_count = self.rng.choices(range(4), weights=ORGAN_COUNT_WEIGHTS)[0]
+        organs = []
+        while len(organs) < organ_count:
+            organ = self._choice(ORGAN_WEIGHTS)
+            if organ not in organs:
+                organs.append(organ)
+        last_donation: Optional[str] = None
+        if self.rng.random() < 0.6:
+            last_donation = (date(2026, 1, 1) - timedelta(days=self.rng.randint(0, 730))).isoformat()
+        return {
+            'id': f'donor_{i}',
+            'first_name': 'Donor',
+            'last_name': str(i),
+            'email': f'donor{i}@example.com',
+            'mobile': f'+91{9000000000 + i}',
+            'address': f'{self.rng.randint(1, 999)}, Main Road, {city}',
+            'latitude': lat,
+            'longitude': lon,
+            'age': self._age(35, 11, 18, 65),
+            'blood_group': self._choice(BLOOD_GROUP_WEIGHTS),
+            'donate_blood': self.rng.random() < 0.9,
+            'organs': organs,
+            'availability': self.rng.random() < self.availability_rate,
+            'last_donation': last_donation,
+            'is_verified': True,
+        }
+
+    def donors(self, count: int) -> List[Dict]:
+        return [self.donor(i) for i in range(count)]
+
+    def request(self, i: int, organ: Optional[str] = None) -> Dict:
+        city, (lat, lon) = self._city()
+        created = datetime(2026, 1, 1) + timedelta(minutes=self.rng.randint(0, 60 * 24 * 90))
+        return {
+            'id': f'request_{i}',
+            'patient_name': f'Patient {i}',
+            'age': self._age(45, 15, 1, 85),
+            'blood_group': self._choice(BLOOD_GROUP_WEIGHTS),
+            'organ': organ or ('Whole Blood' if self.rng.random() < 0.6 else self._choice(ORGAN_WEIGHTS)),
+            'hospital_location': f'City Care Hospital, {city}',
+            'latitude': lat,
+            'longitude': lon,
+            'urgency': self._choice(URGENCY_WEIGHTS),
+            'required_date': (created + timedelta(days=self.rng.randint(1, 30))).isoformat(),
+            'status': 'pending',
+            'created_at': created.isoformat(),
+        }
+
+    def requests(self, count: int) -> List[Dict]:
+        return [self.request(i) for i in range(count)]
+
+
+def to_matcher_dict(doc: Dict) -> Dict:
+    """Shape a donor or request document the way MatchingService hands it to the matcher."""
+    shaped = dict(doc)
+    shaped['location'] = doc.get('address') or doc.get('hospital_location')
+    return shaped
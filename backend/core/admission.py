@@ -0,0 +1,238 @@
+"""
+Admission control for CPU-heavy endpoints
+Login, registration and matching-triggering routes each get a concurrency
+limit and token buckets per client address and/or per account. A request
+over either limit is answered immediately with 429 and Retry-After, before
+it takes a worker thread, so cheap endpoints keep their latency while
+those routes are flooded.
+
+Buckets refill lazily on access (one multiply and compare, O(1)) and live
+in a bounded LRU. All state is per process and only touched from the event
+loop, so no locking is needed.
+"""
+
+import json
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from jose import jwt
+from starlette.responses import JSONResponse
+
+from core.config import settings
+from core.metrics import register_metrics
+
+# Largest request body read to find the account of an unauthenticated request
+_MAX_PEEK_BYTES = 16 * 1024
+
+
+@dataclass
+class Bucket:
+    rate: float   # tokens per second
+    burst: int
+
+
+@dataclass
+class RouteLimit:
+    name: str
+    method: str
+    path: str                      # may contain {param} segments
+    max_concurrent: int = 0        # 0 = unlimited
+    per_client: Optional[Bucket] = None
+    per_account: Optional[Bucket] = None
+    pattern: re.Pattern = field(init=False, repr=False)
+
+    def __post_init__(self):
+        segments = self.path.strip("/").split("/")
+        regex = "/".join("[^/]+" if s.startswith("{") else re.escape(s) for s in segments)
+        self.pattern = re.compile(f"^/{regex}/?$")
+
+
+def per_minute(count: int, burst: int) -> Optional[Bucket]:
+    return Bucket(count / 60.0, burst) if count > 0 else None
+
+
+def default_limits() -> List[RouteLimit]:
+    auth_client = per_minute(settings.AUTH_RATE_PER_MINUTE, settings.AUTH_BURST)
+    auth_account = per_minute(settings.AUTH_ACCOUNT_RATE_PER_MINUTE, settings.AUTH_ACCOUNT_BURST)
+    match_account = per_minute(settings.MATCH_RATE_PER_MINUTE, settings.MATCH_BURST)
+    match_client = per_minute(settings.MATCH_CLIENT_RATE_PER_MINUTE, settings.MATCH_CLIENT_BURST)
+    return [
+        RouteLimit("login", "POST", "/api/auth/token", settings.AUTH_MAX_CONCURRENT, auth_client, auth_account),
+        RouteLimit("register", "POST", "/api/auth/register", settings.AUTH_MAX_CONCURRENT, auth_client, auth_account),
+        RouteLimit("change_password", "POST", "/api/auth/change-password", settings.AUTH_MAX_CONCURRENT, auth_client, auth_account),
+        RouteLimit("create_request", "POST", "/api/requests", settings.MATCH_MAX_CONCURRENT, match_client, match_account),
+        RouteLimit("ai_matches", "GET", "/api/admin/requests/{request_id}/ai-matches", settings.MATCH_MAX_CONCURRENT, match_client, match_account),
+        RouteLimit("ai_matches_stream", "GET", "/api/admin/requests/{request_id}/ai-matches/stream", settings.MATCH_MAX_CONCURRENT, match_client, match_account),
+    ]
+
+
+class TokenBuckets:
+    """Token buckets keyed by (limit, client/account), oldest evicted first."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max(1, max_keys)
+        self._state: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+
+    def take(self, key: Tuple[str, str], bucket: Bucket, now: float) -> float:
+        """Take one token; returns 0 when admitted, else seconds until a token is available."""
+        state = self._state.get(key)
+        if state is None:
+            state = [float(bucket.burst), now]
+            self._state[key] = state
+            if len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+        else:
+            self._state.move_to_end(key)
+            state[0] = min(float(bucket.burst), state[0] + (now - state[1]) * bucket.rate)
+            state[1] = now
+        if state[0] >= 1.0:
+            state[0] -= 1.0
+            return 0.0
+        return (1.0 - state[0]) / bucket.rate
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+
+class _LimitStats:
+    __slots__ = ("in_flight", "peak", "admitted", "rejected_concurrency", "rejected_client", "rejected_account")
+
+    def __init__(self):
+        self.in_flight = self.peak = self.admitted = 0
+        self.rejected_concurrency = self.rejected_client = self.rejected_account = 0
+
+
+def _bearer_subject(headers: Dict[bytes, bytes]) -> Optional[str]:
+    auth = headers.get(b"authorization", b"").decode("latin-1")
+    if not auth.lower().startswith("bearer "):
+        return None
+    try:
+        # Verified before use, so a forged token can neither drain another
+        # account's bucket nor dodge the limit with a fresh "sub"
+        claims = jwt.decode(auth[7:].strip(), settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except Exception:
+        return None
+    return claims.get("sub") if claims.get("type") == "access" else None
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app, limits: Optional[List[RouteLimit]] = None, max_keys: int = 100_000):
+        self.app = app
+        self.limits = default_limits() if limits is None else limits
+        self.buckets = TokenBuckets(max_keys)
+        self.stats = {limit.name: _LimitStats() for limit in self.limits}
+        register_metrics("admission", self.metrics)
+
+    def _match(self, method: str, path: str) -> Optional[RouteLimit]:
+        for limit in self.limits:
+            if limit.method == method and limit.pattern.match(path):
+                return limit
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = self._match(scope["method"], scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        stats = self.stats[limit.name]
+        if limit.max_concurrent and stats.in_flight >= limit.max_concurrent:
+            stats.rejected_concurrency += 1
+            await self._reject(scope, receive, send, 1, "Too many concurrent requests, please retry")
+            return
+
+        # Hold the slot from here on: the account lookup below may await the body
+        stats.in_flight += 1
+        stats.peak = max(stats.peak, stats.in_flight)
+        try:
+            now = time.monotonic()
+            if limit.per_client is not None:
+                client = scope.get("client")
+                key = (limit.name, "ip:" + (client[0] if client else "unknown"))
+                wait = self.buckets.take(key, limit.per_client, now)
+                if wait:
+                    stats.rejected_client += 1
+                    await self._reject(scope, receive, send, wait, "Rate limit exceeded, please retry later")
+                    return
+
+            if limit.per_account is not None:
+                account = _bearer_subject(dict(scope["headers"]))
+                if account is None:
+                    account, receive = await self._body_account(receive)
+                if account is not None:
+                    wait = self.buckets.take((limit.name, "acct:" + account.lower()), limit.per_account, now)
+                    if wait:
+                        stats.rejected_account += 1
+                        await self._reject(scope, receive, send, wait, "Too many attempts for this account, please retry later")
+                        return
+
+            stats.admitted += 1
+            await self.app(scope, receive, send)
+        finally:
+            stats.in_flight -= 1
+
+    async def _body_account(self, receive):
+        """Read the (small) JSON body for an "email" field, then replay it downstream."""
+        messages, size = [], 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            size += len(message.get("body", b""))
+            if message["type"] != "http.request" or not message.get("more_body") or size > _MAX_PEEK_BYTES:
+                break
+
+        account = None
+        if size <= _MAX_PEEK_BYTES:
+            try:
+                body = json.loads(b"".join(m.get("body", b"") for m in messages) or b"null")
+                if isinstance(body, dict) and isinstance(body.get("email"), str):
+                    account = body["email"]
+            except ValueError:
+                pass
+
+        pending = list(messages)
+
+        async def replay():
+            if pending:
+                return pending.pop(0)
+            return await receive()
+
+        return account, replay
+
+    async def _reject(self, scope, receive, send, retry_after: float, message: str):
+        response = JSONResponse(
+            status_code=429,
+            content={
+                "status": "error",
+                "message": message,
+                "data": None,
+                "meta": {"timestamp": datetime.now().isoformat(), "error_code": 429},
+            },
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "buckets": len(self.buckets),
+            "routes": {
+                limit.name: {
+                    "max_concurrent": limit.max_concurrent,
+                    "in_flight": self.stats[limit.name].in_flight,
+                    "peak": self.stats[limit.name].peak,
+                    "admitted": self.stats[limit.name].admitted,
+                    "rejected_concurrency": self.stats[limit.name].rejected_concurrency,
+                    "rejected_client": self.stats[limit.name].rejected_client,
+                    "rejected_account": self.stats[limit.name].rejected_account,
+                }
+                for limit in self.limits
+            },
+        }
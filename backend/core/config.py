@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from typing import List
 try:
     from pydantic_settings import BaseSettings
@@ -12,13 +13,87 @@ class Settings(BaseSettings):
     # Database
     MONGO_URL: str = os.getenv("MONGO_URL", "mongodb://localhost:27017")
     DB_NAME: str = os.getenv("DB_NAME", "blood_organ_db")
+    # Fill the in-memory mock database with demo accounts, hospitals, donors
+    # and requests when MongoDB is unreachable (all passwords "password123")
+    SEED_MOCK_DATA: bool = os.getenv("SEED_MOCK_DATA", "false").lower() == "true"
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "DEVELOPMENT_INSECURE_KEY")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
-    
+    # Resolved users are cached per access token for this long (0 disables);
+    # deactivation and password changes evict them immediately
+    PRINCIPAL_CACHE_TTL_S: float = float(os.getenv("PRINCIPAL_CACHE_TTL_S", "60"))
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    # Revoked refresh-token families and consumed jtis: Bloom filter sizing
+    # and how often records written by other processes are pulled in
+    REVOCATION_BLOOM_CAPACITY: int = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+    REVOCATION_SYNC_S: float = float(os.getenv("REVOCATION_SYNC_S", "5"))
+    # pbkdf2_sha256 work factor; stored hashes below it are upgraded on login
+    PASSWORD_HASH_ROUNDS: int = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+    # Dedicated hashing threads, and how many calls may wait for one before
+    # auth endpoints answer 503
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE: int = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+
+    # Admission control (core/admission.py): concurrent requests per route,
+    # and token buckets per client address / per account (0 disables a bucket)
+    ADMISSION_CONTROL: bool = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+    AUTH_MAX_CONCURRENT: int = int(os.getenv("AUTH_MAX_CONCURRENT", "8"))
+    AUTH_RATE_PER_MINUTE: int = int(os.getenv("AUTH_RATE_PER_MINUTE", "30"))
+    AUTH_BURST: int = int(os.getenv("AUTH_BURST", "10"))
+    AUTH_ACCOUNT_RATE_PER_MINUTE: int = int(os.getenv("AUTH_ACCOUNT_RATE_PER_MINUTE", "10"))
+    AUTH_ACCOUNT_BURST: int = int(os.getenv("AUTH_ACCOUNT_BURST", "5"))
+    MATCH_MAX_CONCURRENT: int = int(os.getenv("MATCH_MAX_CONCURRENT", "8"))
+    MATCH_RATE_PER_MINUTE: int = int(os.getenv("MATCH_RATE_PER_MINUTE", "60"))
+    MATCH_BURST: int = int(os.getenv("MATCH_BURST", "20"))
+    # Per client address, so requests without a valid token are limited too;
+    # higher than the per-account rate as several users may share an address
+    MATCH_CLIENT_RATE_PER_MINUTE: int = int(os.getenv("MATCH_CLIENT_RATE_PER_MINUTE", "120"))
+    MATCH_CLIENT_BURST: int = int(os.getenv("MATCH_CLIENT_BURST", "40"))
+
+    # Matching
+    # Donor pools at or above the threshold are scored across a process pool.
+    # Set workers to 0 or 1 to keep all scoring on the request thread.
+    MATCH_PARALLEL_THRESHOLD: int = int(os.getenv("MATCH_PARALLEL_THRESHOLD", "20000"))
+    MATCH_PARALLEL_WORKERS: int = int(os.getenv("MATCH_PARALLEL_WORKERS", "4"))
+    # Tier-1 candidates fetched from the donor indexes before scoring
+    MATCH_CANDIDATE_LIMIT: int = int(os.getenv("MATCH_CANDIDATE_LIMIT", "2000"))
+    # Donors farther than this from the request location are not scored (0 disables)
+    MATCH_RADIUS_KM: float = float(os.getenv("MATCH_RADIUS_KM", "1000"))
+    # Background matching workers; persisted jobs survive a restart
+    MATCH_QUEUE_WORKERS: int = int(os.getenv("MATCH_QUEUE_WORKERS", "2"))
+    MATCH_QUEUE_PERSIST: bool = os.getenv("MATCH_QUEUE_PERSIST", "false").lower() == "true"
+
+    # Audit ledger
+    # Blocks are appended to segment files under LEDGER_DIR (empty keeps the
+    # chain in memory only). Appends within the commit window share one fsync.
+    LEDGER_DIR: str = os.getenv("LEDGER_DIR", str(Path(__file__).resolve().parent.parent / "ledger_data"))
+    LEDGER_COMMIT_INTERVAL_MS: float = float(os.getenv("LEDGER_COMMIT_INTERVAL_MS", "5"))
+    LEDGER_COMMIT_MAX: int = int(os.getenv("LEDGER_COMMIT_MAX", "256"))
+    # Segment files roll over at this size; sealed segments are indexed and
+    # read through mmap, only the active one is held in memory
+    LEDGER_SEGMENT_BYTES: int = int(os.getenv("LEDGER_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+    # Merkle batching: seal up to LEDGER_BATCH_MAX events per block, or whatever
+    # arrived within the window. 0 or 1 writes one block per event.
+    LEDGER_BATCH_MAX: int = int(os.getenv("LEDGER_BATCH_MAX", "0"))
+    LEDGER_BATCH_WINDOW_MS: float = float(os.getenv("LEDGER_BATCH_WINDOW_MS", "50"))
+    # "async" acknowledges ledger events once queued; "commit" waits for the fsync
+    LEDGER_WRITE_MODE: str = os.getenv("LEDGER_WRITE_MODE", "async")
+    LEDGER_QUEUE_SIZE: int = int(os.getenv("LEDGER_QUEUE_SIZE", "10000"))
+    # How long a producer blocks on a full queue before the event is dropped
+    LEDGER_QUEUE_TIMEOUT_MS: float = float(os.getenv("LEDGER_QUEUE_TIMEOUT_MS", "50"))
+    # Background incremental verification period (0 disables) and the number
+    # of processes used by full audits
+    LEDGER_VERIFY_INTERVAL_S: float = float(os.getenv("LEDGER_VERIFY_INTERVAL_S", "60"))
+    LEDGER_VERIFY_WORKERS: int = int(os.getenv("LEDGER_VERIFY_WORKERS", "4"))
+
+    # Admin stats are read from counters maintained on write; this job
+    # recounts them from the collections and repairs drift (0 disables it,
+    # including the initial backfill at startup)
+    STATS_RECONCILE_INTERVAL_S: float = float(os.getenv("STATS_RECONCILE_INTERVAL_S", "3600"))
+
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
         "http://localhost:5173",
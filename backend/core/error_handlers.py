@@ -2,11 +2,13 @@ from fastapi import Request, status
 from fastapi.responses import JSONResponse
 import logging
 from datetime import datetime
+from typing import Dict, Optional
 
 class AppError(Exception):
-    def __init__(self, message: str, status_code: int = 400):
+    def __init__(self, message: str, status_code: int = 400, headers: Optional[Dict[str, str]] = None):
         self.message = message
         self.status_code = status_code
+        self.headers = headers
 
 async def app_exception_handler(request: Request, exc: AppError):
     return JSONResponse(
@@ -20,6 +22,7 @@ async def app_exception_handler(request: Request, exc: AppError):
                 "error_code": exc.status_code
             }
         },
+        headers=exc.headers,
     )
 
 async def generic_exception_handler(request: Request, exc: Exception):
@@ -0,0 +1,54 @@
+"""
+In-process metrics registry
+Subsystems register a provider returning a dict of current values;
+the admin /metrics endpoint collects them all on demand.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Any
+
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    _providers[name] = provider
+
+
+def collect_metrics() -> Dict[str, Dict[str, Any]]:
+    snapshot = {}
+    for name, provider in list(_providers.items()):
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Metrics provider '{name}' failed: {e}")
+            snapshot[name] = {"error": str(e)}
+    return snapshot
+
+
+class LatencyWindow:
+    """Rolling window of recent durations (seconds) with summary stats."""
+
+    def __init__(self, size: int = 1000):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"count": self.count, "avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return {
+            "count": self.count,
+            "avg_ms": round(sum(samples) / len(samples) * 1000, 2),
+            "p95_ms": round(p95 * 1000, 2),
+            "max_ms": round(samples[-1] * 1000, 2),
+        }
@@ -0,0 +1,65 @@
+"""
+Startup profiling
+Times each phase of worker boot (imports, DB init, seeding, background
+services) and logs the breakdown once the app is ready. The same numbers
+are exposed under "startup" in /api/admin/metrics. For a per-module view
+of the import phases run `python -X importtime main.py`.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.ready_s: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - began))
+
+    def mark_ready(self) -> None:
+        self.ready_s = time.perf_counter() - self.started
+        logger.info("Startup finished in %.0f ms:\n%s", self.ready_s * 1000, self.report())
+
+    def report(self) -> str:
+        total = self.ready_s or (time.perf_counter() - self.started)
+        width = max([len("(other)")] + [len(name) for name, _ in self.phases])
+        lines = [
+            f"  {name:<{width}}  {seconds * 1000:8.1f} ms  {seconds / total:6.1%}"
+            for name, seconds in self.phases
+        ]
+        other = total - sum(seconds for _, seconds in self.phases)
+        lines.append(f"  {'(other)':<{width}}  {other * 1000:8.1f} ms  {other / total:6.1%}")
+        return "\n".join(lines)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "ready_ms": round(self.ready_s * 1000, 1) if self.ready_s is not None else None,
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases},
+        }
+
+
+# Global startup profile, created when main.py starts importing
+_startup_profile = None
+
+
+def get_startup_profile() -> StartupProfile:
+    """Get or create the process startup profile."""
+    global _startup_profile
+    if _startup_profile is None:
+        _startup_profile = StartupProfile()
+        register_metrics("startup", _startup_profile.metrics)
+    return _startup_profile
@@ -4,6 +4,9 @@ from pymongo.errors import ServerSelectionTimeoutError
 import logging
 from datetime import datetime, timedelta
 from core.config import settings
+from ai.matching import ORGAN_CANDIDATE_INDEX, BLOOD_CANDIDATE_INDEX
+from repositories.match_repository import MATCH_REQUEST_INDEX, MATCH_DONOR_INDEX
+from repositories.activity_repository import ROLLUP_INDEX
 
 MONGO_URL = settings.MONGO_URL
 # set a reasonable server selection timeout so startup doesn't hang too long
@@ -11,9 +14,9 @@ client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=5000)
 
 from core.db_instance import set_collection, get_collection
 
-def init_db() -> None:
+def init_db() -> bool:
     """Initialize DB instances and indexes. 
-    Switches to MOCK collections if MongoDB is unreachable.
+    Switches to MOCK collections if MongoDB is unreachable; returns True in that case.
     """
     try:
         # quick ping to verify server availability
@@ -25,13 +28,30 @@ def init_db() -> None:
         set_collection("hospitals", client[settings.DB_NAME]["hospitals"])
         set_collection("requests", client[settings.DB_NAME]["requests"])
         set_collection("users", client[settings.DB_NAME]["users"])
+        set_collection("match_jobs", client[settings.DB_NAME]["match_jobs"])
+        set_collection("matches", client[settings.DB_NAME]["matches"])
+        set_collection("revoked_tokens", client[settings.DB_NAME]["revoked_tokens"])
+        set_collection("stats_counters", client[settings.DB_NAME]["stats_counters"])
+        set_collection("activity_rollups", client[settings.DB_NAME]["activity_rollups"])
         
         # Initialize Indexes
         get_collection("donors").create_index("blood_group")
-        get_collection("donors").create_index([("organ", 1), ("location", 1)])
+        # Tier-1 matching candidate indexes (see ai/matching.py)
+        get_collection("donors").create_index(ORGAN_CANDIDATE_INDEX)
+        get_collection("donors").create_index(BLOOD_CANDIDATE_INDEX)
         get_collection("hospitals").create_index("city")
         get_collection("requests").create_index("urgency")
         get_collection("requests").create_index("organ")
+        get_collection("match_jobs").create_index("request_id")
+        get_collection("matches").create_index(MATCH_REQUEST_INDEX)
+        get_collection("matches").create_index(MATCH_DONOR_INDEX)
+        # Revocation records are only needed until the token would have expired anyway
+        get_collection("revoked_tokens").create_index("expires_at", expireAfterSeconds=0)
+        # Instances poll for revocations newer than their last sync
+        get_collection("revoked_tokens").create_index("created_at")
+        # Activity windows are ranges over bucket start times (see repositories/activity_repository.py)
+        get_collection("activity_rollups").create_index(ROLLUP_INDEX)
+        return False
         
     except (ServerSelectionTimeoutError, Exception) as e:
         logging.getLogger(__name__).warning(f"!!! DATABASE FAILOVER !!! MongoDB unavailable: {e}. Switching to IN-MEMORY MOCK MODE for demonstration.")
@@ -41,139 +61,130 @@ def init_db() -> None:
         set_collection("requests", MockCollection("requests"))
         set_collection("users", MockCollection("users"))
         set_collection("notifications", MockCollection("notifications"))
+        set_collection("match_jobs", MockCollection("match_jobs"))
+        set_collection("matches", MockCollection("matches"))
+        set_collection("revoked_tokens", MockCollection("revoked_tokens"))
+        set_collection("stats_counters", MockCollection("stats_counters"))
+        set_collection("activity_rollups", MockCollection("activity_rollups"))
         
-        # No longer seeding test users for real-world mode.
-        # Users must register themselves.
+        # Collections start empty; demo data is opt-in (SEED_MOCK_DATA, see seed_mock_data)
         logging.getLogger(__name__).info("Mock Mode initialized.")
-        
-        # Seed default users for Mock Mode
-        try:
-            
-            # STARTUP SEEDING (Clean Slate)
-            users_col = get_collection("users")
-            donors_col = get_collection("donors")
-            requests_col = get_collection("requests")
-            hospitals_col = get_collection("hospitals")
-            notifications_col = get_collection("notifications")
+        return True
 
-            # 1. WIPE ALL DATA
-            users_col.delete_many({})
-            donors_col.delete_many({})
-            requests_col.delete_many({})
-            hospitals_col.delete_many({})
-            notifications_col.delete_many({})
-            logging.getLogger(__name__).info("Wiped all old data for a clean slate.")
-            
-            # 2. Hash for passwords using passlib
-            from passlib.context import CryptContext
-            pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
-            hashed_pw = pwd_context.hash("password123")
-            
-            # 3. Seed 1 Admin
-            admin_doc = {
-                "email": "admin@connectlife.com",
+
+def seed_mock_data() -> None:
+    """Fill the (fresh) mock collections with demo data, one insert_many per collection.
+    Ids are assigned up front so donors and requests can reference their users
+    without waiting on individual inserts.
+    """
+    try:
+        from bson import ObjectId
+        from services.password_hasher import build_password_context
+
+        # All demo accounts share one password, so it is hashed once
+        hashed_pw = build_password_context(settings.PASSWORD_HASH_ROUNDS).hash("password123")
+        now = datetime.utcnow()
+        created_at = now.isoformat()
+
+        def user(email: str, role: str) -> dict:
+            return {
+                "_id": ObjectId(),
+                "email": email,
                 "password_hash": hashed_pw,
-                "role": "admin",
+                "role": role,
                 "is_active": True,
-                "created_at": datetime.utcnow().isoformat()
+                "created_at": created_at
             }
-            users_col.insert_one(admin_doc)
-            logging.getLogger(__name__).info("Seeded Admin: admin@connectlife.com / password123")
 
-            # 4. Seed 10 Hospitals
-            cities = ["Bengaluru", "Mumbai", "Delhi", "Chennai", "Hyderabad", "Pune", "Kolkata", "Ahmedabad", "Jaipur", "Lucknow"]
-            for i in range(1, 11):
-                email = f"hospital{i}@connectlife.com"
-                user_doc = {
-                    "email": email,
-                    "password_hash": hashed_pw,
-                    "role": "hospital",
-                    "is_active": True,
-                    "created_at": datetime.utcnow().isoformat()
-                }
-                users_col.insert_one(user_doc)
-                
-                hospitals_col.insert_one({
-                    "hospital_name": f"City Care Hospital {i}",
-                    "city": cities[i-1],
-                    "contact_number": f"+9199887766{i:02d}",
-                    "email": email,
-                    "address": f"{100 + i}, Medical Square, {cities[i-1]}",
-                    "is_active": True
-                })
-            logging.getLogger(__name__).info("Seeded 10 Hospitals (hospital1-10@connectlife.com)")
+        # 1 Admin
+        users = [user("admin@connectlife.com", "admin")]
+        hospitals, donors, requests = [], [], []
 
-            # 5. Seed 10 Donors
-            blood_groups = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-", "O+", "A+"]
-            organs_list = ["Kidney", "Liver", "Heart", "Lungs", "Pancreas", "Eyes", "Skin"]
-            for i in range(1, 11):
-                email = f"donor{i}@connectlife.com"
-                user_res = users_col.insert_one({
-                    "email": email,
-                    "password_hash": hashed_pw,
-                    "role": "donor",
-                    "is_active": True,
-                    "created_at": datetime.utcnow().isoformat()
-                })
-                
-                donors_col.insert_one({
-                    "user_id": str(user_res.inserted_id),
-                    "first_name": f"Donor",
-                    "last_name": str(i),
-                    "email": email,
-                    "mobile": f"+9198765432{i:02d}",
-                    "address": f"Street {i}, {cities[i-1]}",
-                    "blood_group": blood_groups[i-1],
-                    "donate_blood": True,
-                    "organs": [organs_list[i % len(organs_list)]],
-                    "availability": True,
-                    "is_verified": True
-                })
-            logging.getLogger(__name__).info("Seeded 10 Donors (donor1-10@connectlife.com)")
+        # 10 Hospitals
+        cities = ["Bengaluru", "Mumbai", "Delhi", "Chennai", "Hyderabad", "Pune", "Kolkata", "Ahmedabad", "Jaipur", "Lucknow"]
+        for i in range(1, 11):
+            email = f"hospital{i}@connectlife.com"
+            users.append(user(email, "hospital"))
+            hospitals.append({
+                "hospital_name": f"City Care Hospital {i}",
+                "city": cities[i-1],
+                "contact_number": f"+9199887766{i:02d}",
+                "email": email,
+                "address": f"{100 + i}, Medical Square, {cities[i-1]}",
+                "is_active": True
+            })
 
-            # 6. Seed 10 Recipients & 20 Requests
-            urgencies = ["low", "medium", "high", "critical"]
-            for i in range(1, 11):
-                email = f"recipient{i}@connectlife.com"
-                user_res = users_col.insert_one({
-                    "email": email,
-                    "password_hash": hashed_pw,
-                    "role": "recipient",
-                    "is_active": True,
-                    "created_at": datetime.utcnow().isoformat()
-                })
-                
-                # Blood Request
-                requests_col.insert_one({
-                    "user_id": str(user_res.inserted_id),
-                    "patient_name": f"Patient B-{i}",
-                    "age": 20 + i,
-                    "blood_group": blood_groups[(i+2)%10],
-                    "organ": "Whole Blood",
-                    "quantity": i % 3 + 1,
-                    "hospital_location": f"City Care Hospital {i}",
-                    "urgency": urgencies[i % 4],
-                    "required_date": (datetime.utcnow() + timedelta(days=2)).isoformat(),
-                    "status": "pending",
-                    "created_at": datetime.utcnow().isoformat()
-                })
-                
-                # Organ Request
-                requests_col.insert_one({
-                    "user_id": str(user_res.inserted_id),
-                    "patient_name": f"Patient O-{i}",
-                    "age": 40 + i,
-                    "blood_group": blood_groups[i-1],
-                    "organ": organs_list[i % len(organs_list)],
-                    "hospital_location": f"City Care Hospital {i}",
-                    "urgency": urgencies[(i+1) % 4],
-                    "required_date": (datetime.utcnow() + timedelta(days=30)).isoformat(),
-                    "status": "pending",
-                    "created_at": datetime.utcnow().isoformat(),
-                    "consent_agreement": True
-                })
-            logging.getLogger(__name__).info("Seeded 10 Recipients (recipient1-10@connectlife.com) and 20 Requests")
+        # 10 Donors
+        blood_groups = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-", "O+", "A+"]
+        organs_list = ["Kidney", "Liver", "Heart", "Lungs", "Pancreas", "Eyes", "Skin"]
+        for i in range(1, 11):
+            email = f"donor{i}@connectlife.com"
+            donor_user = user(email, "donor")
+            users.append(donor_user)
+            donors.append({
+                "user_id": str(donor_user["_id"]),
+                "first_name": f"Donor",
+                "last_name": str(i),
+                "email": email,
+                "mobile": f"+9198765432{i:02d}",
+                "address": f"Street {i}, {cities[i-1]}",
+                "blood_group": blood_groups[i-1],
+                "donate_blood": True,
+                "organs": [organs_list[i % len(organs_list)]],
+                "availability": True,
+                "is_verified": True
+            })
+
+        # 10 Recipients & 20 Requests
+        urgencies = ["low", "medium", "high", "critical"]
+        for i in range(1, 11):
+            recipient = user(f"recipient{i}@connectlife.com", "recipient")
+            users.append(recipient)
+            
+            # Blood Request
+            requests.append({
+                "user_id": str(recipient["_id"]),
+                "patient_name": f"Patient B-{i}",
+                "age": 20 + i,
+                "blood_group": blood_groups[(i+2)%10],
+                "organ": "Whole Blood",
+                "quantity": i % 3 + 1,
+                "hospital_location": f"City Care Hospital {i}",
+                "urgency": urgencies[i % 4],
+                "required_date": (now + timedelta(days=2)).isoformat(),
+                "status": "pending",
+                "created_at": created_at
+            })
+            
+            # Organ Request
+            requests.append({
+                "user_id": str(recipient["_id"]),
+                "patient_name": f"Patient O-{i}",
+                "age": 40 + i,
+                "blood_group": blood_groups[i-1],
+                "organ": organs_list[i % len(organs_list)],
+                "hospital_location": f"City Care Hospital {i}",
+                "urgency": urgencies[(i+1) % 4],
+                "required_date": (now + timedelta(days=30)).isoformat(),
+                "status": "pending",
+                "created_at": created_at,
+                "consent_agreement": True
+            })
 
-        except Exception as seed_err:
-            logging.getLogger(__name__).error(f"Failed to seed mock users: {seed_err}")
+        get_collection("users").insert_many(users)
+        get_collection("hospitals").insert_many(hospitals)
+        get_collection("donors").insert_many(donors)
+        get_collection("requests").insert_many(requests)
+        # Bulk inserts bypass the repositories, so count the seeded data once
+        from repositories.repository import RepositoryFactory
+        RepositoryFactory.get_counter_repository().reconcile()
+        activity = RepositoryFactory.get_activity_repository()
+        activity.record("registrations", len(donors), now)
+        activity.record("requests", len(requests), now)
+        logging.getLogger(__name__).info(
+            f"Seeded {len(users)} users (admin@, hospital1-10@, donor1-10@, recipient1-10@connectlife.com / password123), "
+            f"{len(hospitals)} hospitals, {len(donors)} donors and {len(requests)} requests"
+        )
 
+    except Exception as seed_err:
+        logging.getLogger(__name__).error(f"Failed to seed mock data: {seed_err}")
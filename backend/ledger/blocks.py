@@ -0,0 +1,73 @@
+"""
+Block hashing and self-consistency checks
+Shared by the ledger and by verifier worker processes.
+
+Blocks with "v" use the binary encoding in ledger.encoding; older blocks
+are checked against the original sorted-key JSON hash.
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from ledger import encoding
+from ledger.merkle import leaf_hash, merkle_root
+
+
+def json_hash(block: Dict[str, Any]) -> str:
+    """Original (unversioned) block hash, kept to verify existing chains."""
+    # Batched events are committed through merkle_root, not hashed again here
+    block_string = json.dumps(
+        {k: v for k, v in block.items() if k not in ("hash", "events")}, sort_keys=True
+    ).encode()
+    return hashlib.sha256(block_string).hexdigest()
+
+
+def calculate_hash(block: Dict[str, Any]) -> str:
+    if block.get("v") == encoding.VERSION:
+        return encoding.block_hash(block)
+    return json_hash(block)
+
+
+def leaf_hasher(block: Dict[str, Any]) -> Callable[[Dict[str, Any]], str]:
+    """Merkle leaf function matching the block's encoding version."""
+    return encoding.event_leaf_hash if block.get("v") == encoding.VERSION else leaf_hash
+
+
+def verify_block(block: Dict[str, Any]) -> bool:
+    """Check a block's own hash (and Merkle root for batched blocks)."""
+    version = block.get("v")
+    if version is not None:
+        if version != encoding.VERSION:
+            return False
+        allowed = encoding.BATCH_BLOCK_KEYS if "merkle_root" in block else encoding.BLOCK_KEYS
+        if not block.keys() <= allowed:
+            return False
+    if "events" in block or "merkle_root" in block:
+        leaf = leaf_hasher(block)
+        if merkle_root([leaf(e) for e in block.get("events", [])]) != block.get("merkle_root"):
+            return False
+    return block["hash"] == calculate_hash(block)
+
+
+def verify_sequence(
+    blocks: Iterable[Dict[str, Any]],
+    previous_hash: Optional[str] = None
+) -> Tuple[bool, Optional[int], Optional[str], Optional[str]]:
+    """
+    Verify consecutive blocks: each hash, and each link to the one before.
+    previous_hash, when given, is what the first block must link to.
+
+    Returns (valid, failed_index, first_previous_hash, last_hash).
+    """
+    first_previous = None
+    last_hash = None
+    for position, block in enumerate(blocks):
+        if position == 0:
+            first_previous = block["previous_hash"]
+        if previous_hash is not None and block["previous_hash"] != previous_hash:
+            return False, block.get("index"), first_previous, last_hash
+        if not verify_block(block):
+            return False, block.get("index"), first_previous, last_hash
+        previous_hash = last_hash = block["hash"]
+    return True, None, first_previous, last_hash
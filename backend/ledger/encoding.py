@@ -0,0 +1,115 @@
+"""
+Canonical binary block encoding (version 1)
+
+Blocks are hashed over a length-prefixed byte encoding instead of
+sorted-key JSON. The header (version, index, previous hash) is fixed the
+moment the previous block is sealed, so its hasher state is prepared
+ahead of time and copied for the next block; the rest is fed
+incrementally.
+
+    header := b"LDGR" version:u8 index:u64 previous_hash:32B
+    block  := header str(timestamp) nonce:u64 body
+    body   := b"D" value(data)                        single event
+            | b"M" event_count:u32 merkle_root:32B    Merkle batch
+    str(s) := len:u32 utf8
+    value  := b"n" | b"t" | b"f"                      None / True / False
+            | b"i" str(decimal) | b"d" float:f64
+            | b"s" str | b"l" count:u32 value*
+            | b"m" count:u32 (str(key) value)*        keys sorted
+
+Blocks carry "v": 1. Blocks without "v" predate this encoding and are
+verified with the original JSON hash.
+"""
+
+import hashlib
+import struct
+from typing import Any, Dict, List
+
+VERSION = 1
+MAGIC = b"LDGR"
+
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+_F64 = struct.Struct(">d")
+
+# Keys a version 1 block may carry; anything else is tampering
+BLOCK_KEYS = frozenset({"v", "index", "timestamp", "previous_hash", "nonce", "hash", "data"})
+BATCH_BLOCK_KEYS = frozenset({"v", "index", "timestamp", "previous_hash", "nonce", "hash",
+                              "event_count", "merkle_root", "events"})
+
+
+def _str(text: str) -> bytes:
+    raw = text.encode("utf-8")
+    return _U32.pack(len(raw)) + raw
+
+
+def encode_value(value: Any, out: List[bytes]) -> None:
+    """Append the canonical encoding of a JSON-compatible value to `out` as byte chunks."""
+    # Exact type checks first: they cover almost every event and are much
+    # cheaper than the isinstance chain, which handles subclasses below
+    kind = type(value)
+    if kind is str:
+        out.append(b"s" + _str(value))
+    elif kind is dict:
+        out.append(b"m" + _U32.pack(len(value)))
+        for key in sorted(value, key=str):
+            out.append(_str(str(key)))
+            encode_value(value[key], out)
+    elif kind is float:
+        out.append(b"d" + _F64.pack(value))
+    elif value is None:
+        out.append(b"n")
+    elif value is True:
+        out.append(b"t")
+    elif value is False:
+        out.append(b"f")
+    elif isinstance(value, int):
+        out.append(b"i" + _str(str(int(value))))
+    elif isinstance(value, float):
+        out.append(b"d" + _F64.pack(value))
+    elif isinstance(value, str):
+        out.append(b"s" + _str(str(value)))
+    elif isinstance(value, (list, tuple)):
+        out.append(b"l" + _U32.pack(len(value)))
+        for item in value:
+            encode_value(item, out)
+    elif isinstance(value, dict):
+        out.append(b"m" + _U32.pack(len(value)))
+        for key in sorted(value, key=str):
+            out.append(_str(str(key)))
+            encode_value(value[key], out)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} in a ledger block")
+
+
+def header_hasher(index: int, previous_hash: str) -> "hashlib._Hash":
+    """sha256 state primed with the immutable block header."""
+    h = hashlib.sha256(MAGIC)
+    h.update(bytes((VERSION,)))
+    h.update(_U64.pack(index))
+    h.update(bytes.fromhex(previous_hash))
+    return h
+
+
+def _body(block: Dict[str, Any]) -> bytes:
+    out = [_str(block["timestamp"]), _U64.pack(block.get("nonce", 0))]
+    if "merkle_root" in block:
+        out.append(b"M" + _U32.pack(block["event_count"]) + bytes.fromhex(block["merkle_root"]))
+    else:
+        out.append(b"D")
+        encode_value(block.get("data"), out)
+    return b"".join(out)
+
+
+def block_hash(block: Dict[str, Any], header: "hashlib._Hash" = None) -> str:
+    """Version 1 block hash; pass a header_hasher for the block to skip re-hashing the header."""
+    h = header.copy() if header is not None else header_hasher(block["index"], block["previous_hash"])
+    h.update(_body(block))
+    return h.hexdigest()
+
+
+def event_leaf_hash(event: Dict[str, Any]) -> str:
+    """Merkle leaf for an event in a version 1 batch."""
+    out = [b"\x00"]
+    encode_value(event, out)
+    return hashlib.sha256(b"".join(out)).hexdigest()
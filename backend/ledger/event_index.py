@@ -0,0 +1,108 @@
+"""
+Secondary indexes over ledger events
+Every event gets an ordinal in chain order. Postings lists of ordinals are
+kept per entity id and per event type, and a parallel timestamp array
+turns a time range into an ordinal range by bisection. Since events are
+appended in order, every postings list is already sorted.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+EventRef = Tuple[int, int]  # (block index, position in block)
+
+
+def block_events(block: Dict[str, Any]) -> List[Tuple[int, str, Dict[str, Any]]]:
+    """(position, timestamp, data) for each event in a block, batched or not."""
+    if "events" in block:
+        return [(i, e["timestamp"], e.get("data") or {}) for i, e in enumerate(block["events"])]
+    return [(0, block["timestamp"], block.get("data") or {})]
+
+
+def _contains(postings: List[int], ordinal: int) -> bool:
+    i = bisect_left(postings, ordinal)
+    return i < len(postings) and postings[i] == ordinal
+
+
+class EventIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refs: List[EventRef] = []
+        self._timestamps: List[str] = []
+        self._by_entity: Dict[str, List[int]] = {}
+        self._by_type: Dict[str, List[int]] = {}
+        self.next_block = 0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def add_block(self, block: Dict[str, Any]) -> None:
+        with self._lock:
+            self._add_locked(block)
+
+    def _add_locked(self, block: Dict[str, Any]) -> None:
+        if block["index"] < self.next_block:
+            return  # already indexed
+        for position, timestamp, data in block_events(block):
+            ordinal = len(self._refs)
+            self._refs.append((block["index"], position))
+            self._timestamps.append(timestamp)
+            # Match events also belong to the matched donor
+            entities = {data.get("entity_id"), (data.get("details") or {}).get("donor_id")}
+            for entity in entities - {None}:
+                self._by_entity.setdefault(str(entity), []).append(ordinal)
+            if data.get("event_type"):
+                self._by_type.setdefault(data["event_type"], []).append(ordinal)
+        self.next_block = block["index"] + 1
+
+    def load(self, blocks: Iterable[Dict[str, Any]]) -> None:
+        """Index existing blocks; the caller marks the index live once caught up."""
+        with self._lock:
+            for block in blocks:
+                self._add_locked(block)
+
+    def query(
+        self,
+        entity_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        after: int = -1,
+        limit: int = 50
+    ) -> Tuple[List[Tuple[int, EventRef]], bool]:
+        """
+        Ordinals and refs of matching events after ordinal `after`, oldest first.
+        Returns (page, has_more).
+        """
+        with self._lock:
+            low = after + 1
+            high = len(self._refs)
+            if since:
+                low = max(low, bisect_left(self._timestamps, since))
+            if until:
+                high = min(high, bisect_right(self._timestamps, until))
+
+            postings = []
+            if entity_id is not None:
+                postings.append(self._by_entity.get(entity_id, []))
+            if event_type is not None:
+                postings.append(self._by_type.get(event_type, []))
+
+            if not postings:
+                ordinals = range(low, min(high, low + limit + 1))
+            else:
+                # Walk the shortest list, probing the others
+                postings.sort(key=len)
+                driver, others = postings[0], postings[1:]
+                ordinals = []
+                for i in range(bisect_left(driver, low), len(driver)):
+                    ordinal = driver[i]
+                    if ordinal >= high or len(ordinals) > limit:
+                        break
+                    if all(_contains(other, ordinal) for other in others):
+                        ordinals.append(ordinal)
+
+            page = [(ordinal, self._refs[ordinal]) for ordinal in ordinals]
+        return page[:limit], len(page) > limit
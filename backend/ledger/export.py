@@ -0,0 +1,108 @@
+"""
+Streaming ledger export
+Blocks are written in height order, one row each, as NDJSON or CSV, read
+one at a time from the ledger so memory stays constant whatever the chain
+length. Every row carries a running hash
+
+    running_hash = sha256(previous running_hash + block hash)
+
+seeded with 64 zeros. A receiver recomputes it row by row (ExportVerifier)
+along with each block's own hash and link, so a truncated, reordered or
+altered export is caught without waiting for the end. To resume, request
+from the next height and pass the last running hash received as the seed.
+"""
+
+import csv
+import hashlib
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from ledger.blocks import verify_block
+
+EXPORT_FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_COLUMNS = ["height", "timestamp", "event_count", "hash", "previous_hash", "running_hash", "block"]
+ZERO_HASH = "0" * 64
+
+
+def next_running_hash(running_hash: str, block_hash: str) -> str:
+    return hashlib.sha256((running_hash + block_hash).encode()).hexdigest()
+
+
+def _csv_line(values) -> str:
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerow(values)
+    return out.getvalue()
+
+
+def export_chain(
+    blocks: Iterable[Dict[str, Any]],
+    fmt: str = "ndjson",
+    running_hash: Optional[str] = None,
+    header: bool = True
+) -> Iterator[str]:
+    """Serialize blocks (e.g. LocalLedger.iter_blocks(height)) as export rows."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    running = running_hash or ZERO_HASH
+    if fmt == "csv" and header:
+        yield _csv_line(CSV_COLUMNS)
+    for block in blocks:
+        running = next_running_hash(running, block["hash"])
+        if fmt == "ndjson":
+            yield json.dumps({"height": block["index"], "running_hash": running, "block": block},
+                             separators=(",", ":")) + "\n"
+        else:
+            yield _csv_line([
+                block["index"],
+                block["timestamp"],
+                block.get("event_count", 1),
+                block["hash"],
+                block["previous_hash"],
+                running,
+                json.dumps(block, separators=(",", ":")),
+            ])
+
+
+class ExportVerifier:
+    """
+    Checks export rows as they arrive: block hash, link to the previous
+    block, consecutive heights and the running hash.
+    """
+
+    def __init__(self, running_hash: Optional[str] = None, previous_hash: Optional[str] = None):
+        self.running_hash = running_hash or ZERO_HASH
+        self.previous_hash = previous_hash
+        self.height: Optional[int] = None
+        self.rows = 0
+
+    def feed(self, height: int, block: Dict[str, Any], running_hash: str) -> None:
+        """Raises ValueError at the first row that does not check out."""
+        if self.height is not None and height != self.height + 1:
+            raise ValueError(f"Expected height {self.height + 1}, got {height}")
+        if block.get("index") != height:
+            raise ValueError(f"Row {height} holds block {block.get('index')}")
+        if not verify_block(block):
+            raise ValueError(f"Block {height} does not match its hash")
+        if self.previous_hash is not None and block["previous_hash"] != self.previous_hash:
+            raise ValueError(f"Block {height} does not link to block {height - 1}")
+        expected = next_running_hash(self.running_hash, block["hash"])
+        if running_hash != expected:
+            raise ValueError(f"Running hash mismatch at height {height}")
+        self.running_hash = expected
+        self.previous_hash = block["hash"]
+        self.height = height
+        self.rows += 1
+
+    def feed_line(self, line: str, fmt: str = "ndjson") -> None:
+        """Feed one NDJSON line or one CSV data row (header rows are skipped)."""
+        if fmt == "ndjson":
+            row = json.loads(line)
+            self.feed(row["height"], row["block"], row["running_hash"])
+            return
+        values = next(csv.reader([line]))
+        if values == CSV_COLUMNS:
+            return
+        row = dict(zip(CSV_COLUMNS, values))
+        self.feed(int(row["height"]), json.loads(row["block"]), row["running_hash"])
@@ -1,47 +1,381 @@
-import hashlib
 import json
+import os
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Any
+from itertools import islice
+from typing import Iterator, List, Dict, Any, Optional
+
+from ledger import encoding
+from ledger.blocks import calculate_hash, leaf_hasher, verify_block, verify_sequence
+from ledger.event_index import EventIndex, block_events
+from ledger.merkle import merkle_proof, merkle_root
+from ledger.segment_log import SegmentLog
+from ledger.verifier import CheckpointStore, verify_full_parallel
+
+
+class _PendingBatch:
+    """Events waiting to be sealed into the next block."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.opened = time.monotonic()
+        self.events: List[Dict[str, Any]] = []
+        self.sealed = threading.Event()
+        self.seq = 0
+
 
 class LocalLedger:
-    def __init__(self):
-        self.chain: List[Dict[str, Any]] = []
+    """
+    Hash-chained audit ledger.
+    Without a directory the chain lives in memory; with one, blocks are
+    appended to segment files of at most segment_bytes (see
+    ledger.segment_log). Only the active segment is kept in memory; sealed
+    ones are read by height through their offset index and mmap.
+
+    With batch_max > 1, events are collected for up to batch_window_ms (or
+    batch_max events) and sealed into one block under a Merkle root; the
+    block hash covers the header only, and each event gets an id
+    "<block>:<position>" that inclusion_proof resolves.
+
+    verify() resumes from a signed checkpoint (see ledger.verifier);
+    verify(full=True) re-hashes everything, in parallel when workers > 1.
+
+    New blocks are hashed with the binary encoding (ledger.encoding);
+    block_version=0 keeps writing JSON-hashed blocks.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        commit_interval_ms: float = 5.0,
+        commit_max: int = 256,
+        batch_max: int = 0,
+        batch_window_ms: float = 50.0,
+        checkpoint_key: Optional[bytes] = None,
+        block_version: int = encoding.VERSION,
+        segment_bytes: int = 16 * 1024 * 1024
+    ):
+        self.block_version = block_version
+        self._next_header = None
+        self._cond = threading.Condition()
+        self._memory: List[Dict[str, Any]] = []
+        self._log = SegmentLog(directory, commit_interval_ms, commit_max, segment_bytes) if directory else None
+        self._checkpoints = CheckpointStore(
+            checkpoint_key or os.urandom(32),
+            self._log.directory / "checkpoint.json" if self._log is not None else None
+        )
+        self._verify_lock = threading.Lock()
+        self._events = EventIndex()
+        self._tail: Optional[Dict[str, Any]] = None
         self._initialize_chain()
 
+        self.batch_max = batch_max
+        self.batch_window = batch_window_ms / 1000.0
+        self._batch: Optional[_PendingBatch] = None
+        self._closing = False
+        self._batcher = None
+        if self.batching:
+            self._batcher = threading.Thread(target=self._batch_loop, name="ledger-batcher", daemon=True)
+            self._batcher.start()
+
+    @property
+    def batching(self) -> bool:
+        return self.batch_max > 1
+
     def _initialize_chain(self):
-        if not self.chain:
+        if self._log is not None:
+            # Restore from the last block only; history stays on disk
+            record = self._log.tail()
+            if record:
+                self._tail = json.loads(record)
+                self._prime_header(self._tail)
+        if self._tail is None:
             genesis_block = self._create_block(
                 data={"message": "Genesis Block"},
-                previous_hash="0" * 64
+                previous_hash="0" * 64,
+                index=0
             )
-            self.chain.append(genesis_block)
+            self._store(genesis_block)
 
-    def _create_block(self, data: Dict[str, Any], previous_hash: str) -> Dict[str, Any]:
+    def _create_block(self, data: Dict[str, Any], previous_hash: str, index: int) -> Dict[str, Any]:
         block = {
+            "index": index,
             "timestamp": datetime.now().isoformat(),
             "data": data,
             "previous_hash": previous_hash,
             "nonce": 0
         }
-        block["hash"] = self._calculate_hash(block)
+        return self._seal_hash(block)
+
+    def _create_batch_block(self, events: List[Dict[str, Any]], previous_hash: str, index: int) -> Dict[str, Any]:
+        block = {
+            "index": index,
+            "timestamp": datetime.now().isoformat(),
+            "event_count": len(events),
+            "previous_hash": previous_hash,
+            "nonce": 0,
+        }
+        if self.block_version:
+            block["v"] = self.block_version
+        leaf = leaf_hasher(block)
+        block["merkle_root"] = merkle_root([leaf(e) for e in events])
+        block["events"] = events
+        return self._seal_hash(block)
+
+    def _seal_hash(self, block: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.block_version:
+            block["hash"] = self._calculate_hash(block)
+            return block
+        block["v"] = self.block_version
+        header = self._next_header if block["index"] > 0 else None
+        block["hash"] = encoding.block_hash(block, header)
         return block
 
+    def _prime_header(self, block: Dict[str, Any]) -> None:
+        """Hash the next block's header now; it only depends on this block."""
+        if self.block_version:
+            self._next_header = encoding.header_hasher(block["index"] + 1, block["hash"])
+
     def _calculate_hash(self, block: Dict[str, Any]) -> str:
-        block_string = json.dumps({k: v for k, v in block.items() if k != "hash"}, sort_keys=True).encode()
-        return hashlib.sha256(block_string).hexdigest()
+        return calculate_hash(block)
+
+    def _store(self, block: Dict[str, Any]) -> int:
+        self._tail = block
+        self._prime_header(block)
+        if self._events.loaded:
+            self._events.add_block(block)
+        if self._log is None:
+            self._memory.append(block)
+            return 0
+        return self._log.append(json.dumps(block, separators=(",", ":")).encode())
+
+    @property
+    def height(self) -> int:
+        """Index of the latest sealed block."""
+        return self._tail.get("index", 0)
+
+    def append_entry(self, data: Dict[str, Any], durable: bool = True) -> Dict[str, Any]:
+        """
+        Chain a new block onto the tail (or add the event to the open batch).
+        With durable=True the call returns once the block is sealed and its
+        group commit is fsynced.
+        """
+        if self.batching:
+            return self._append_batched(data, durable)
 
-    def append_entry(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        previous_block = self.chain[-1]
-        new_block = self._create_block(data, previous_block["hash"])
-        self.chain.append(new_block)
+        with self._cond:
+            previous_block = self._tail
+            new_block = self._create_block(data, previous_block["hash"], previous_block.get("index", 0) + 1)
+            seq = self._store(new_block)
+        if durable and self._log is not None:
+            self._log.wait_durable(seq)
         return new_block
 
-    def verify_integrity(self) -> bool:
-        for i in range(1, len(self.chain)):
-            current = self.chain[i]
-            previous = self.chain[i-1]
-            if current["previous_hash"] != previous["hash"]:
-                return False
-            if current["hash"] != self._calculate_hash(current):
-                return False
-        return True
+    def _append_batched(self, data: Dict[str, Any], durable: bool) -> Dict[str, Any]:
+        event = {"timestamp": datetime.now().isoformat(), "data": data}
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("Ledger is closed")
+            if self._batch is None:
+                self._batch = _PendingBatch(self.height + 1)
+                self._cond.notify_all()
+            batch = self._batch
+            position = len(batch.events)
+            batch.events.append(event)
+            if len(batch.events) >= self.batch_max:
+                self._seal_locked()
+
+        if durable:
+            batch.sealed.wait()
+            if self._log is not None:
+                self._log.wait_durable(batch.seq)
+        return {"event_id": f"{batch.index}:{position}", "block_index": batch.index, "position": position, **event}
+
+    def flush(self) -> None:
+        """Seal the open batch (if any) and wait until everything appended is durable."""
+        with self._cond:
+            if self._batch is not None:
+                self._seal_locked()
+        if self._log is not None:
+            self._log.sync()
+
+    def _seal_locked(self) -> None:
+        batch, self._batch = self._batch, None
+        block = self._create_batch_block(batch.events, self._tail["hash"], batch.index)
+        batch.seq = self._store(block)
+        batch.sealed.set()
+
+    def _batch_loop(self) -> None:
+        with self._cond:
+            while True:
+                if self._batch is None:
+                    if self._closing:
+                        return
+                    self._cond.wait()
+                    continue
+                remaining = self._batch.opened + self.batch_window - time.monotonic()
+                if remaining > 0 and not self._closing:
+                    self._cond.wait(remaining)
+                    continue
+                self._seal_locked()
+
+    def iter_blocks(self, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yield blocks from `start` to the tail without holding the chain in memory."""
+        if self._log is None:
+            yield from self._memory[start:]
+            return
+        # One block per record, so block N is record N
+        for record in self._log.iter_records(start):
+            yield json.loads(record)
+
+    def get_block(self, index: int) -> Optional[Dict[str, Any]]:
+        if index < 0 or index > self.height:
+            return None
+        if self._log is None:
+            return self._memory[index]
+        record = self._log.read(index)
+        return json.loads(record) if record is not None else None
+
+    def _ensure_event_index(self) -> None:
+        """Build the event index on first use, then keep it current from _store."""
+        if self._events.loaded:
+            return
+        self._events.load(self.iter_blocks(self._events.next_block))
+        with self._cond:
+            # Appends are held off only while the last few blocks are caught up
+            self._events.load(self.iter_blocks(self._events.next_block))
+            self._events.loaded = True
+
+    def query_events(
+        self,
+        entity_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Events matching every given filter, oldest first, one page at a time.
+        Pass the returned next_cursor back to continue; it is None on the last page.
+        Raises ValueError for a malformed cursor.
+        """
+        self._ensure_event_index()
+        after = int(cursor) if cursor else -1
+        page, has_more = self._events.query(entity_id, event_type, since, until, after, limit)
+
+        blocks: Dict[int, Dict[str, Any]] = {}
+        events = []
+        for _, (index, position) in page:
+            if index not in blocks:
+                blocks[index] = self.get_block(index)
+            block = blocks[index]
+            _, timestamp, data = block_events(block)[position]
+            events.append({
+                "event_id": f"{index}:{position}",
+                "block_index": index,
+                "block_hash": block["hash"],
+                "timestamp": timestamp,
+                "data": data,
+            })
+        return {
+            "events": events,
+            "next_cursor": str(page[-1][0]) if has_more and page else None,
+        }
+
+    @property
+    def chain(self) -> List[Dict[str, Any]]:
+        return list(self.iter_blocks())
+
+    def inclusion_proof(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Merkle inclusion proof for a batched event "<block>:<position>".
+        Returns None for unknown or not-yet-sealed events.
+        """
+        try:
+            index, position = (int(part) for part in event_id.split(":"))
+        except ValueError:
+            return None
+        block = self.get_block(index)
+        if not block or "events" not in block or not 0 <= position < len(block["events"]):
+            return None
+
+        leaf = leaf_hasher(block)
+        leaves = [leaf(e) for e in block["events"]]
+        return {
+            "event_id": event_id,
+            "event": block["events"][position],
+            "leaf_hash": leaves[position],
+            "proof": merkle_proof(leaves, position),
+            "merkle_root": block["merkle_root"],
+            "block_index": index,
+            "block_hash": block["hash"],
+        }
+
+    def verify_block(self, block: Dict[str, Any]) -> bool:
+        return verify_block(block)
+
+    def verify_integrity(self, full: bool = False, workers: int = 0) -> bool:
+        return self.verify(full=full, workers=workers)["valid"]
+
+    def verify(self, full: bool = False, workers: int = 0) -> Dict[str, Any]:
+        """
+        Verify the chain up to the current height and advance the checkpoint.
+        Incremental by default: only blocks after the last signed checkpoint
+        are re-hashed, and the checkpointed block must still carry its hash.
+        """
+        with self._verify_lock:
+            started = time.perf_counter()
+            height = self.height
+            checkpoint = None if full else self._checkpoints.load()
+            if checkpoint and checkpoint["height"] > height:
+                checkpoint = None  # ledger was replaced or truncated
+
+            if full and workers > 1 and self._log is not None and height > 0:
+                size = -(-(height + 1) // workers)
+                spans = []
+                for first in range(0, height + 1, size):
+                    spans.extend(self._log.spans(first, min(first + size, height + 1)))
+                valid, failed_at, last_hash = verify_full_parallel(spans, workers)
+                start = 0
+            else:
+                start = checkpoint["height"] if checkpoint else 0
+                blocks = islice(self.iter_blocks(start), height - start + 1)
+                if checkpoint:
+                    anchor = next(blocks, None)
+                    if anchor is None or anchor["hash"] != checkpoint["hash"]:
+                        valid, failed_at, last_hash = False, start, None
+                    else:
+                        valid, failed_at, _, last_hash = verify_sequence(blocks, anchor["hash"])
+                        last_hash = last_hash or anchor["hash"]
+                else:
+                    valid, failed_at, _, last_hash = verify_sequence(blocks)
+
+            if valid and last_hash:
+                checkpoint = self._checkpoints.save(height, last_hash)
+            return {
+                "valid": valid,
+                "mode": "full" if full else "incremental",
+                "verified_from": start,
+                "height": height,
+                "failed_at": failed_at,
+                "checkpoint_height": checkpoint["height"] if checkpoint else None,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+
+    def close(self) -> None:
+        """Seal any open batch, then commit and release the segment file."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._batcher is not None:
+            self._batcher.join()
+        if self._log is not None:
+            self._log.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        stats = {"height": self.height, "persistent": self._log is not None, "batch_max": self.batch_max}
+        if self._log is not None:
+            stats.update(self._log.metrics())
+        return stats
@@ -0,0 +1,62 @@
+"""
+Merkle trees over ledger events
+Leaves and interior nodes are hashed with distinct prefixes so a leaf can
+never be passed off as a node. An odd node at any level is paired with itself.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List
+
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+
+def leaf_hash(event: Dict[str, Any]) -> str:
+    payload = json.dumps(event, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(_LEAF + payload).hexdigest()
+
+
+def _node_hash(left: str, right: str) -> str:
+    return hashlib.sha256(_NODE + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def _next_level(level: List[str]) -> List[str]:
+    return [
+        _node_hash(level[i], level[i + 1] if i + 1 < len(level) else level[i])
+        for i in range(0, len(level), 2)
+    ]
+
+
+def merkle_root(leaves: List[str]) -> str:
+    if not leaves:
+        return "0" * 64
+    level = leaves
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def merkle_proof(leaves: List[str], index: int) -> List[Dict[str, str]]:
+    """Sibling hashes from leaf `index` up to the root, each tagged with its side."""
+    proof = []
+    level = leaves
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling >= len(level):
+            sibling = index
+        proof.append({"hash": level[sibling], "side": "left" if sibling < index else "right"})
+        level = _next_level(level)
+        index //= 2
+    return proof
+
+
+def verify_inclusion(leaf: str, proof: List[Dict[str, str]], root: str) -> bool:
+    """Recompute the root from a leaf and its proof: O(log n) hashes."""
+    current = leaf
+    for step in proof:
+        if step["side"] == "left":
+            current = _node_hash(step["hash"], current)
+        else:
+            current = _node_hash(current, step["hash"])
+    return current == root
@@ -0,0 +1,477 @@
+"""
+Append-only segment files with group commit
+Records are newline-terminated JSON lines. Appends go to the OS buffer
+immediately; a committer thread flushes and fsyncs them in batches, and
+callers that need durability wait for their sequence number to be covered.
+
+The log is split into segments of at most segment_bytes, each named after
+the sequence number of its first record (segment-<base>.log). Only the
+active (last) segment is held in memory. When it fills up it is sealed:
+fsynced, given an offset index (segment-<base>.idx, one big-endian u64
+per record) and summarized by a snapshot record (segment-<base>.snap).
+Sealed segments are read through mmap, so a lookup by sequence number is
+one bisect over segment bases plus one index read, without touching the
+records before it. Startup reads the snapshots and the active segment
+only.
+
+A single process owns the directory: opening it takes an exclusive
+flock on <directory>/LOCK, and a second process (e.g. another uvicorn
+worker) fails with LedgerLockedError instead of interleaving appends.
+"""
+
+import json
+import logging
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, single-process use is not enforced
+    fcntl = None
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.metrics import LatencyWindow
+
+_TAIL_CHUNK = 4096
+_OFFSET = struct.Struct(">Q")
+# Sealed segments kept mapped at once; older mappings are closed and reopened on demand
+_MAX_MAPPED = 32
+
+Span = Tuple[int, str, int, int]  # (first sequence number, path, start offset, end offset)
+
+
+def segment_path(directory: Path, base: int, suffix: str = ".log") -> Path:
+    return directory / f"segment-{base:06d}{suffix}"
+
+
+def _summarize(base: int, count: int, size: int, first: bytes, last: bytes) -> Dict[str, Any]:
+    """Snapshot record for a sealed segment, taken from its first and last blocks."""
+    first_block, last_block = json.loads(first), json.loads(last)
+    return {
+        "base": base,
+        "count": count,
+        "bytes": size,
+        "first_index": first_block.get("index"),
+        "last_index": last_block.get("index"),
+        "first_previous_hash": first_block.get("previous_hash"),
+        "last_hash": last_block.get("hash"),
+        "first_timestamp": first_block.get("timestamp"),
+        "last_timestamp": last_block.get("timestamp"),
+        "sealed_at": time.time(),
+    }
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class _Mapped:
+    """Read-only mappings of a sealed segment and its offset index."""
+
+    def __init__(self, path: Path, size: int):
+        self._log_file = open(path, "rb")
+        self._idx_file = open(path.with_suffix(".idx"), "rb")
+        self.data = mmap.mmap(self._log_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = size
+
+    def offset(self, position: int) -> int:
+        if position * _OFFSET.size >= len(self.offsets):
+            return self.size
+        return _OFFSET.unpack_from(self.offsets, position * _OFFSET.size)[0]
+
+    def record(self, position: int) -> bytes:
+        start, end = self.offset(position), self.offset(position + 1)
+        return self.data[start:end - 1]  # without the newline
+
+    def close(self) -> None:
+        self.data.close()
+        self.offsets.close()
+        self._log_file.close()
+        self._idx_file.close()
+
+
+class LedgerLockedError(RuntimeError):
+    """Another process has the ledger directory open."""
+
+
+def _lock_directory(directory: Path):
+    """Hold an exclusive, non-blocking flock on the directory's LOCK file until closed."""
+    lock_file = open(directory / "LOCK", "a+b")
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        raise LedgerLockedError(
+            f"Ledger directory {directory} is in use by another process; "
+            "run a single worker per LEDGER_DIR"
+        )
+    return lock_file
+
+
+class SegmentLog:
+    def __init__(
+        self,
+        directory: str,
+        commit_interval_ms: float = 5.0,
+        commit_max: int = 256,
+        segment_bytes: int = 16 * 1024 * 1024
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_file = _lock_directory(self.directory)
+        self.commit_interval = commit_interval_ms / 1000.0
+        self.commit_max = max(1, commit_max)
+        self.segment_bytes = max(1, segment_bytes)
+
+        self._sealed: List[Dict[str, Any]] = []  # snapshot records, oldest first
+        self._bases: List[int] = []
+        self._mapped: "OrderedDict[int, _Mapped]" = OrderedDict()
+        self._map_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        try:
+            self._open_segments()
+        except Exception:
+            self._lock_file.close()
+            raise
+
+        self._cond = threading.Condition()
+        self._written = self.record_count
+        self._durable = self._written
+        self._closing = False
+
+        self.fsyncs = 0
+        self.rolls = 0
+        self.commit_latency = LatencyWindow()
+
+        self._committer = threading.Thread(target=self._commit_loop, name="ledger-commit", daemon=True)
+        self._committer.start()
+
+    # Startup
+
+    def _open_segments(self) -> None:
+        bases = sorted(int(p.stem.split("-", 1)[1]) for p in self.directory.glob("segment-*.log"))
+        if not bases:
+            bases = [0]
+        for base in bases[:-1]:
+            snapshot = self._load_sealed(base)
+            if self._sealed and base != self._sealed[-1]["base"] + self._sealed[-1]["count"]:
+                raise RuntimeError(f"Ledger segment {segment_path(self.directory, base)} is out of sequence")
+            self._sealed.append(snapshot)
+            self._bases.append(base)
+
+        self.active_base = bases[-1]
+        if self._sealed and self.active_base != self._sealed[-1]["base"] + self._sealed[-1]["count"]:
+            raise RuntimeError(f"Ledger segment {segment_path(self.directory, self.active_base)} is out of sequence")
+        self.path = segment_path(self.directory, self.active_base)
+        self._repair_tail()
+        self._records: List[bytes] = []
+        self._offsets: List[int] = []
+        self._active_size = 0
+        if self.path.exists():
+            with open(self.path, "rb") as f:
+                for line in f:
+                    self._offsets.append(self._active_size)
+                    self._records.append(line.rstrip(b"\n"))
+                    self._active_size += len(line)
+        self._file = open(self.path, "ab")
+
+    def _load_sealed(self, base: int) -> Dict[str, Any]:
+        """Snapshot of a sealed segment, rebuilding its index and snapshot when missing or stale."""
+        path = segment_path(self.directory, base)
+        size = path.stat().st_size
+        snapshot = None
+        try:
+            with open(path.with_suffix(".snap"), "rb") as f:
+                snapshot = json.load(f)
+            index_size = path.with_suffix(".idx").stat().st_size
+            if snapshot["bytes"] != size or index_size != snapshot["count"] * _OFFSET.size:
+                snapshot = None
+        except (OSError, ValueError, KeyError):
+            snapshot = None
+        if snapshot is not None:
+            return snapshot
+
+        # Interrupted seal (or a segment from before indexes): rebuild from the records
+        logging.getLogger(__name__).warning(f"Rebuilding index and snapshot for ledger segment {path}")
+        offsets = bytearray()
+        first = last = b""
+        position = count = 0
+        with open(path, "rb") as f:
+            for line in f:
+                offsets += _OFFSET.pack(position)
+                position += len(line)
+                count += 1
+                last = line.rstrip(b"\n")
+                if count == 1:
+                    first = last
+        _write_atomic(path.with_suffix(".idx"), bytes(offsets))
+        snapshot = _summarize(base, count, size, first, last)
+        _write_atomic(path.with_suffix(".snap"), json.dumps(snapshot).encode())
+        return snapshot
+
+    def _repair_tail(self) -> None:
+        """Drop a torn final record left by a crash mid-write."""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            end = self._last_newline(f, size)
+            f.truncate(end)
+            logging.getLogger(__name__).warning(
+                f"Ledger segment {self.path} had a torn tail; truncated {size - end} bytes"
+            )
+
+    @staticmethod
+    def _last_newline(f, before: int) -> int:
+        """Offset just past the last newline before `before`, or 0."""
+        position = before
+        while position > 0:
+            start = max(0, position - _TAIL_CHUNK)
+            f.seek(start)
+            chunk = f.read(position - start)
+            index = chunk.rfind(b"\n")
+            if index >= 0:
+                return start + index + 1
+            position = start
+        return 0
+
+    # Writing
+
+    @property
+    def record_count(self) -> int:
+        return self.active_base + len(self._records)
+
+    def append(self, record: bytes) -> int:
+        """Buffer one record; returns its sequence number for wait_durable."""
+        line = record + b"\n"
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("Ledger segment is closed")
+            if self._records and self._active_size + len(line) > self.segment_bytes:
+                self._roll_locked()
+            self._file.write(line)
+            self._offsets.append(self._active_size)
+            self._records.append(record)
+            self._active_size += len(line)
+            self._written += 1
+            seq = self._written
+            self._cond.notify_all()
+        return seq
+
+    def _roll_locked(self) -> None:
+        """Seal the active segment and start the next one (called with _cond held)."""
+        with self._sync_lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        _write_atomic(self.path.with_suffix(".idx"), b"".join(_OFFSET.pack(o) for o in self._offsets))
+        snapshot = _summarize(
+            self.active_base, len(self._records), self._active_size, self._records[0], self._records[-1]
+        )
+        _write_atomic(self.path.with_suffix(".snap"), json.dumps(snapshot).encode())
+        self._sealed.append(snapshot)
+        self._bases.append(self.active_base)
+
+        self.active_base += len(self._records)
+        self.path = segment_path(self.directory, self.active_base)
+        self._records, self._offsets, self._active_size = [], [], 0
+        self._file = open(self.path, "ab")
+        # Everything written so far was in the sealed segment, which is now fsynced
+        self._durable = self._written
+        self.rolls += 1
+
+    def wait_durable(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Block until record `seq` has been fsynced."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._durable >= seq, timeout)
+
+    def sync(self, timeout: Optional[float] = None) -> bool:
+        """Block until every record appended so far has been fsynced."""
+        with self._cond:
+            target = self._written
+        return self.wait_durable(target, timeout)
+
+    def _commit_loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._written > self._durable or self._closing)
+                if self._written == self._durable and self._closing:
+                    return
+                # Let concurrent appends join the batch, up to commit_max
+                deadline = time.monotonic() + self.commit_interval
+                while self._written - self._durable < self.commit_max and not self._closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                target = self._written
+                f = self._file
+                f.flush()
+
+            started = time.perf_counter()
+            with self._sync_lock:
+                # A roll in between has already fsynced and closed this file
+                if not f.closed:
+                    os.fsync(f.fileno())
+            self.commit_latency.observe(time.perf_counter() - started)
+
+            with self._cond:
+                self.fsyncs += 1
+                self._durable = max(self._durable, target)
+                self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Push buffered records to the OS so other readers of the file see them."""
+        with self._cond:
+            if not self._file.closed:
+                self._file.flush()
+
+    # Reading
+
+    def _map(self, position: int) -> _Mapped:
+        """Mapping of sealed segment `position`; call with _map_lock held."""
+        snapshot = self._sealed[position]
+        base = snapshot["base"]
+        mapped = self._mapped.get(base)
+        if mapped is None:
+            mapped = _Mapped(segment_path(self.directory, base), snapshot["bytes"])
+            self._mapped[base] = mapped
+            if len(self._mapped) > _MAX_MAPPED:
+                self._mapped.popitem(last=False)[1].close()
+        else:
+            self._mapped.move_to_end(base)
+        return mapped
+
+    def read(self, seq: int) -> Optional[bytes]:
+        """Record number `seq` (0-based), or None past the end."""
+        with self._cond:
+            if seq >= self.active_base:
+                position = seq - self.active_base
+                return self._records[position] if 0 <= position < len(self._records) else None
+            sealed = len(self._sealed)
+        if seq < 0:
+            return None
+        position = bisect_right(self._bases, seq, 0, sealed) - 1
+        with self._map_lock:
+            return self._map(position).record(seq - self._bases[position])
+
+    def tail(self) -> Optional[bytes]:
+        """Last complete record."""
+        count = self.record_count
+        return self.read(count - 1) if count else None
+
+    def iter_records(self, start: int = 0) -> Iterator[bytes]:
+        """Yield records from sequence number `start` to the current end, oldest first."""
+        with self._cond:
+            end = self.record_count
+            sealed = len(self._sealed)
+        seq = max(0, start)
+        position = max(0, bisect_right(self._bases, seq, 0, sealed) - 1)
+        while seq < end and position < sealed:
+            snapshot = self._sealed[position]
+            stop = min(end, snapshot["base"] + snapshot["count"])
+            while seq < stop:
+                with self._map_lock:
+                    record = self._map(position).record(seq - snapshot["base"])
+                yield record
+                seq += 1
+            position += 1
+        while seq < end:
+            with self._cond:
+                # The active segment may have been sealed since; fall back to read()
+                position = seq - self.active_base
+                record = self._records[position] if position >= 0 else None
+            yield record if record is not None else self.read(seq)
+            seq += 1
+
+    def spans(self, start: int, end: int) -> List[Span]:
+        """Byte ranges covering records [start, end), cut at segment boundaries."""
+        self.flush()
+        result = []
+        with self._cond:
+            sealed = len(self._sealed)
+            active = (self.active_base, str(self.path), list(self._offsets), self._active_size)
+        seq = start
+        for position in range(max(0, bisect_right(self._bases, seq, 0, sealed) - 1), sealed):
+            snapshot = self._sealed[position]
+            stop = min(end, snapshot["base"] + snapshot["count"])
+            if seq >= stop:
+                continue
+            with self._map_lock:
+                mapped = self._map(position)
+                result.append((
+                    seq,
+                    str(segment_path(self.directory, snapshot["base"])),
+                    mapped.offset(seq - snapshot["base"]),
+                    mapped.offset(stop - snapshot["base"]),
+                ))
+            seq = stop
+        base, path, offsets, size = active
+        if seq < end:
+            stop = end - base
+            result.append((seq, path, offsets[seq - base], offsets[stop] if stop < len(offsets) else size))
+        return result
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """Snapshot records of sealed segments plus a summary of the active one."""
+        with self._cond:
+            active = {
+                "base": self.active_base,
+                "count": len(self._records),
+                "bytes": self._active_size,
+                "active": True,
+            }
+            return list(self._sealed) + [active]
+
+    def close(self) -> None:
+        """Commit everything buffered and stop the committer."""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._committer.join()
+        self._file.close()
+        with self._map_lock:
+            for mapped in self._mapped.values():
+                mapped.close()
+            self._mapped.clear()
+        # Releases the flock
+        self._lock_file.close()
+
+    def metrics(self) -> dict:
+        with self._cond:
+            written, durable, fsyncs = self._written, self._durable, self.fsyncs
+            sealed_bytes = sum(s["bytes"] for s in self._sealed)
+            segments, active_records = len(self._sealed) + 1, len(self._records)
+        return {
+            "path": str(self.path),
+            "records_written": written,
+            "records_durable": durable,
+            "fsyncs": fsyncs,
+            "records_per_fsync": round(durable / fsyncs, 2) if fsyncs else 0.0,
+            "fsync": self.commit_latency.summary(),
+            "segments": segments,
+            "segment_rolls": self.rolls,
+            "sealed_bytes": sealed_bytes,
+            "active_records": active_records,
+            "mapped_segments": len(self._mapped),
+        }
@@ -0,0 +1,161 @@
+"""
+Ledger verification: signed checkpoints, parallel deep audits and a
+background verifier
+
+Incremental verification starts from the last checkpoint, an HMAC-signed
+(height, hash) pair, so routine checks only re-hash blocks appended since.
+A full audit ignores the checkpoint and re-hashes the whole chain, split
+into contiguous byte spans of the segment files, each verified in a
+separate process over a read-only mapping; the parent then checks that
+adjacent spans link up.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import mmap
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ledger.blocks import verify_sequence
+from ledger.segment_log import Span
+
+
+class CheckpointStore:
+    """Last verified (height, hash), signed so a tampered checkpoint is rejected."""
+
+    def __init__(self, key: bytes, path: Optional[Path] = None):
+        self._key = key
+        self.path = path
+        self._current: Optional[Dict[str, Any]] = None
+
+    def _sign(self, checkpoint: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            {k: checkpoint[k] for k in ("height", "hash", "verified_at")}, sort_keys=True
+        ).encode()
+        return hmac.new(self._key, payload, hashlib.sha256).hexdigest()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """The stored checkpoint, or None when missing or its signature does not match."""
+        checkpoint = self._current
+        if checkpoint is None and self.path is not None and self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    checkpoint = json.load(f)
+            except (OSError, ValueError):
+                checkpoint = None
+        if checkpoint is None:
+            return None
+        if not hmac.compare_digest(checkpoint.get("signature", ""), self._sign(checkpoint)):
+            logging.getLogger(__name__).warning("Ledger checkpoint signature mismatch; ignoring it")
+            self._current = None
+            return None
+        self._current = checkpoint
+        return checkpoint
+
+    def save(self, height: int, block_hash: str) -> Dict[str, Any]:
+        checkpoint = {"height": height, "hash": block_hash, "verified_at": datetime.now().isoformat()}
+        checkpoint["signature"] = self._sign(checkpoint)
+        if self.path is not None:
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(checkpoint, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        self._current = checkpoint
+        return checkpoint
+
+
+def _span_blocks(data: mmap.mmap, start: int, end: int) -> Iterator[Dict[str, Any]]:
+    while start < end:
+        stop = data.find(b"\n", start, end)
+        if stop < 0:
+            stop = end
+        yield json.loads(data[start:stop])
+        start = stop + 1
+
+
+def verify_span(path: str, start: int, end: int) -> Tuple[bool, Optional[int], Optional[str], Optional[str]]:
+    """Worker entry point: verify the blocks in bytes [start, end) of a segment file."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return verify_sequence(_span_blocks(data, start, end))
+
+
+def verify_full_parallel(spans: List[Span], workers: int) -> Tuple[bool, Optional[int], Optional[str]]:
+    """
+    Deep audit of the blocks in `spans` (see SegmentLog.spans), `workers` at a time.
+    Returns (valid, failed_index, hash_of_last_block).
+    """
+    with ProcessPoolExecutor(max_workers=min(workers, len(spans))) as executor:
+        results = list(executor.map(
+            verify_span,
+            [path for _, path, _, _ in spans],
+            [start for _, _, start, _ in spans],
+            [end for _, _, _, end in spans]
+        ))
+
+    previous_last = None
+    for (first, _, _, _), (valid, failed_at, first_previous, last_hash) in zip(spans, results):
+        if not valid:
+            return False, failed_at, None
+        # Each span must continue from where the one before ended
+        if previous_last is not None and first_previous != previous_last:
+            return False, first, None
+        previous_last = last_hash
+    return True, None, previous_last
+
+
+class BackgroundVerifier:
+    """Runs incremental verification periodically, advancing the checkpoint."""
+
+    def __init__(self, ledger, interval_s: float):
+        self.ledger = ledger
+        self.interval = interval_s
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.runs = 0
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ledger-verifier", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                report = self.ledger.verify()
+            except Exception as e:
+                logging.getLogger(__name__).exception(f"Background ledger verification failed: {e}")
+                continue
+            self.runs += 1
+            self.last_report = report
+            if not report["valid"]:
+                self.failures += 1
+                logging.getLogger(__name__).error(
+                    f"Ledger integrity check failed at block {report['failed_at']}"
+                )
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "interval_s": self.interval,
+            "running": self._thread is not None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_report": self.last_report,
+        }
@@ -0,0 +1,139 @@
+"""
+Asynchronous ledger writer
+Callers hand events to a bounded queue and return immediately; one writer
+thread appends them to the ledger in arrival order.
+
+Durability modes:
+  - "async":  submit returns once the event is queued
+  - "commit": submit waits until the event's block is fsynced
+
+When the queue is full, submit blocks for up to block_timeout_ms
+(backpressure) and then drops the event; drops are counted, never raised.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+from core.metrics import LatencyWindow
+
+_STOP = object()
+
+# Events appended per writer wake-up before the commit wait
+_DRAIN_MAX = 256
+
+logger = logging.getLogger(__name__)
+
+
+class LedgerWriter:
+    def __init__(self, ledger, max_queue: int = 10000, mode: str = "async", block_timeout_ms: float = 50.0):
+        if mode not in ("async", "commit"):
+            raise ValueError(f"Unknown ledger write mode: {mode}")
+        self.ledger = ledger
+        self.mode = mode
+        self.block_timeout = block_timeout_ms / 1000.0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.commit_latency = LatencyWindow()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="ledger-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue an event; in commit mode, wait for and return its ledger receipt."""
+        if self._stopped:
+            # Late events during shutdown go straight to the ledger
+            return self.ledger.append_entry(data)
+        future: Optional[Future] = Future() if self.mode == "commit" else None
+        item = (data, future, time.perf_counter())
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.blocked += 1
+            try:
+                self._queue.put(item, timeout=self.block_timeout)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                logger.warning(f"Ledger queue full; dropped {data.get('event_type')} event")
+                return {"status": "dropped", "event_type": data.get("event_type")}
+
+        with self._lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        if future is not None:
+            return future.result()
+        return {"status": "queued", "event_type": data.get("event_type")}
+
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            while len(items) < _DRAIN_MAX:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is _STOP for item in items)
+            waiting = []
+            for item in items:
+                if item is _STOP:
+                    continue
+                data, future, enqueued = item
+                try:
+                    receipt = self.ledger.append_entry(data, durable=False)
+                except Exception as e:
+                    with self._lock:
+                        self.failed += 1
+                    logger.exception(f"Ledger append failed for {data.get('event_type')}: {e}")
+                    if future is not None:
+                        future.set_exception(e)
+                    continue
+                with self._lock:
+                    self.written += 1
+                waiting.append((future, receipt, enqueued))
+
+            if waiting and (self.mode == "commit" or stop):
+                # One durability wait covers every event appended above
+                self.ledger.flush()
+            now = time.perf_counter()
+            for future, receipt, enqueued in waiting:
+                self.commit_latency.observe(now - enqueued)
+                if future is not None:
+                    future.set_result(receipt)
+            if stop:
+                return
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Drain queued events into the ledger and stop the writer (shutdown hook)."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "mode": self.mode,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "blocked": self.blocked,
+                "failed": self.failed,
+            }
+        stats["write_latency"] = self.commit_latency.summary()
+        return stats
@@ -1,25 +1,38 @@
-from fastapi import FastAPI
-# Force reload
-from fastapi.middleware.cors import CORSMiddleware
-import sys
-from routes.donor_routes import donor_router
-import models.donor_schema
-print("DEBUG: sys.path:", sys.path)
-print("DEBUG: models.donor_schema file:", models.donor_schema.__file__)
-from routes.hospital_routes import hospital_router
-from routes.request_routes import request_router
-from routes.auth_routes import auth_router
-from routes.admin_routes import admin_router
-from routes.notification_routes import notification_router
-from routes.analysis_routes import analysis_router
-import database
+from core.startup import get_startup_profile
+
+startup = get_startup_profile()
+
+with startup.phase("import fastapi"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+# Routers only import their modules; services are built on first use (Depends)
+with startup.phase("import routers"):
+    from routes.donor_routes import donor_router
+    from routes.hospital_routes import hospital_router
+    from routes.request_routes import request_router
+    from routes.auth_routes import auth_router
+    from routes.admin_routes import admin_router
+    from routes.notification_routes import notification_router
+    from routes.analysis_routes import analysis_router
+
+with startup.phase("import database"):
+    import database
+from services.match_queue import get_match_queue
+from services.blockchain_service import close_ledger, get_ledger_verifier
+from services.stats_reconciler import get_stats_reconciler
 from utils.logger import setup_logging
 import logging
 from core.config import settings
 from core.error_handlers import AppError, app_exception_handler, generic_exception_handler
+from core.admission import AdmissionControlMiddleware
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
+# Throttle CPU-heavy routes; added before CORS so 429s still carry CORS headers
+if settings.ADMISSION_CONTROL:
+    app.add_middleware(AdmissionControlMiddleware)
+
 # Enable CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -46,7 +59,25 @@ def startup_event():
     # initialize logging and DB indexes
     setup_logging()
     logging.getLogger(__name__).info("Starting application, initializing DB indexes...")
-    database.init_db()
+    with startup.phase("init db"):
+        mock = database.init_db()
+    if mock and settings.SEED_MOCK_DATA:
+        with startup.phase("seed mock data"):
+            database.seed_mock_data()
+    with startup.phase("start match queue"):
+        get_match_queue().start()
+    # Opens the ledger segments and replays the active one
+    with startup.phase("open ledger"):
+        get_ledger_verifier().start()
+    with startup.phase("start stats reconciler"):
+        get_stats_reconciler().start()
+    startup.mark_ready()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    get_match_queue().stop()
+    get_stats_reconciler().stop()
+    close_ledger()
 
 @app.get("/")
 def root():
@@ -19,6 +19,8 @@ class DonorModel(BaseModel):
     email: str = Field(pattern=r"^\S+@\S+\.\S+$")
     mobile: str = Field(pattern=r"^\+?\d{7,15}$")
     address: str = Field(min_length=5)
+    latitude: Optional[float] = None  # Geocoded from address on write
+    longitude: Optional[float] = None
     blood_group: str = Field(pattern=r"^(A|B|AB|O)[+-]$")
     donate_blood: bool = True
     organs: list[str] = Field(default_factory=list)
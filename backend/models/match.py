@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class MatchRecord(BaseModel):
+    id: Optional[str] = None
+    request_id: str
+    donor_id: str
+    match_score: float = Field(ge=0, le=1)
+    components: List[float] = []  # Packed factor vector, see ai.advanced_matching.COMPONENT_KEYS
+    rank: int = 0  # 0 is the best match for the request
+    created_at: Optional[str] = None
@@ -14,10 +14,13 @@ class DonationRequest(BaseModel):
     organ: Annotated[str, Field(min_length=2, example="Liver")]
     quantity: Optional[int] = 1 # Units of blood
     hospital_location: str = Field(min_length=3)
+    latitude: Optional[float] = None  # Geocoded from hospital_location on write
+    longitude: Optional[float] = None
     urgency: Literal["low", "medium", "high", "critical"]
     required_date: str # ISO Date string
     health_condition: Optional[str] = None
     consent_agreement: bool = False
     status: Literal["pending", "matched", "fulfilled"] = "pending"
-    matches: List[dict] = []
+    matches: List[dict] = []  # Not stored; filled from the matches collection on list reads
+    match_count: int = 0
     created_at: Optional[str] = None
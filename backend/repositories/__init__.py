@@ -8,12 +8,14 @@ from .repository import (
 from .donor_repository import DonorRepository
 from .hospital_repository import HospitalRepository
 from .request_repository import RequestRepository
+from .match_repository import MatchRepository
 from .user_repository import UserRepository
 
 __all__ = [
     "DonorRepository",
     "HospitalRepository",
     "RequestRepository",
+    "MatchRepository",
     "UserRepository",
     "OldRepositoryFactory",
 ]
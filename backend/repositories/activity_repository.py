@@ -0,0 +1,147 @@
+"""
+Time-bucketed activity rollups
+One document per event per hour and per day in `activity_rollups`, e.g.
+
+    {"_id": "hour:requests:2026-10-19T13", "granularity": "hour",
+     "event": "requests", "start": datetime(2026, 10, 19, 13), "count": 4}
+
+Writes $inc the hour and day bucket of the event (UTC), so activity over
+any window is a sum over at most a few dozen bucket documents: whole days
+come from the daily buckets, the partial days at either end from hourly
+ones. A 90 day chart reads 90 documents no matter how many requests or
+matches there are.
+
+Events:
+  - registrations: donor profiles created
+  - requests:      donation requests created
+  - matches:       donor/request pairs newly stored by the matching
+                   pipeline (re-matching a request only counts new donors)
+  - fulfillments:  requests moved to "fulfilled"
+
+Windows are resolved to whole hours; rollups start counting when this
+collection is first written, earlier history is not backfilled.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "activity_rollups"
+
+EVENTS = ("registrations", "requests", "matches", "fulfillments")
+
+HOUR = "hour"
+DAY = "day"
+GRANULARITIES = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+
+# Index provisioned by database.init_db
+ROLLUP_INDEX = [("event", 1), ("granularity", 1), ("start", 1)]
+
+
+def _floor(at: datetime, granularity: str) -> datetime:
+    at = at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0) if granularity == DAY else at
+
+
+def _bucket_id(granularity: str, event: str, start: datetime) -> str:
+    key = start.strftime("%Y-%m-%d") if granularity == DAY else start.strftime("%Y-%m-%dT%H")
+    return f"{granularity}:{event}:{key}"
+
+
+def activity_events(scope: str, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Counter:
+    """Events produced by one write to `scope`, given the document before and after it."""
+    events: Counter = Counter()
+    if before is None and after is not None:
+        if scope == "donors":
+            events["registrations"] += 1
+        elif scope == "requests":
+            events["requests"] += 1
+    if scope == "requests" and after is not None and after.get("status") == "fulfilled":
+        if before is None or before.get("status") != "fulfilled":
+            events["fulfillments"] += 1
+    return events
+
+
+class ActivityRepository:
+    @property
+    def collection(self):
+        from core.db_instance import get_collection
+        return get_collection(COLLECTION)
+
+    def record(self, event: str, amount: int = 1, at: Optional[datetime] = None) -> None:
+        """Add `amount` occurrences of `event` to its hour and day buckets."""
+        if amount <= 0:
+            return
+        at = at or datetime.utcnow()
+        try:
+            for granularity in GRANULARITIES:
+                start = _floor(at, granularity)
+                # _id-only filter, so a concurrent first write is retried rather than lost
+                self.collection.update_one(
+                    {"_id": _bucket_id(granularity, event, start)},
+                    {"$inc": {"count": amount}, "$setOnInsert": {"granularity": granularity, "event": event, "start": start}},
+                    upsert=True
+                )
+        except Exception as e:
+            # Activity charts are advisory; never fail the write that produced the event
+            logger.warning(f"Activity rollup for {event} failed: {e}")
+
+    def record_change(self, scope: str, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        for event, amount in activity_events(scope, before, after).items():
+            self.record(event, amount)
+
+    def _sum(self, granularity: str, start: datetime, end: datetime, events: Iterable[str], totals: Counter) -> None:
+        if start >= end:
+            return
+        cursor = self.collection.find({
+            "granularity": granularity,
+            "event": {"$in": list(events)},
+            "start": {"$gte": start, "$lt": end},
+        })
+        for doc in cursor:
+            totals[doc["event"]] += doc.get("count", 0)
+
+    def totals(self, start: datetime, end: Optional[datetime] = None, events: Iterable[str] = EVENTS) -> Dict[str, int]:
+        """
+        Occurrences of each event in the hours from `start` (floored to the
+        hour) up to `end`: daily buckets for the whole days inside the window,
+        hourly buckets for the partial days at its edges.
+        """
+        events = list(events)
+        end = end or datetime.utcnow()
+        start = _floor(start, HOUR)
+        totals: Counter = Counter()
+        first_day = _floor(start, DAY)
+        if first_day < start:
+            first_day += GRANULARITIES[DAY]
+        last_day = _floor(end, DAY)
+        if first_day < last_day:
+            self._sum(HOUR, start, first_day, events, totals)
+            self._sum(DAY, first_day, last_day, events, totals)
+            self._sum(HOUR, last_day, end, events, totals)
+        else:
+            self._sum(HOUR, start, end, events, totals)
+        return {event: totals.get(event, 0) for event in events}
+
+    def series(self, event: str, start: datetime, end: Optional[datetime] = None, granularity: str = DAY) -> List[Dict[str, Any]]:
+        """One {"start", "count"} point per bucket from `start` to `end`, empty buckets included."""
+        end = end or datetime.utcnow()
+        step = GRANULARITIES[granularity]
+        start = _floor(start, granularity)
+        counts = {
+            doc["start"]: doc.get("count", 0)
+            for doc in self.collection.find({
+                "granularity": granularity,
+                "event": event,
+                "start": {"$gte": start, "$lt": end},
+            })
+        }
+        points = []
+        bucket = start
+        while bucket < end:
+            points.append({"start": bucket.isoformat(), "count": counts.get(bucket, 0)})
+            bucket += step
+        return points
@@ -0,0 +1,22 @@
+"""
+Aggregation pipeline builders
+Analytics group and count inside the database and only the per-group
+results cross the wire, so they cost O(groups) in transfer rather than
+O(documents). MockCollection.aggregate implements the stages used here.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+def group_count_pipeline(field: str, match: Optional[Dict[str, Any]] = None, unwind: bool = False) -> List[Dict[str, Any]]:
+    """Documents per distinct value of `field`, largest first; `unwind` counts each element of an array field."""
+    pipeline: List[Dict[str, Any]] = [{"$match": match}] if match else []
+    if unwind:
+        pipeline.append({"$unwind": f"${field}"})
+    pipeline.append({"$group": {"_id": f"${field}", "count": {"$sum": 1}}})
+    pipeline.append({"$sort": {"count": -1}})
+    return pipeline
+
+
+def group_count(collection, field: str, match: Optional[Dict[str, Any]] = None, unwind: bool = False) -> Dict[Any, int]:
+    return {doc["_id"]: doc["count"] for doc in collection.aggregate(group_count_pipeline(field, match, unwind))}
@@ -1,8 +1,11 @@
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from pydantic import BaseModel
+from pymongo import ReturnDocument
 from pymongo.collection import Collection
 from bson import ObjectId
 from utils.serialization import serialize_doc
+from repositories.aggregation import group_count
+from repositories.counter_repository import TRACKED_FIELDS
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -38,6 +41,7 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in_data = obj_in.dict()
         result = self.collection.insert_one(obj_in_data)
         created_doc = self.collection.find_one({"_id": result.inserted_id})
+        self._count_change(None, created_doc)
         return self.model(**serialize_doc(created_doc))
 
     def update(
@@ -54,7 +58,15 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         else:
             update_data = obj_in.dict(exclude_unset=True)
 
-        self.collection.update_one({"_id": id}, {"$set": update_data})
+        if self._counted_fields().intersection(update_data):
+            # Atomically capture the previous state so counters move by the exact delta
+            before = self.collection.find_one_and_update(
+                {"_id": id}, {"$set": update_data}, return_document=ReturnDocument.BEFORE
+            )
+            if before:
+                self._count_change(before, {**before, **update_data})
+        else:
+            self.collection.update_one({"_id": id}, {"$set": update_data})
         updated_doc = self.collection.find_one({"_id": id})
         if updated_doc:
             return self.model(**serialize_doc(updated_doc))
@@ -66,6 +78,11 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 id = ObjectId(id)
             except Exception:
                 pass
+        if self._counted_fields():
+            deleted = self.collection.find_one_and_delete({"_id": id})
+            if deleted:
+                self._count_change(deleted, None)
+            return deleted is not None
         result = self.collection.delete_one({"_id": id})
         return result.deleted_count > 0
 
@@ -73,5 +90,20 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         query = filter_query or {}
         return self.collection.count_documents(query)
 
+    def group_count(self, field: str, match: Optional[Dict[str, Any]] = None, unwind: bool = False) -> Dict[Any, int]:
+        """Documents per value of `field`, grouped by the database ($group)."""
+        return group_count(self.collection, field, match, unwind)
+
+    def _counted_fields(self) -> set:
+        return set(TRACKED_FIELDS.get(self.collection_name, ()))
+
+    def _count_change(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        """Keep the admin stats counters and activity rollups in step with this write
+        (see counter_repository and activity_repository)."""
+        if self.collection_name in TRACKED_FIELDS:
+            from repositories.repository import RepositoryFactory
+            RepositoryFactory.get_counter_repository().apply(self.collection_name, before, after)
+            RepositoryFactory.get_activity_repository().record_change(self.collection_name, before, after)
+
     def get_all(self) -> List[ModelType]:
         return self.get_multi(limit=1000) # Reasonable upper bound for this project
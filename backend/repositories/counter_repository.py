@@ -0,0 +1,202 @@
+"""
+Counter store behind the admin statistics
+One document per counter in `stats_counters`, for example
+
+    {"_id": "requests:status:pending", "scope": "requests",
+     "field": "status", "value": "pending", "count": 12}
+
+plus a "<scope>:total" document per tracked collection. Repositories call
+apply() with a document's state before and after every write; the
+difference becomes atomic $inc upserts, so stats are read from a few
+dozen counters instead of scanning every request and donor.
+
+A counter update can fail or race with a write that bypasses the
+repositories, so reconcile() recounts the source collections with $group
+pipelines and reports the drift it finds. The recount is not a snapshot,
+so a busy counter can look off by writes still in flight: an existing
+counter is only corrected once the same drift is seen on two consecutive
+runs, and then by $inc, so increments landing meanwhile are kept.
+"""
+
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from repositories.aggregation import group_count
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "stats_counters"
+
+# Fields counted per collection
+TRACKED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "requests": ("status", "urgency", "organ", "blood_group"),
+    "donors": ("blood_group", "organs", "availability"),
+    "hospitals": ("is_active",),
+}
+# Array fields: each element is counted, an empty or missing array counts nothing
+LIST_FIELDS = {"organs"}
+
+TOTAL = "total"
+
+
+def _value_key(value: Any) -> str:
+    if value is None:
+        return "unknown"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def counter_keys(scope: str, doc: Optional[Dict[str, Any]]) -> Counter:
+    """(field, value) -> 1 for every counter the document contributes to."""
+    keys: Counter = Counter()
+    if doc is None:
+        return keys
+    keys[(TOTAL, "")] += 1
+    for field in TRACKED_FIELDS[scope]:
+        value = doc.get(field)
+        if field in LIST_FIELDS:
+            items = value if isinstance(value, list) else ([] if value is None else [value])
+        else:
+            items = [value]
+        for item in items:
+            keys[(field, _value_key(item))] += 1
+    return keys
+
+
+def _counter_id(scope: str, field: str, value: str) -> str:
+    return f"{scope}:{TOTAL}" if field == TOTAL else f"{scope}:{field}:{value}"
+
+
+class CounterRepository:
+    def __init__(self):
+        # counter id -> drift (actual - stored) seen by the previous reconcile run
+        self._pending: Dict[str, int] = {}
+
+    @property
+    def collection(self):
+        from core.db_instance import get_collection
+        return get_collection(COLLECTION)
+
+    def _write(self, scope: str, field: str, value: str, update: Dict[str, Any]) -> None:
+        # Filter on _id alone: MongoDB retries an upsert that loses the race to
+        # create the document only when the filter is just the unique key
+        self.collection.update_one(
+            {"_id": _counter_id(scope, field, value)},
+            {**update, "$setOnInsert": {"scope": scope, "field": field, "value": value}},
+            upsert=True
+        )
+
+    def apply(self, scope: str, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        """Move the counters of `scope` from the document's old state to its new one."""
+        if scope not in TRACKED_FIELDS:
+            return
+        delta = counter_keys(scope, after)
+        delta.subtract(counter_keys(scope, before))
+        try:
+            for (field, value), amount in delta.items():
+                if amount:
+                    self._write(scope, field, value, {"$inc": {"count": amount}})
+        except Exception as e:
+            # The write itself succeeded; reconciliation repairs the counters
+            logger.warning(f"Counter update for {scope} failed: {e}")
+
+    def read(self, scope: str) -> Dict[str, Any]:
+        """{"total": n, "<field>": {value: count}} for one tracked collection."""
+        return self._fold(scope, self.collection.find({"scope": scope}))
+
+    def read_all(self) -> Dict[str, Dict[str, Any]]:
+        """read() for every tracked collection from a single pass over the counters."""
+        docs: Dict[str, list] = {scope: [] for scope in TRACKED_FIELDS}
+        for doc in self.collection.find({}):
+            docs.setdefault(doc["scope"], []).append(doc)
+        return {scope: self._fold(scope, docs[scope]) for scope in TRACKED_FIELDS}
+
+    @staticmethod
+    def _fold(scope: str, docs: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {TOTAL: 0}
+        stats.update({field: {} for field in TRACKED_FIELDS[scope]})
+        for doc in docs:
+            count = doc.get("count", 0)
+            if doc["field"] == TOTAL:
+                stats[TOTAL] = count
+            elif count and doc["field"] in stats:
+                stats[doc["field"]][doc["value"]] = count
+        return stats
+
+    def count(self, scope: str, field: str, value: Any) -> int:
+        doc = self.collection.find_one({"_id": _counter_id(scope, field, _value_key(value))})
+        return doc.get("count", 0) if doc else 0
+
+    def recount(self, scope: str) -> Counter:
+        """Count from scratch, one $group pipeline per tracked field of the source collection."""
+        from core.db_instance import get_collection
+        source = get_collection(scope)
+        counts: Counter = Counter()
+        total = source.count_documents({})
+        if total:
+            counts[(TOTAL, "")] = total
+        for field in TRACKED_FIELDS[scope]:
+            for value, count in group_count(source, field, unwind=field in LIST_FIELDS).items():
+                counts[(field, _value_key(value))] += count
+        return counts
+
+    def _stored(self, scope: str) -> Dict[Tuple[str, str], int]:
+        return {
+            (doc["field"], doc["value"]): doc.get("count", 0)
+            for doc in self.collection.find({"scope": scope})
+        }
+
+    def reconcile(self, scopes: Iterable[str] = tuple(TRACKED_FIELDS)) -> Dict[str, Any]:
+        """
+        Recount the tracked collections and report counters that disagree.
+        Missing counters are created right away (backfill). Existing ones
+        are corrected by the drift only when the previous run saw the same
+        drift, and counters that moved while the recount ran are skipped.
+        """
+        started = time.perf_counter()
+        drift: Dict[str, Dict[str, Any]] = {}
+        unsettled = 0
+        for scope in scopes:
+            before = self._stored(scope)
+            actual = self.recount(scope)
+            stored = self._stored(scope)
+            prefix = f"{scope}:"
+            previous = {k: v for k, v in self._pending.items() if k.startswith(prefix)}
+            for k in previous:
+                del self._pending[k]
+
+            for key in set(actual) | set(stored):
+                if before.get(key) != stored.get(key):
+                    # Written to during the recount; judge it next run
+                    unsettled += 1
+                    continue
+                delta = actual.get(key, 0) - stored.get(key, 0)
+                if not delta:
+                    continue
+                field, value = key
+                counter_id = _counter_id(scope, field, value)
+                if key not in stored:
+                    # Insert only: a concurrent apply() that creates it first wins
+                    self.collection.update_one(
+                        {"_id": counter_id},
+                        {"$setOnInsert": {"scope": scope, "field": field, "value": value, "count": actual[key]}},
+                        upsert=True
+                    )
+                    repaired = True
+                elif previous.get(counter_id) == delta:
+                    self._write(scope, field, value, {"$inc": {"count": delta}})
+                    repaired = True
+                else:
+                    self._pending[counter_id] = delta
+                    repaired = False
+                drift[counter_id] = {"stored": stored.get(key, 0), "actual": actual.get(key, 0), "repaired": repaired}
+        return {
+            "checked_at": datetime.utcnow().isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "drift": drift,
+            "unsettled": unsettled,
+        }
@@ -1,15 +1,32 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
+from bson import ObjectId
 from models.donor_schema import DonorModel
 from repositories.base_repository import BaseRepository
+from ai.geo import geocode
 
 class DonorRepository(BaseRepository[DonorModel, DonorModel, DonorModel]):
     def __init__(self):
         super().__init__("donors", DonorModel)
 
+    def create(self, obj_in: DonorModel) -> DonorModel:
+        # Geocode once at write time so matching never parses addresses
+        if obj_in.latitude is None:
+            coords = geocode(obj_in.address)
+            if coords:
+                obj_in = obj_in.copy(update={"latitude": coords[0], "longitude": coords[1]})
+        return super().create(obj_in)
+
+    def update(self, id: Any, obj_in: Union[DonorModel, Dict[str, Any]]) -> Optional[DonorModel]:
+        update_data = dict(obj_in) if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        if "address" in update_data and "latitude" not in update_data:
+            coords = geocode(update_data["address"]) or (None, None)
+            update_data["latitude"], update_data["longitude"] = coords
+        return super().update(id, update_data)
+
     def get_by_blood_group(self, blood_group: str) -> List[DonorModel]:
         cursor = self.collection.find({"blood_group": blood_group, "donate_blood": True, "availability": True})
         return [self.model(**self._serialize(doc)) for doc in cursor]
-    
+
     def get_by_organ(self, organ: str) -> List[DonorModel]:
         # The DonorModel has 'organs' list field, not 'organ'
         cursor = self.collection.find({"organs": organ, "availability": True})
@@ -19,6 +36,25 @@ class DonorRepository(BaseRepository[DonorModel, DonorModel, DonorModel]):
         doc = self.collection.find_one({"user_id": user_id})
         return self.model(**self._serialize(doc)) if doc else None
 
+    def availability_inventory(self) -> Dict[str, Dict[str, int]]:
+        """Available donors per blood group and pledged organs per organ, counted in the database."""
+        available = {"availability": True}
+        return {
+            "blood": self.group_count("blood_group", available),
+            "organs": self.group_count("organs", available, unwind=True),
+        }
+
+    def get_many_dicts(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch several donors in one query as serialized dicts."""
+        object_ids = []
+        for id in ids:
+            try:
+                object_ids.append(ObjectId(id))
+            except Exception:
+                object_ids.append(id)
+        cursor = self.collection.find({"_id": {"$in": object_ids}})
+        return [self._serialize(doc) for doc in cursor]
+
     def _serialize(self, doc: dict) -> dict:
         from utils.serialization import serialize_doc
         return serialize_doc(doc)
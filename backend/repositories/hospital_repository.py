@@ -10,6 +10,10 @@ class HospitalRepository(BaseRepository[Hospital, Hospital, Hospital]):
         doc = self.collection.find_one({"email": email})
         return self.model(**self._serialize(doc)) if doc else None
 
+    def get_by_name(self, hospital_name: str) -> Optional[Hospital]:
+        doc = self.collection.find_one({"hospital_name": hospital_name})
+        return self.model(**self._serialize(doc)) if doc else None
+
     def _serialize(self, doc: dict) -> dict:
         from utils.serialization import serialize_doc
         return serialize_doc(doc)
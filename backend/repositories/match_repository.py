@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Dict, Iterable, List
+from models.match import MatchRecord
+from repositories.base_repository import BaseRepository
+
+# Indexes provisioned by database.init_db
+MATCH_REQUEST_INDEX = [("request_id", 1), ("match_score", -1)]
+MATCH_DONOR_INDEX = [("donor_id", 1), ("match_score", -1)]
+
+
+class MatchRepository(BaseRepository[MatchRecord, MatchRecord, MatchRecord]):
+    """
+    Donor/request matches, one document per pair.
+    Kept out of the request documents so request reads stay small and
+    donor-side lookups go through the donor_id index.
+    """
+
+    def __init__(self):
+        super().__init__("matches", MatchRecord)
+
+    def replace_for_request(self, request_id: str, matches: List[dict]) -> int:
+        """Swap the stored matches of a request for a freshly ranked list."""
+        previous = {doc["donor_id"] for doc in self.collection.find({"request_id": request_id}, {"donor_id": 1})}
+        self.collection.delete_many({"request_id": request_id})
+        if not matches:
+            return 0
+        created_at = datetime.now().isoformat()
+        docs = [
+            {
+                "request_id": request_id,
+                "donor_id": str(m.get("donor_id")),
+                "match_score": m.get("match_score", 0),
+                "components": m.get("components", []),
+                "rank": rank,
+                "created_at": created_at,
+            }
+            for rank, m in enumerate(matches)
+        ]
+        self.collection.insert_many(docs)
+        # Re-matching re-inserts existing pairs; only donors new to the request count as activity
+        from repositories.repository import RepositoryFactory
+        RepositoryFactory.get_activity_repository().record(
+            "matches", sum(1 for doc in docs if doc["donor_id"] not in previous)
+        )
+        return len(docs)
+
+    def get_for_request(self, request_id: str, skip: int = 0, limit: int = 20) -> List[dict]:
+        """Matches of one request, best first."""
+        cursor = (
+            self.collection.find({"request_id": request_id})
+            .sort("match_score", -1).skip(skip).limit(limit)
+        )
+        return [self._serialize(doc) for doc in cursor]
+
+    def get_for_requests(self, request_ids: Iterable[str]) -> Dict[str, List[dict]]:
+        """Matches of several requests in one query, grouped by request and best first."""
+        grouped: Dict[str, List[dict]] = {}
+        cursor = self.collection.find({"request_id": {"$in": list(request_ids)}}).sort("match_score", -1)
+        for doc in cursor:
+            grouped.setdefault(doc["request_id"], []).append(self._serialize(doc))
+        return grouped
+
+    def get_for_donor(self, donor_id: str, skip: int = 0, limit: int = 20) -> List[dict]:
+        """Requests a donor has been matched to, best score first."""
+        cursor = (
+            self.collection.find({"donor_id": donor_id})
+            .sort("match_score", -1).skip(skip).limit(limit)
+        )
+        return [self._serialize(doc) for doc in cursor]
+
+    def count_for_request(self, request_id: str) -> int:
+        return self.count({"request_id": request_id})
+
+    def count_for_donor(self, donor_id: str) -> int:
+        return self.count({"donor_id": donor_id})
+
+    def delete_for_donor(self, donor_id: str) -> int:
+        return self.collection.delete_many({"donor_id": donor_id}).deleted_count
+
+    def score_summary(self) -> Dict[str, float]:
+        """Match count and average score over all stored matches, computed in the database."""
+        pipeline = [{"$group": {"_id": None, "count": {"$sum": 1}, "average_score": {"$avg": "$match_score"}}}]
+        for doc in self.collection.aggregate(pipeline):
+            return {"count": doc["count"], "average_score": doc["average_score"] or 0.0}
+        return {"count": 0, "average_score": 0.0}
+
+    def _serialize(self, doc: dict) -> dict:
+        from utils.serialization import serialize_doc
+        return serialize_doc(doc)
@@ -329,6 +329,10 @@ class RepositoryFactory:
     _donor_repo = None
     _hospital_repo = None
     _request_repo = None
+    _match_repo = None
+    _user_repo = None
+    _counter_repo = None
+    _activity_repo = None
     
     @classmethod
     def get_donor_repository(cls) -> DonorRepository:
@@ -353,3 +357,35 @@ class RepositoryFactory:
             from .request_repository import RequestRepository as NewRequestRepository
             cls._request_repo = NewRequestRepository()
         return cls._request_repo
+    
+    @classmethod
+    def get_match_repository(cls):
+        """Get or create match repository singleton."""
+        if cls._match_repo is None:
+            from .match_repository import MatchRepository
+            cls._match_repo = MatchRepository()
+        return cls._match_repo
+    
+    @classmethod
+    def get_user_repository(cls):
+        """Get or create user repository singleton."""
+        if cls._user_repo is None:
+            from .user_repository import UserRepository
+            cls._user_repo = UserRepository()
+        return cls._user_repo
+    
+    @classmethod
+    def get_counter_repository(cls):
+        """Get or create the stats counter repository singleton."""
+        if cls._counter_repo is None:
+            from .counter_repository import CounterRepository
+            cls._counter_repo = CounterRepository()
+        return cls._counter_repo
+    
+    @classmethod
+    def get_activity_repository(cls):
+        """Get or create the activity rollup repository singleton."""
+        if cls._activity_repo is None:
+            from .activity_repository import ActivityRepository
+            cls._activity_repo = ActivityRepository()
+        return cls._activity_repo
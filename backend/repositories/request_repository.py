@@ -1,4 +1,5 @@
-from typing import List
+from typing import Dict, List, Optional
+from bson import ObjectId
 from models.request import DonationRequest
 from repositories.base_repository import BaseRepository
 
@@ -10,11 +11,31 @@ class RequestRepository(BaseRepository[DonationRequest, DonationRequest, Donatio
         cursor = self.collection.find({"urgency": urgency})
         return [self.model(**self._serialize(doc)) for doc in cursor]
 
+    def get_many(self, ids: List[str]) -> List[DonationRequest]:
+        """Fetch several requests in one query."""
+        object_ids = []
+        for id in ids:
+            try:
+                object_ids.append(ObjectId(id))
+            except Exception:
+                object_ids.append(id)
+        cursor = self.collection.find({"_id": {"$in": object_ids}})
+        return [self.model(**self._serialize(doc)) for doc in cursor]
+
     def count_by_status(self, status: str) -> int:
         return self.count({"status": status})
 
+    def count_by_submitter(self) -> Dict[str, int]:
+        """Requests per submitting user (hospital or recipient), grouped in the database."""
+        counts = self.group_count("user_id", {"user_id": {"$ne": None}})
+        return {str(user_id): count for user_id, count in counts.items()}
+
+    def update_status(self, id: str, status: str) -> Optional[DonationRequest]:
+        return self.update(id, {"status": status})
+
     def find_urgent(self) -> List[DonationRequest]:
-        return self.get_by_urgency("urgent")
+        # "critical" is the highest urgency DonationRequest allows
+        return self.get_by_urgency("critical")
 
     def _serialize(self, doc: dict) -> dict:
         from utils.serialization import serialize_doc
@@ -16,6 +16,9 @@ class UserRepository(BaseRepository[User, User, User]):
     def update_status(self, user_id: str, is_active: bool) -> bool:
         return self.update(user_id, {"is_active": is_active}) is not None
 
+    def update_password(self, user_id: str, password_hash: str) -> bool:
+        return self.update(user_id, {"password_hash": password_hash}) is not None
+
     def _serialize(self, doc: dict) -> dict:
         from utils.serialization import serialize_doc
         return serialize_doc(doc)
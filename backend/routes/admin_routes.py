@@ -1,31 +1,117 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from services.blockchain_service import BlockchainService
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
+from fastapi.responses import StreamingResponse
+from services.blockchain_service import BlockchainService, get_blockchain_service
+from services.admin_service import AdminService, get_admin_service
+from services.principal_cache import get_principal_cache
+from services.stats_reconciler import get_stats_reconciler
 from routes.auth_routes import get_current_user, RoleChecker
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import json
 from core.db_instance import get_collection
 from utils.serialization import serialize_doc
 from pydantic import BaseModel
+from repositories.repository import RepositoryFactory
 from repositories.user_repository import UserRepository
-from services.donor_service import DonorService
-from services.matching_service import MatchingService
+from repositories.hospital_repository import HospitalRepository
+from repositories.donor_repository import DonorRepository
+from repositories.request_repository import RequestRepository
+from services.auth_service import AuthService, get_auth_service
+from services.matching_service import MatchingService, get_matching_service
+from core.metrics import collect_metrics
+from ledger.export import MEDIA_TYPES
 
 admin_router = APIRouter()
-blockchain_service = BlockchainService()
-user_repo = UserRepository()
-donor_service = DonorService()
-matching_service = MatchingService()
 
-@admin_router.get("/audit-trail", response_model=List[Dict[str, Any]], dependencies=[Depends(RoleChecker(["admin"]))])
-def get_audit_trail(current_user: Dict = Depends(get_current_user)):
-    return blockchain_service.get_full_chain()
+@admin_router.get("/audit-trail", dependencies=[Depends(RoleChecker(["admin"]))])
+def get_audit_trail(
+    entity_id: Optional[str] = Query(None, description="Donor/request id (match events also list the matched donor)"),
+    event_type: Optional[str] = Query(None, description="e.g. DONOR_REGISTRATION, HOSPITAL_REQUEST, MATCH_FOUND"),
+    since: Optional[str] = Query(None, description="ISO timestamp, inclusive"),
+    until: Optional[str] = Query(None, description="ISO timestamp, inclusive"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: Dict = Depends(get_current_user),
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
+):
+    """Ledger events matching the filters, oldest first, one page at a time."""
+    try:
+        return blockchain_service.query_audit_trail(entity_id, event_type, since, until, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 @admin_router.get("/integrity-check", dependencies=[Depends(RoleChecker(["admin"]))])
-def verify_ledger_integrity(current_user: Dict = Depends(get_current_user)):
-    is_valid = blockchain_service.verify_chain()
-    return {"integrity": is_valid, "message": "Ledger is valid" if is_valid else "Ledger has been tampered with!"}
+def verify_ledger_integrity(full: bool = Query(False, description="Re-hash the whole chain instead of resuming from the last checkpoint"), current_user: Dict = Depends(get_current_user), blockchain_service: BlockchainService = Depends(get_blockchain_service)):
+    report = blockchain_service.verify_chain_report(full=full)
+    is_valid = report["valid"]
+    return {"integrity": is_valid, "message": "Ledger is valid" if is_valid else "Ledger has been tampered with!", "report": report}
+
+@admin_router.get("/ledger/proof/{event_id}", dependencies=[Depends(RoleChecker(["admin"]))])
+def get_inclusion_proof(event_id: str, current_user: Dict = Depends(get_current_user), blockchain_service: BlockchainService = Depends(get_blockchain_service)):
+    """Merkle inclusion proof for a batched ledger event id ("<block>:<position>")."""
+    proof = blockchain_service.get_inclusion_proof(event_id)
+    if not proof:
+        raise HTTPException(status_code=404, detail="Event not found in a sealed batch")
+    return proof
+
+@admin_router.get("/ledger/export", dependencies=[Depends(RoleChecker(["admin"]))])
+def export_ledger(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    from_height: int = Query(0, ge=0, description="First block to export; resume with the height after the last row received"),
+    running_hash: Optional[str] = Query(None, pattern="^[0-9a-f]{64}$", description="Last running_hash received, when resuming"),
+    current_user: Dict = Depends(get_current_user),
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
+):
+    """
+    Stream the ledger in height order as NDJSON or CSV, each row with a
+    running hash the receiver can check as it reads (see ledger.export).
+    """
+    try:
+        rows = blockchain_service.export_chain(format, from_height, running_hash)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="ledger-{from_height}.{format}"'}
+    )
+
+@admin_router.get("/metrics", dependencies=[Depends(RoleChecker(["admin"]))])
+def get_metrics(current_user: Dict = Depends(get_current_user)):
+    return collect_metrics()
+
+@admin_router.get("/stats", dependencies=[Depends(RoleChecker(["admin"]))])
+def get_system_stats(current_user: Dict = Depends(get_current_user), admin_service: AdminService = Depends(get_admin_service)):
+    return admin_service.get_system_stats()
+
+@admin_router.get("/dashboard", dependencies=[Depends(RoleChecker(["admin"]))])
+def get_dashboard(current_user: Dict = Depends(get_current_user), admin_service: AdminService = Depends(get_admin_service)):
+    return admin_service.get_dashboard_summary()
+
+@admin_router.post("/stats/reconcile", dependencies=[Depends(RoleChecker(["admin"]))])
+def reconcile_stats(current_user: Dict = Depends(get_current_user)):
+    """Recount the stats counters from the collections now and report any drift."""
+    return get_stats_reconciler().run_once()
+
+@admin_router.get("/activity", dependencies=[Depends(RoleChecker(["admin"]))])
+def get_recent_activity(hours: int = Query(24, ge=1, le=24 * 366), current_user: Dict = Depends(get_current_user), admin_service: AdminService = Depends(get_admin_service)):
+    """Registrations, requests, matches and fulfillments in the last `hours`, summed from the activity rollups."""
+    return admin_service.get_recent_activity(hours)
+
+@admin_router.get("/activity/series", dependencies=[Depends(RoleChecker(["admin"]))])
+def get_activity_series(
+    event: str = Query(..., pattern="^(registrations|requests|matches|fulfillments)$"),
+    days: int = Query(90, ge=1, le=366),
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    current_user: Dict = Depends(get_current_user),
+    admin_service: AdminService = Depends(get_admin_service)
+):
+    """One point per hourly or daily bucket, for activity charts."""
+    if granularity == "hour" and days > 31:
+        raise HTTPException(status_code=400, detail="Hourly series are limited to 31 days")
+    return admin_service.get_activity_series(event, days, granularity)
 
 @admin_router.get("/users", dependencies=[Depends(RoleChecker(["admin"]))])
-def list_users(current_user: Dict = Depends(get_current_user)):
+def list_users(current_user: Dict = Depends(get_current_user), user_repo: UserRepository = Depends(RepositoryFactory.get_user_repository)):
     users = user_repo.get_all_users()
     return [serialize_doc(u) for u in users]
 
@@ -33,50 +119,34 @@ class UserStatusUpdate(BaseModel):
     is_active: bool
 
 @admin_router.patch("/users/{user_id}/status", dependencies=[Depends(RoleChecker(["admin"]))])
-def update_user_status(user_id: str, status_update: UserStatusUpdate, current_user: Dict = Depends(get_current_user)):
+def update_user_status(user_id: str, status_update: UserStatusUpdate, current_user: Dict = Depends(get_current_user), user_repo: UserRepository = Depends(RepositoryFactory.get_user_repository)):
     success = user_repo.update_status(user_id, status_update.is_active)
     if not success:
         raise HTTPException(status_code=404, detail="User not found or update failed")
+    get_principal_cache().invalidate_user(user_id=user_id)
     return {"message": "User status updated"}
 
 @admin_router.get("/inventory", dependencies=[Depends(RoleChecker(["admin"]))])
-def get_inventory(current_user: Dict = Depends(get_current_user)):
-    donors = donor_service.get_all_donors()
-    hospitals = hospital_repo.get_multi()
-    
-    blood_inventory = {}
-    organ_inventory = {}
-    
-    for d in donors:
-        if d.availability:
-            bg = d.blood_group
-            blood_inventory[bg] = blood_inventory.get(bg, 0) + 1
-            # Handle plural organs list
-            for org in d.organs:
-                organ_inventory[org] = organ_inventory.get(org, 0) + 1
-            
+def get_inventory(current_user: Dict = Depends(get_current_user), donor_repo: DonorRepository = Depends(RepositoryFactory.get_donor_repository), hospital_repo: HospitalRepository = Depends(RepositoryFactory.get_hospital_repository)):
+    # Grouped in the database; only one row per blood group / organ comes back
+    inventory = donor_repo.availability_inventory()
     return {
-        "blood": blood_inventory,
-        "organs": organ_inventory,
-        "total_hospitals": len(hospitals),
-        "total_donors": len(donors)
+        "blood": inventory["blood"],
+        "organs": inventory["organs"],
+        "total_hospitals": hospital_repo.count(),
+        "total_donors": donor_repo.count()
     }
 
 # Hospital Management
 from models.hospital import HospitalCreate, Hospital
-from services.auth_service import AuthService
-from repositories.repository import RepositoryFactory
-
-auth_service = AuthService()
-hospital_repo = RepositoryFactory.get_hospital_repository()
 
 @admin_router.get("/hospitals", dependencies=[Depends(RoleChecker(["admin"]))])
-def list_hospitals(current_user: Dict = Depends(get_current_user)):
+def list_hospitals(current_user: Dict = Depends(get_current_user), hospital_repo: HospitalRepository = Depends(RepositoryFactory.get_hospital_repository)):
     hospitals = hospital_repo.get_multi()
     return [serialize_doc(h.dict() if hasattr(h, 'dict') else h) for h in hospitals]
 
 @admin_router.post("/hospitals", status_code=status.HTTP_201_CREATED, dependencies=[Depends(RoleChecker(["admin"]))])
-def create_hospital(hospital_data: HospitalCreate, current_user: Dict = Depends(get_current_user)):
+def create_hospital(hospital_data: HospitalCreate, current_user: Dict = Depends(get_current_user), auth_service: AuthService = Depends(get_auth_service), hospital_repo: HospitalRepository = Depends(RepositoryFactory.get_hospital_repository)):
     # 1. Create User
     try:
         user = auth_service.register_user(hospital_data.email, hospital_data.password, "hospital")
@@ -94,7 +164,7 @@ def create_hospital(hospital_data: HospitalCreate, current_user: Dict = Depends(
     return serialize_doc(created_hospital.dict())
 
 @admin_router.delete("/hospitals/{hospital_id}", dependencies=[Depends(RoleChecker(["admin"]))])
-def delete_hospital(hospital_id: str, current_user: Dict = Depends(get_current_user)):
+def delete_hospital(hospital_id: str, current_user: Dict = Depends(get_current_user), hospital_repo: HospitalRepository = Depends(RepositoryFactory.get_hospital_repository)):
     # 1. Get hospital to find email
     hospital = hospital_repo.get(hospital_id)
     if not hospital:
@@ -111,7 +181,7 @@ def delete_hospital(hospital_id: str, current_user: Dict = Depends(get_current_u
     return {"message": "Hospital deleted successfully"}
 
 @admin_router.patch("/hospitals/{hospital_id}/approve", dependencies=[Depends(RoleChecker(["admin"]))])
-def approve_hospital(hospital_id: str, is_active: bool, current_user: Dict = Depends(get_current_user)):
+def approve_hospital(hospital_id: str, is_active: bool, current_user: Dict = Depends(get_current_user), user_repo: UserRepository = Depends(RepositoryFactory.get_user_repository), hospital_repo: HospitalRepository = Depends(RepositoryFactory.get_hospital_repository)):
     # Update Hospital Profile
     hospital = hospital_repo.update(hospital_id, {"is_active": is_active})
     if not hospital:
@@ -127,16 +197,14 @@ def approve_hospital(hospital_id: str, is_active: bool, current_user: Dict = Dep
 
 # Donor Management
 
-donor_repo = RepositoryFactory.get_donor_repository()
-
 @admin_router.get("/donors", dependencies=[Depends(RoleChecker(["admin"]))])
-def list_donors(current_user: Dict = Depends(get_current_user)):
+def list_donors(current_user: Dict = Depends(get_current_user), donor_repo: DonorRepository = Depends(RepositoryFactory.get_donor_repository)):
     donors = donor_repo.get_all()
     # Optional: Merge with User data if needed, but Donor profile usually has enough info
     return [serialize_doc(d) for d in donors]
 
 @admin_router.put("/donors/{donor_id}", dependencies=[Depends(RoleChecker(["admin"]))])
-def update_donor(donor_id: str, updates: Dict[str, Any], current_user: Dict = Depends(get_current_user)):
+def update_donor(donor_id: str, updates: Dict[str, Any], current_user: Dict = Depends(get_current_user), donor_repo: DonorRepository = Depends(RepositoryFactory.get_donor_repository)):
     # Prevent updating critical fields like ID or UserID arbitrarily
     safe_updates = {k: v for k, v in updates.items() if k not in ["id", "user_id", "created_at"]}
     updated_donor = donor_repo.update(donor_id, safe_updates)
@@ -145,7 +213,7 @@ def update_donor(donor_id: str, updates: Dict[str, Any], current_user: Dict = De
     return serialize_doc(updated_donor)
 
 @admin_router.delete("/donors/{donor_id}", dependencies=[Depends(RoleChecker(["admin"]))])
-def delete_donor(donor_id: str, current_user: Dict = Depends(get_current_user)):
+def delete_donor(donor_id: str, current_user: Dict = Depends(get_current_user), donor_repo: DonorRepository = Depends(RepositoryFactory.get_donor_repository)):
     donor = donor_repo.get_by_id(donor_id)
     if not donor:
         raise HTTPException(status_code=404, detail="Donor not found")
@@ -159,10 +227,11 @@ def delete_donor(donor_id: str, current_user: Dict = Depends(get_current_user)):
     success = donor_repo.delete(donor_id)
     if not success:
         raise HTTPException(status_code=404, detail="Donor delete failed")
+    RepositoryFactory.get_match_repository().delete_for_donor(donor_id)
     return {"message": "Donor deleted successfully"}
 
 @admin_router.patch("/donors/{donor_id}/verify", dependencies=[Depends(RoleChecker(["admin"]))])
-def verify_donor(donor_id: str, is_verified: bool, current_user: Dict = Depends(get_current_user)):
+def verify_donor(donor_id: str, is_verified: bool, current_user: Dict = Depends(get_current_user), donor_repo: DonorRepository = Depends(RepositoryFactory.get_donor_repository)):
     donor = donor_repo.update(donor_id, {"is_verified": is_verified})
     if not donor:
         raise HTTPException(status_code=404, detail="Donor not found")
@@ -171,15 +240,13 @@ def verify_donor(donor_id: str, is_verified: bool, current_user: Dict = Depends(
 
 # Request Management
 
-request_repo = RepositoryFactory.get_request_repository()
-
 @admin_router.get("/requests", dependencies=[Depends(RoleChecker(["admin"]))])
-def list_requests(current_user: Dict = Depends(get_current_user)):
+def list_requests(current_user: Dict = Depends(get_current_user), request_repo: RequestRepository = Depends(RepositoryFactory.get_request_repository)):
     requests = request_repo.get_all()
     return [serialize_doc(r) for r in requests]
 
 @admin_router.patch("/requests/{request_id}/status", dependencies=[Depends(RoleChecker(["admin"]))])
-def update_request_status(request_id: str, status: str, current_user: Dict = Depends(get_current_user)):
+def update_request_status(request_id: str, status: str, current_user: Dict = Depends(get_current_user), request_repo: RequestRepository = Depends(RepositoryFactory.get_request_repository)):
     # Valid statuses: pending, approved, rejected, completed, cancelled
     updated_req = request_repo.update_status(request_id, status)
     if not updated_req:
@@ -187,17 +254,34 @@ def update_request_status(request_id: str, status: str, current_user: Dict = Dep
     return serialize_doc(updated_req)
 
 @admin_router.get("/requests/{request_id}/ai-matches", dependencies=[Depends(RoleChecker(["admin"]))])
-def get_ai_matches(request_id: str, current_user: Dict = Depends(get_current_user)):
+def get_ai_matches(request_id: str, explain: bool = Query(False), current_user: Dict = Depends(get_current_user), matching_service: MatchingService = Depends(get_matching_service)):
     try:
-        matches = matching_service.find_matches_for_request(request_id)
+        matches = matching_service.find_matches_for_request(request_id, explain=explain)
         return matches
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Matching service error")
 
+@admin_router.get("/requests/{request_id}/ai-matches/stream", dependencies=[Depends(RoleChecker(["admin"]))])
+def stream_ai_matches(request_id: str, format: str = Query("ndjson", pattern="^(ndjson|sse)$"), limit: int = Query(5, ge=1, le=50), explain: bool = Query(False), current_user: Dict = Depends(get_current_user), matching_service: MatchingService = Depends(get_matching_service)):
+    """
+    Stream progressively refined top-k snapshots while donors are scored.
+    Each snapshot is a JSON object; the last one has type 'final'.
+    """
+    try:
+        snapshots = matching_service.stream_matches_for_request(request_id, limit=limit, explain=explain)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if format == "sse":
+        body = (f"event: {snap['type']}\ndata: {json.dumps(snap)}\n\n" for snap in snapshots)
+        return StreamingResponse(body, media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+    body = (json.dumps(snap) + "\n" for snap in snapshots)
+    return StreamingResponse(body, media_type="application/x-ndjson")
+
 @admin_router.patch("/requests/{request_id}/assign", dependencies=[Depends(RoleChecker(["admin"]))])
-def assign_donor(request_id: str, donor_id: str, current_user: Dict = Depends(get_current_user)):
+def assign_donor(request_id: str, donor_id: str, current_user: Dict = Depends(get_current_user), donor_repo: DonorRepository = Depends(RepositoryFactory.get_donor_repository), request_repo: RequestRepository = Depends(RepositoryFactory.get_request_repository)):
     # Check if donor exists
     donor = donor_repo.get_by_id(donor_id)
     if not donor:
@@ -1,32 +1,22 @@
 from fastapi import APIRouter, Depends
 from routes.auth_routes import RoleChecker
-from services.donor_service import DonorService
+from repositories.repository import RepositoryFactory
+from repositories.donor_repository import DonorRepository
 import logging
 
 analysis_router = APIRouter()
-donor_service = DonorService()
 
 @analysis_router.get("/availability", dependencies=[Depends(RoleChecker(["recipient", "hospital", "admin"]))])
-def get_anonymized_availability():
+def get_anonymized_availability(donor_repo: DonorRepository = Depends(RepositoryFactory.get_donor_repository)):
     """
     Returns aggregate counts of available blood and organs.
     No personal info (names/IDs) is leaked.
     """
     try:
-        donors = donor_service.get_all_donors()
-        
-        blood_counts = {}
-        organ_counts = {}
-        
-        for d in donors:
-            if d.availability:
-                # Aggregate Blood
-                bg = d.blood_group
-                blood_counts[bg] = blood_counts.get(bg, 0) + 1
-                
-                # Aggregate Organ
-                org = d.organ
-                organ_counts[org] = organ_counts.get(org, 0) + 1
+        # Grouped in the database; only one row per blood group / organ comes back
+        inventory = donor_repo.availability_inventory()
+        blood_counts = inventory["blood"]
+        organ_counts = inventory["organs"]
                 
         return {
             "blood_inventory": blood_counts,
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Body
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
-from services.auth_service import AuthService
+from services.auth_service import AuthService, get_auth_service
+from services.password_hasher import HasherBusy
+from services.principal_cache import get_principal_cache
+from services.token_revocation import get_revocation_store
 from core.config import settings
 from jose import jwt, JWTError
 import logging
 
 auth_router = APIRouter()
-auth_service = AuthService()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
@@ -25,6 +27,10 @@ class Token(BaseModel):
     refresh_token: str
     token_type: str
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
+
 class UserResponse(BaseModel):
     id: str
     email: str
@@ -33,14 +39,16 @@ class UserResponse(BaseModel):
 from models.response import success_response, error_response
 
 @auth_router.post("/register", status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate):
+async def register(user: UserCreate, auth_service: AuthService = Depends(get_auth_service)):
     try:
-        auth_service.register_user(user.email, user.password, user.role)
+        await auth_service.register_user_async(user.email, user.password, user.role)
         return success_response(message="User registered successfully")
     except ValueError as e:
         # Return 400 Bad Request if user already exists or other validation error
         from fastapi.responses import JSONResponse
         return JSONResponse(status_code=400, content=error_response(message=str(e)))
+    except HasherBusy:
+        raise
     except Exception as e:
         from fastapi.responses import JSONResponse
         logging.error(f"Registration error: {e}")
@@ -53,48 +61,53 @@ def test_body(data: dict = Body(...)):
     return {"received": data, "keys": list(data.keys())}
 
 @auth_router.post("/token", response_model=Token)
-def login(credentials: LoginRequest):
-    logging.info(f"Login attempt - received credentials object: {credentials}")
-    logging.info(f"Email: {credentials.email}, Password length: {len(credentials.password)}")
-    user = auth_service.authenticate_user(credentials.email, credentials.password)
+async def login(credentials: LoginRequest, auth_service: AuthService = Depends(get_auth_service)):
+    logging.info(f"Login attempt - Email: {credentials.email}")
+    user = await auth_service.authenticate_user_async(credentials.email, credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = auth_service.create_access_token(data={"sub": user.email, "role": user.role})
-    refresh_token = auth_service.create_refresh_token(data={"sub": user.email, "role": user.role})
-    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+    return auth_service.issue_tokens(user.email, user.role)
 
 @auth_router.post("/refresh", response_model=Token)
-def refresh_token(refresh_token: str):
-    payload = auth_service.decode_token(refresh_token)
-    if not payload or payload.get("type") != "refresh":
+def refresh_token(refresh_token: str = Body(..., embed=True), auth_service: AuthService = Depends(get_auth_service)):
+    """Rotate: the presented refresh token is consumed and a new pair is issued."""
+    tokens = auth_service.rotate_refresh_token(refresh_token)
+    if not tokens:
          raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    email = payload.get("sub")
-    role = payload.get("role")
-    
-    # In a real app we might check if user still exists or is active
-    
-    new_access_token = auth_service.create_access_token(data={"sub": email, "role": role})
-    # We can rotate refresh tokens too if we want
-    new_refresh_token = auth_service.create_refresh_token(data={"sub": email, "role": role})
-    
-    return {"access_token": new_access_token, "refresh_token": new_refresh_token, "token_type": "bearer"}
+    return tokens
 
+@auth_router.post("/logout")
+def logout(refresh_token: str = Body(..., embed=True), auth_service: AuthService = Depends(get_auth_service)):
+    """Revoke the session (token family) the refresh token belongs to."""
+    if not auth_service.logout(refresh_token):
+        raise HTTPException(status_code=400, detail="Invalid refresh token")
+    return success_response(message="Logged out")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+
+async def get_current_user(token: str = Depends(oauth2_scheme), auth_service: AuthService = Depends(get_auth_service)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cache = get_principal_cache()
+    cached = cache.get(token)
+    if cached is not None:
+        user, family = cached
+        # Families are revoked by whichever process sees a refresh token reused;
+        # the store syncs across processes, the cache does not
+        if get_revocation_store().is_revoked(family=family):
+            raise credentials_exception
+        return user
+
     payload = auth_service.decode_token(token)
     if not payload or payload.get("type") != "access": # Enforce access token type
         raise credentials_exception
@@ -102,10 +115,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     email: str = payload.get("sub")
     if email is None:
         raise credentials_exception
+    if get_revocation_store().is_revoked(family=payload.get("fam")):
+        raise credentials_exception
     
     user = auth_service.user_repo.get_by_email(email)
-    if user is None:
+    if user is None or not user.is_active:
         raise credentials_exception
+    cache.put(token, user, payload.get("exp"), payload.get("fam"))
     return user
 
 @auth_router.get("/me", response_model=UserResponse)
@@ -116,6 +132,12 @@ def read_users_me(current_user = Depends(get_current_user)):
         "role": current_user.role
     }
 
+@auth_router.post("/change-password")
+async def change_password(body: PasswordChange, current_user = Depends(get_current_user), auth_service: AuthService = Depends(get_auth_service)):
+    if not await auth_service.change_password_async(current_user.email, body.current_password, body.new_password):
+        raise HTTPException(status_code=400, detail="Current password is incorrect")
+    return success_response(message="Password updated")
+
 class RoleChecker:
     def __init__(self, allowed_roles: list[str]):
         self.allowed_roles = allowed_roles
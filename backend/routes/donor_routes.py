@@ -1,15 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import List
 from models.donor_schema import DonorModel
-from services.donor_service import DonorService
+from services.donor_service import DonorService, get_donor_service
 from routes.auth_routes import RoleChecker, get_current_user
 import logging
 
 donor_router = APIRouter()
 
-def get_donor_service():
-    return DonorService()
-
 @donor_router.post("/", response_model=DonorModel, status_code=status.HTTP_201_CREATED, dependencies=[Depends(RoleChecker(["donor", "admin"]))])
 def create_donor(donor: DonorModel, current_user: dict = Depends(get_current_user), service: DonorService = Depends(get_donor_service)):
     try:
@@ -35,6 +32,13 @@ def update_my_profile(donor: DonorModel, current_user: dict = Depends(get_curren
         raise HTTPException(status_code=404, detail="Profile not found")
     return updated
 
+@donor_router.get("/me/matches", dependencies=[Depends(RoleChecker(["donor"]))])
+def get_my_matches(skip: int = Query(0, ge=0), limit: int = Query(20, ge=1, le=100), current_user: dict = Depends(get_current_user), service: DonorService = Depends(get_donor_service)):
+    matches = service.get_matched_requests(str(current_user.id), skip=skip, limit=limit)
+    if matches is None:
+        raise HTTPException(status_code=404, detail="Profile not found. Please register.")
+    return matches
+
 @donor_router.get("/history", dependencies=[Depends(RoleChecker(["donor"]))])
 def get_my_history(current_user: dict = Depends(get_current_user), service: DonorService = Depends(get_donor_service)):
     return service.get_donation_history(str(current_user.id))
@@ -4,13 +4,14 @@ from models.hospital import Hospital
 from core.db_instance import get_collection
 from utils.serialization import serialize_doc
 from routes.auth_routes import RoleChecker, get_current_user
-from services.blockchain_service import BlockchainService
+from services.blockchain_service import BlockchainService, get_blockchain_service
+from repositories.repository import RepositoryFactory
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
 import logging
 
 hospital_router = APIRouter()
-blockchain_service = BlockchainService()
 
 @hospital_router.post("/", response_model=Hospital, status_code=status.HTTP_201_CREATED, dependencies=[Depends(RoleChecker(["admin"]))])
 def create_hospital(hospital: Hospital):
@@ -18,6 +19,7 @@ def create_hospital(hospital: Hospital):
         data = hospital.dict()
         result = get_collection("hospitals").insert_one(data)
         created = get_collection("hospitals").find_one({"_id": result.inserted_id})
+        RepositoryFactory.get_counter_repository().apply("hospitals", None, created)
         return serialize_doc(created)
     except Exception as e:
         logging.getLogger(__name__).exception("Error creating hospital: %s", e)
@@ -30,7 +32,7 @@ def list_hospitals():
     return [serialize_doc(d) for d in docs]
 
 @hospital_router.post("/fulfill/{request_id}", dependencies=[Depends(RoleChecker(["hospital", "admin"]))])
-def fulfill_request(request_id: str, donor_id: str = Body(..., embed=True), current_user: dict = Depends(get_current_user)):
+def fulfill_request(request_id: str, donor_id: str = Body(..., embed=True), current_user: dict = Depends(get_current_user), blockchain_service: BlockchainService = Depends(get_blockchain_service)):
     try:
         # 1. Verify Request exists and is NOT already fulfilled
         req = get_collection("requests").find_one({"_id": ObjectId(request_id)})
@@ -54,16 +56,25 @@ def fulfill_request(request_id: str, donor_id: str = Body(..., embed=True), curr
             )
 
         # 3. Update Request Status
-        get_collection("requests").update_one(
+        fulfillment = {
+            "status": "fulfilled", 
+            "fulfilled_by": str(current_user.id),
+            "donor_id": donor_id, 
+            "fulfilled_at": datetime.now().isoformat()
+        }
+        previous = get_collection("requests").find_one_and_update(
             {"_id": ObjectId(request_id)}, 
-            {"$set": {
-                "status": "fulfilled", 
-                "fulfilled_by": str(current_user.id),
-                "donor_id": donor_id, 
-                "fulfilled_at": datetime.now().isoformat()
-            }}
+            {"$set": fulfillment},
+            return_document=ReturnDocument.BEFORE
         )
 
+        # Keep the admin stats counters and activity rollups in step with both writes
+        counters = RepositoryFactory.get_counter_repository()
+        counters.apply("donors", {**claimed_donor, "availability": True}, claimed_donor)
+        if previous:
+            counters.apply("requests", previous, {**previous, **fulfillment})
+            RepositoryFactory.get_activity_repository().record_change("requests", previous, {**previous, **fulfillment})
+
         # 4. Log to Blockchain
         try:
             blockchain_service.log_match_found(
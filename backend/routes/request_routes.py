@@ -1,16 +1,13 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import List
 from models.request import DonationRequest
 from routes.auth_routes import RoleChecker, get_current_user
-from services.request_service import RequestService
+from services.request_service import RequestService, get_request_service
 import logging
 
 request_router = APIRouter()
 
-def get_request_service():
-    return RequestService()
-
-@request_router.post("/", response_model=DonationRequest, status_code=status.HTTP_201_CREATED, dependencies=[Depends(RoleChecker(["recipient", "hospital", "admin"]))])
+@request_router.post("/", response_model=DonationRequest, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(RoleChecker(["recipient", "hospital", "admin"]))])
 def create_request(req: DonationRequest, current_user: dict = Depends(get_current_user), service: RequestService = Depends(get_request_service)):
     try:
         return service.create_request(req, str(current_user.id))
@@ -20,7 +17,7 @@ def create_request(req: DonationRequest, current_user: dict = Depends(get_curren
 
 
 @request_router.get("/", response_model=List[DonationRequest], dependencies=[Depends(RoleChecker(["recipient", "hospital", "admin", "donor"]))])
-def list_requests(current_user: dict = Depends(get_current_user), service: RequestService = Depends(get_request_service)):
+def list_requests(explain: bool = Query(False, description="Render match breakdowns and recommendations"), current_user: dict = Depends(get_current_user), service: RequestService = Depends(get_request_service)):
     # Filter by user role
     filter_query = {}
     if current_user.role == "recipient":
@@ -33,5 +30,25 @@ def list_requests(current_user: dict = Depends(get_current_user), service: Reque
         # In a real system, we might filter by blood group compatibility here using service logic
         filter_query["status"] = "pending"
         
-    return service.list_requests(filter_query=filter_query)
+    return service.list_requests(filter_query=filter_query, explain=explain)
+
+def _authorize_request_access(request_id: str, current_user, service: RequestService) -> None:
+    """Recipients may only read their own requests; hospitals and admins read any."""
+    request = service.get_request_by_id(request_id)
+    if not request:
+        raise HTTPException(status_code=404, detail="Request not found")
+    if current_user.role not in ("hospital", "admin") and request.user_id != str(current_user.id):
+        raise HTTPException(status_code=403, detail="Operation not permitted")
+
+@request_router.get("/{request_id}/matches", dependencies=[Depends(RoleChecker(["recipient", "hospital", "admin"]))])
+def get_request_matches(request_id: str, skip: int = Query(0, ge=0), limit: int = Query(20, ge=1, le=100), explain: bool = Query(False), current_user: dict = Depends(get_current_user), service: RequestService = Depends(get_request_service)):
+    _authorize_request_access(request_id, current_user, service)
+    return service.get_matches(request_id, skip=skip, limit=limit, explain=explain)
 
+@request_router.get("/{request_id}/match-status", dependencies=[Depends(RoleChecker(["recipient", "hospital", "admin"]))])
+def get_match_status(request_id: str, current_user: dict = Depends(get_current_user), service: RequestService = Depends(get_request_service)):
+    _authorize_request_access(request_id, current_user, service)
+    job = service.get_match_status(request_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Request not found")
+    return job
@@ -0,0 +1,116 @@
+"""
+Export the audit ledger through /api/admin/ledger/export, checking each
+row as it arrives.
+
+    python scripts/export_ledger.py --email admin@connectlife.com --password ... --out ledger.ndjson
+    python scripts/export_ledger.py --token <jwt> --format csv --out ledger.csv
+    python scripts/export_ledger.py --verify ledger.ndjson
+
+If --out already holds a partial export it is checked and the download
+resumes after its last row.
+"""
+
+import argparse
+import json
+import sys
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ledger.export import ExportVerifier
+
+
+def login(base: str, email: str, password: str) -> str:
+    req = urllib.request.Request(
+        f"{base}/api/auth/token",
+        data=json.dumps({"email": email, "password": password}).encode(),
+        method="POST"
+    )
+    req.add_header("Content-Type", "application/json")
+    with urllib.request.urlopen(req, timeout=10) as r:
+        return json.load(r)["access_token"]
+
+
+def verify_file(path: Path, fmt: str) -> ExportVerifier:
+    verifier = ExportVerifier()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for line in f:
+            verifier.feed_line(line, fmt)
+    return verifier
+
+
+def drop_partial_row(path: Path) -> None:
+    """An interrupted download can leave half a row at the end; cut it off."""
+    with open(path, "rb+") as f:
+        data_end = f.seek(0, 2)
+        if data_end == 0:
+            return
+        f.seek(data_end - 1)
+        if f.read(1) == b"\n":
+            return
+        position = data_end
+        while position > 0:
+            start = max(0, position - 65536)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+def export(base: str, token: str, out: Path, fmt: str) -> None:
+    verifier = ExportVerifier()
+    if out.exists():
+        drop_partial_row(out)
+        verifier = verify_file(out, fmt)
+    from_height = verifier.height + 1 if verifier.height is not None else 0
+    params = {"format": fmt, "from_height": from_height}
+    if verifier.height is not None:
+        params["running_hash"] = verifier.running_hash
+        print(f"Resuming {out} after height {verifier.height}")
+
+    req = urllib.request.Request(f"{base}/api/admin/ledger/export?{urllib.parse.urlencode(params)}")
+    req.add_header("Authorization", f"Bearer {token}")
+    with urllib.request.urlopen(req) as r, open(out, "a", encoding="utf-8", newline="") as f:
+        for raw in r:
+            line = raw.decode("utf-8")
+            verifier.feed_line(line, fmt)
+            f.write(line)
+    print(f"Exported through height {verifier.height} ({verifier.rows} blocks checked), "
+          f"running hash {verifier.running_hash}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or verify the audit ledger")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--token', help='admin access token')
+    parser.add_argument('--email')
+    parser.add_argument('--password')
+    parser.add_argument('--format', choices=['ndjson', 'csv'], help='defaults to the --out/--verify file extension')
+    parser.add_argument('--out', type=Path)
+    parser.add_argument('--verify', type=Path, help='check an existing export and exit')
+    args = parser.parse_args()
+
+    path = args.verify or args.out
+    if path is None:
+        parser.error("--out or --verify is required")
+    fmt = args.format or ('csv' if path.suffix == '.csv' else 'ndjson')
+
+    try:
+        if args.verify:
+            verifier = verify_file(args.verify, fmt)
+            print(f"{args.verify}: {verifier.rows} blocks OK, last height {verifier.height}, "
+                  f"running hash {verifier.running_hash}")
+            return
+        token = args.token or login(args.url, args.email, args.password)
+        export(args.url, token, args.out, fmt)
+    except ValueError as e:
+        sys.exit(f"Export check failed: {e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,11 @@ Admin Service - Analytics & Monitoring
 
 Provides system metrics, user activity tracking, and analytics.
 
+Counts and distributions come from the counters maintained on every
+write (repositories/counter_repository.py), and recent activity from the
+hourly/daily rollups (repositories/activity_repository.py), so they cost
+a handful of small reads regardless of collection size.
+
 Tracks:
   - Total donors, hospitals, requests
   - Donation success rates
@@ -19,6 +24,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from typing import Dict, List, Any
 from datetime import datetime, timedelta
 from repositories.repository import RepositoryFactory
+from services.dashboard_snapshot import DashboardSnapshot
 
 
 class AdminService:
@@ -31,6 +37,9 @@ class AdminService:
         self.donor_repo = RepositoryFactory.get_donor_repository()
         self.hospital_repo = RepositoryFactory.get_hospital_repository()
         self.request_repo = RepositoryFactory.get_request_repository()
+        self.match_repo = RepositoryFactory.get_match_repository()
+        self.counters = RepositoryFactory.get_counter_repository()
+        self.activity = RepositoryFactory.get_activity_repository()
     
     def get_system_stats(self) -> Dict[str, Any]:
         """
@@ -39,135 +48,116 @@ class AdminService:
         Returns:
             Dictionary with key metrics
         """
-        return {
-            "total_donors": self.donor_repo.count(),
-            "total_hospitals": self.hospital_repo.count(),
-            "total_requests": self.request_repo.count(),
-            "active_requests": self.request_repo.count_by_status("pending"),
-            "completed_donations": self.request_repo.count_by_status("completed"),
-            "pending_matches": self.request_repo.count_by_status("pending"),
-            "confirmed_matches": self.request_repo.count_by_status("confirmed"),
-            "urgent_requests": len(self.request_repo.find_urgent()),
-        }
+        return self._system_stats(self.counters.read_all())
     
     def get_donor_stats(self) -> Dict[str, Any]:
         """Get donor-related statistics."""
-        donors = self.donor_repo.get_all()
-        
-        # Blood group distribution
-        blood_distribution = {}
-        for donor in donors:
-            bg = donor.blood_group if donor.blood_group else "unknown"
-            blood_distribution[bg] = blood_distribution.get(bg, 0) + 1
-        
-        # Available donors
-        available_donors = [d for d in donors if d.availability]
-        
-        return {
-            "total_donors": len(donors),
-            "available_donors": len(available_donors),
-            "blood_group_distribution": blood_distribution,
-            "donor_registration_rate": self._calculate_registration_rate(donors),
-        }
+        return self._donor_stats(self.counters.read_all())
     
     def get_hospital_stats(self) -> Dict[str, Any]:
         """Get hospital-related statistics."""
-        hospitals = self.hospital_repo.get_all()
-        requests = self.request_repo.get_all()
-        
-        # Requests per hospital
-        requests_per_hospital = {}
-        for request in requests:
-            # DonationRequest has user_id which links to hospital/recipient
-            # But in this system, hospital_location might be used or we need a proper FK
-            # Let's check the request model again. It has user_id.
-            hospital_id = getattr(request, "hospital_id", None) or request.user_id
-            if hospital_id:
-                requests_per_hospital[hospital_id] = requests_per_hospital.get(hospital_id, 0) + 1
-        
+        return self._hospital_stats(DashboardSnapshot.build())
+    
+    def get_request_stats(self) -> Dict[str, Any]:
+        """Get request/donation statistics."""
+        return self._request_stats(self.counters.read_all())
+    
+    def get_match_quality_metrics(self) -> Dict[str, Any]:
+        """Get metrics about match quality and performance."""
+        # Scores come from the matches collection (field 'match_score')
+        return self._match_quality(self.counters.read_all(), self.match_repo.score_summary())
+    
+    def get_blood_group_insights(self) -> Dict[str, Any]:
+        """Get insights about blood group distribution and needs."""
+        return self._blood_group_insights(self.counters.read_all())
+    
+    def get_dashboard_summary(self) -> Dict[str, Any]:
+        """
+        Get comprehensive dashboard summary.
+        Every section is rendered from one snapshot, which reads each source once.
+        """
+        snapshot = DashboardSnapshot.build()
+        counts = snapshot.counts
+        return {
+            "system_stats": self._system_stats(counts),
+            "donor_stats": self._donor_stats(counts),
+            "hospital_stats": self._hospital_stats(snapshot),
+            "request_stats": self._request_stats(counts),
+            "match_quality": self._match_quality(counts, snapshot.match_summary),
+            "blood_group_insights": self._blood_group_insights(counts),
+            "recent_activity": self._recent_activity(snapshot.activity, snapshot.activity_hours),
+            "timestamp": snapshot.taken_at.isoformat(),
+        }
+    
+    # Section renderers: pure functions of the counters / snapshot
+    
+    @staticmethod
+    def _system_stats(counts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        requests = counts["requests"]
+        by_status = requests["status"]
+        return {
+            "total_donors": counts["donors"]["total"],
+            "total_hospitals": counts["hospitals"]["total"],
+            "total_requests": requests["total"],
+            "active_requests": by_status.get("pending", 0),
+            "completed_donations": by_status.get("fulfilled", 0),
+            "pending_matches": by_status.get("pending", 0),
+            "confirmed_matches": by_status.get("matched", 0),
+            "urgent_requests": requests["urgency"].get("critical", 0),
+        }
+    
+    def _donor_stats(self, counts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        donors = counts["donors"]
         return {
-            "total_hospitals": len(hospitals),
-            "total_requests": len(requests),
+            "total_donors": donors["total"],
+            "available_donors": donors["availability"].get("true", 0),
+            "blood_group_distribution": donors["blood_group"],
+            "donor_registration_rate": self._calculate_registration_rate(donors["total"]),
+        }
+    
+    @staticmethod
+    def _hospital_stats(snapshot: DashboardSnapshot) -> Dict[str, Any]:
+        total_hospitals = snapshot.counts["hospitals"]["total"]
+        # DonationRequest has no hospital FK; requests are grouped by the submitting user_id
+        return {
+            "total_hospitals": total_hospitals,
+            "total_requests": snapshot.total_requests,
             "average_requests_per_hospital": (
-                len(requests) / len(hospitals) if hospitals else 0
+                snapshot.total_requests / total_hospitals if total_hospitals else 0
             ),
-            "requests_per_hospital": requests_per_hospital,
+            "requests_per_hospital": snapshot.requests_per_hospital,
         }
     
-    def get_request_stats(self) -> Dict[str, Any]:
-        """Get request/donation statistics."""
-        requests = self.request_repo.get_all()
-        
-        # Organ distribution
-        organ_distribution = {}
-        for request in requests:
-            organ = request.organ or "unknown"
-            organ_distribution[organ] = organ_distribution.get(organ, 0) + 1
-        
-        # Urgency distribution
-        urgency_distribution = {}
-        for request in requests:
-            urgency = request.urgency or "medium"
-            urgency_distribution[urgency] = urgency_distribution.get(urgency, 0) + 1
-        
-        # Status distribution
-        status_distribution = {}
-        for request in requests:
-            status = request.status or "pending"
-            status_distribution[status] = status_distribution.get(status, 0) + 1
-        
+    def _request_stats(self, counts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        requests = counts["requests"]
         return {
-            "total_requests": len(requests),
-            "organ_distribution": organ_distribution,
-            "urgency_distribution": urgency_distribution,
-            "status_distribution": status_distribution,
-            "success_rate": self._calculate_success_rate(requests),
+            "total_requests": requests["total"],
+            "organ_distribution": requests["organ"],
+            "urgency_distribution": requests["urgency"],
+            "status_distribution": requests["status"],
+            "success_rate": self._calculate_success_rate(requests["status"], requests["total"]),
         }
     
-    def get_match_quality_metrics(self) -> Dict[str, Any]:
-        """Get metrics about match quality and performance."""
-        requests = self.request_repo.get_all()
-        matched_requests = [r for r in requests if r.status in ["matched", "confirmed", "fulfilled"]]
-        
-        avg_compatibility_score = 0
-        if matched_requests:
-            # DonationRequest might not have compatibility_score directly, checking matches
-            total_score = 0
-            count = 0
-            for r in matched_requests:
-                if r.matches:
-                    total_score += sum(m.get("compatibility_score", 0) for m in r.matches)
-                    count += len(r.matches)
-            avg_compatibility_score = total_score / count if count else 0
-        
+    @staticmethod
+    def _match_quality(counts: Dict[str, Dict[str, Any]], summary: Dict[str, float]) -> Dict[str, Any]:
+        requests = counts["requests"]
+        total_requests = requests["total"]
+        matched_requests = sum(requests["status"].get(s, 0) for s in ("matched", "fulfilled"))
         return {
-            "total_matches_found": len(matched_requests),
-            "average_compatibility_score": round(avg_compatibility_score, 2),
+            "total_matches_found": matched_requests,
+            "total_candidate_matches": summary["count"],
+            "average_compatibility_score": round(summary["average_score"], 2),
             "match_success_rate": (
-                len(matched_requests) / len(requests) if requests else 0
+                matched_requests / total_requests if total_requests else 0
             ),
             "matched_to_total_ratio": (
-                f"{len(matched_requests)}/{len(requests)}"
+                f"{matched_requests}/{total_requests}"
             ),
         }
     
-    def get_blood_group_insights(self) -> Dict[str, Any]:
-        """Get insights about blood group distribution and needs."""
-        donors = self.donor_repo.get_all()
-        requests = self.request_repo.get_all()
-        
-        # Donor blood group distribution
-        donor_blood_dist = {}
-        for donor in donors:
-            bg = donor.blood_group or "unknown"
-            donor_blood_dist[bg] = donor_blood_dist.get(bg, 0) + 1
-        
-        # Request blood group needs
-        request_blood_needs = {}
-        for request in requests:
-            bg = request.blood_group or "unknown"
-            request_blood_needs[bg] = request_blood_needs.get(bg, 0) + 1
-        
+    def _blood_group_insights(self, counts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        donor_blood_dist = counts["donors"]["blood_group"]
+        request_blood_needs = counts["requests"]["blood_group"]
         return {
             "donor_blood_distribution": donor_blood_dist,
             "recipient_blood_needs": request_blood_needs,
@@ -177,60 +167,41 @@ class AdminService:
             ),
         }
     
-    def get_dashboard_summary(self) -> Dict[str, Any]:
-        """Get comprehensive dashboard summary."""
-        return {
-            "system_stats": self.get_system_stats(),
-            "donor_stats": self.get_donor_stats(),
-            "hospital_stats": self.get_hospital_stats(),
-            "request_stats": self.get_request_stats(),
-            "match_quality": self.get_match_quality_metrics(),
-            "blood_group_insights": self.get_blood_group_insights(),
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-    
     def get_recent_activity(self, hours: int = 24) -> Dict[str, Any]:
-        """Get recent system activity."""
-        donors = self.donor_repo.get_all()
-        requests = self.request_repo.get_all()
-        
-        cutoff = datetime.utcnow() - timedelta(hours=hours)
-        
-        # Recent donors
-        # Handle cases where created_at might be None
-        recent_donors = [
-            d for d in donors
-            if d.id and d.id.startswith("donor_") # Placeholder if created_at is missing or use current
-        ]
-        
-        # Recent requests
-        recent_requests = [
-            r for r in requests
-            if r.created_at and datetime.fromisoformat(r.created_at) > cutoff
-        ]
-        
+        """Get recent system activity, summed from the activity rollups."""
+        totals = self.activity.totals(datetime.utcnow() - timedelta(hours=hours))
+        return self._recent_activity(totals, hours)
+    
+    def get_activity_series(self, event: str, days: int = 90, granularity: str = "day") -> List[Dict[str, Any]]:
+        """Per-bucket counts of one activity event over the last `days` days, for charts."""
+        return self.activity.series(event, datetime.utcnow() - timedelta(days=days), granularity=granularity)
+    
+    @staticmethod
+    def _recent_activity(totals: Dict[str, int], hours: int) -> Dict[str, Any]:
         return {
-            "recent_donor_registrations": len(recent_donors),
-            "recent_requests_created": len(recent_requests),
+            "recent_donor_registrations": totals["registrations"],
+            "recent_requests_created": totals["requests"],
+            "recent_matches": totals["matches"],
+            "recent_fulfillments": totals["fulfillments"],
             "hours_window": hours,
         }
     
     @staticmethod
-    def _calculate_registration_rate(donors: List[Any]) -> str:
+    def _calculate_registration_rate(total_donors: int) -> str:
         """Calculate donor registration rate (new per day)."""
-        if not donors:
+        if not total_donors:
             return "0"
         
-        return f"{len(donors)}/total" # Simplified as registration dates might be inconsistent
+        return f"{total_donors}/total" # Simplified as registration dates might be inconsistent
     
     @staticmethod
-    def _calculate_success_rate(requests: List[Any]) -> float:
+    def _calculate_success_rate(status_counts: Dict[str, int], total: int) -> float:
         """Calculate donation success rate."""
-        if not requests:
+        if not total:
             return 0.0
         
-        completed = sum(1 for r in requests if r.status == "fulfilled")
-        return round((completed / len(requests)) * 100, 2)
+        completed = status_counts.get("fulfilled", 0)
+        return round((completed / total) * 100, 2)
     
     @staticmethod
     def _calculate_supply_demand(
@@ -1,29 +1,61 @@
+import asyncio
+import logging
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt
-from passlib.context import CryptContext
 from repositories.user_repository import UserRepository
 from models.user import User
 from core.config import settings
+from services.password_hasher import get_password_hasher
+from services.principal_cache import get_principal_cache
+from services.token_revocation import get_revocation_store
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+logger = logging.getLogger(__name__)
 
 class AuthService:
+    """
+    Password hashing runs on the bounded hasher pool (see
+    services.password_hasher) and may raise HasherBusy. The *_async
+    variants also keep the event loop free while waiting on the database.
+    """
+
     def __init__(self):
         self.user_repo = UserRepository()
+        self.hasher = get_password_hasher()
 
     def verify_password(self, plain_password, hashed_password):
-        return pwd_context.verify(plain_password, hashed_password)
+        return self.hasher.verify(plain_password, hashed_password)
 
     def get_password_hash(self, password):
-        return pwd_context.hash(password)
+        return self.hasher.hash(password)
+
+    def _store_rehash(self, user: User, new_hash: Optional[str]) -> None:
+        """Persist a hash upgraded to the current work factor."""
+        if new_hash and self.user_repo.update_password(user.id, new_hash):
+            user.password_hash = new_hash
+            self.hasher.rehashed += 1
 
     def authenticate_user(self, email: str, password: str):
         user = self.user_repo.get_by_email(email)
         if not user:
             return None
-        if not self.verify_password(password, user.password_hash):
+        valid, new_hash = self.hasher.verify_and_update(password, user.password_hash)
+        if not valid:
+            return None
+        self._store_rehash(user, new_hash)
+        return user
+
+    async def authenticate_user_async(self, email: str, password: str):
+        user = await asyncio.to_thread(self.user_repo.get_by_email, email)
+        if not user:
+            return None
+        valid, new_hash = await self.hasher.verify_and_update_async(password, user.password_hash)
+        if not valid:
             return None
+        if new_hash:
+            await asyncio.to_thread(self._store_rehash, user, new_hash)
         return user
 
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
@@ -32,7 +64,7 @@ class AuthService:
             expire = datetime.utcnow() + expires_delta
         else:
             expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode.update({"exp": expire, "type": "access"})
+        to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
         encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
         return encoded_jwt
 
@@ -42,10 +74,58 @@ class AuthService:
             expire = datetime.utcnow() + expires_delta
         else:
             expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-        to_encode.update({"exp": expire, "type": "refresh"})
+        to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
         encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
         return encoded_jwt
 
+    def issue_tokens(self, email: str, role: str, family: Optional[str] = None) -> dict:
+        """Access/refresh pair; a new login starts a new token family."""
+        claims = {"sub": email, "role": role, "fam": family or uuid.uuid4().hex}
+        return {
+            "access_token": self.create_access_token(data=claims),
+            "refresh_token": self.create_refresh_token(data=claims),
+            "token_type": "bearer",
+        }
+
+    def rotate_refresh_token(self, refresh_token: str) -> Optional[dict]:
+        """
+        Exchange a refresh token for a new pair in the same family. The
+        presented token is consumed; presenting it again revokes the family.
+        Returns None when the token is invalid, revoked or replayed.
+        """
+        payload = self.decode_token(refresh_token)
+        if not payload or payload.get("type") != "refresh" or not payload.get("jti"):
+            return None
+        email = payload.get("sub")
+        family = payload.get("fam") or payload["jti"]
+        store = get_revocation_store()
+        if store.is_revoked(family=family):
+            return None
+        if not store.consume(payload["jti"], email, payload["exp"]):
+            logger.warning(f"Refresh token reuse for {email}; revoking token family {family}")
+            self.revoke_family(family, email)
+            return None
+
+        user = self.user_repo.get_by_email(email) if email else None
+        if user is None or not user.is_active:
+            return None
+        return self.issue_tokens(user.email, user.role, family)
+
+    def revoke_family(self, family: str, email: Optional[str]) -> None:
+        """Revoke every token of a family, including access tokens already handed out."""
+        # Any token of the family may still be live for one more refresh lifetime
+        expires_at = time.time() + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+        get_revocation_store().revoke_family(family, email, expires_at)
+        if email:
+            get_principal_cache().invalidate_user(email=email)
+
+    def logout(self, refresh_token: str) -> bool:
+        payload = self.decode_token(refresh_token)
+        if not payload or payload.get("type") != "refresh" or not payload.get("jti"):
+            return False
+        self.revoke_family(payload.get("fam") or payload["jti"], payload.get("sub"))
+        return True
+
     def decode_token(self, token: str):
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -65,3 +145,38 @@ class AuthService:
             role=role
         )
         return self.user_repo.create(new_user)
+
+    async def register_user_async(self, email: str, password: str, role: str):
+        existing_user = await asyncio.to_thread(self.user_repo.get_by_email, email)
+        if existing_user:
+            raise ValueError("User already exists")
+
+        hashed_password = await self.hasher.hash_async(password)
+        new_user = User(
+            email=email,
+            password_hash=hashed_password,
+            role=role
+        )
+        return await asyncio.to_thread(self.user_repo.create, new_user)
+
+    async def change_password_async(self, email: str, current_password: str, new_password: str) -> bool:
+        user = await self.authenticate_user_async(email, current_password)
+        if not user:
+            return False
+        new_hash = await self.hasher.hash_async(new_password)
+        if not await asyncio.to_thread(self.user_repo.update_password, user.id, new_hash):
+            return False
+        get_principal_cache().invalidate_user(email=user.email, user_id=user.id)
+        return True
+
+
+# Global auth service instance, built on first use rather than at import
+_auth_service = None
+
+
+def get_auth_service() -> AuthService:
+    """Get or create the global auth service instance (FastAPI dependency)."""
+    global _auth_service
+    if _auth_service is None:
+        _auth_service = AuthService()
+    return _auth_service
@@ -1,9 +1,80 @@
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Iterator, Optional
+from ledger.export import EXPORT_FORMATS, export_chain
 from ledger.local_ledger import LocalLedger
+from ledger.verifier import BackgroundVerifier
+from ledger.writer import LedgerWriter
+from core.config import settings
+from core.metrics import register_metrics
+
+_ledger: Optional[LocalLedger] = None
+_ledger_lock = threading.Lock()
+_verifier: Optional[BackgroundVerifier] = None
+_writer: Optional[LedgerWriter] = None
+
+
+def get_ledger() -> LocalLedger:
+    """Process-wide ledger shared by every BlockchainService."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = LocalLedger(
+                directory=settings.LEDGER_DIR or None,
+                commit_interval_ms=settings.LEDGER_COMMIT_INTERVAL_MS,
+                commit_max=settings.LEDGER_COMMIT_MAX,
+                batch_max=settings.LEDGER_BATCH_MAX,
+                batch_window_ms=settings.LEDGER_BATCH_WINDOW_MS,
+                checkpoint_key=settings.SECRET_KEY.encode(),
+                segment_bytes=settings.LEDGER_SEGMENT_BYTES
+            )
+            register_metrics("ledger", _ledger.metrics)
+        return _ledger
+
+
+def get_ledger_writer() -> LedgerWriter:
+    """Queue-backed writer that keeps ledger appends off the request path."""
+    global _writer
+    ledger = get_ledger()
+    with _ledger_lock:
+        if _writer is None:
+            _writer = LedgerWriter(
+                ledger,
+                max_queue=settings.LEDGER_QUEUE_SIZE,
+                mode=settings.LEDGER_WRITE_MODE,
+                block_timeout_ms=settings.LEDGER_QUEUE_TIMEOUT_MS
+            )
+            register_metrics("ledger_writer", _writer.metrics)
+        return _writer
+
+
+def get_ledger_verifier() -> BackgroundVerifier:
+    """Background verifier advancing the ledger checkpoint every LEDGER_VERIFY_INTERVAL_S."""
+    global _verifier
+    if _verifier is None:
+        _verifier = BackgroundVerifier(get_ledger(), settings.LEDGER_VERIFY_INTERVAL_S)
+        register_metrics("ledger_verifier", _verifier.metrics)
+    return _verifier
+
+
+def close_ledger() -> None:
+    """Flush queued events, commit pending blocks and release the segment file (application shutdown)."""
+    global _ledger, _verifier, _writer
+    if _verifier is not None:
+        _verifier.stop()
+        _verifier = None
+    with _ledger_lock:
+        if _writer is not None:
+            _writer.stop()
+            _writer = None
+        if _ledger is not None:
+            _ledger.close()
+            _ledger = None
+
 
 class BlockchainService:
     def __init__(self):
-        self.ledger = LocalLedger()
+        self.ledger = get_ledger()
+        self.writer = get_ledger_writer()
 
     def log_donor_registration(self, donor_id: str, donor_name: str, blood_group: str) -> Dict:
         """Log donor registration event."""
@@ -17,7 +88,7 @@ class BlockchainService:
                 "blood_group": blood_group,
             }
         }
-        return self.ledger.append_entry(data)
+        return self.writer.submit(data)
 
     def log_hospital_request(self, request_id: str, hospital_id: str, urgency: str, organ: str) -> Dict:
         """Log hospital donation request."""
@@ -32,7 +103,7 @@ class BlockchainService:
                 "organ": organ,
             }
         }
-        return self.ledger.append_entry(data)
+        return self.writer.submit(data)
 
     def log_match_found(self, request_id: str, donor_id: str, compatibility_score: float) -> Dict:
         """Log matching found event."""
@@ -46,10 +117,49 @@ class BlockchainService:
                 "compatibility_score": compatibility_score,
             }
         }
-        return self.ledger.append_entry(data)
+        return self.writer.submit(data)
 
     def verify_chain(self) -> bool:
         return self.ledger.verify_integrity()
 
+    def verify_chain_report(self, full: bool = False) -> Dict:
+        """Incremental check from the last checkpoint, or a parallel deep audit with full=True."""
+        return self.ledger.verify(full=full, workers=settings.LEDGER_VERIFY_WORKERS if full else 0)
+
+    def get_inclusion_proof(self, event_id: str) -> Optional[Dict]:
+        return self.ledger.inclusion_proof(event_id)
+
+    def query_audit_trail(self, entity_id: Optional[str] = None, event_type: Optional[str] = None,
+                          since: Optional[str] = None, until: Optional[str] = None,
+                          cursor: Optional[str] = None, limit: int = 50) -> Dict:
+        """Indexed, paginated event lookup (see LocalLedger.query_events)."""
+        return self.ledger.query_events(entity_id, event_type, since, until, cursor, limit)
+
+    def export_chain(self, fmt: str = "ndjson", from_height: int = 0,
+                     running_hash: Optional[str] = None) -> Iterator[str]:
+        """
+        Export rows for blocks from_height..current height, streamed from disk.
+        Raises ValueError for an unknown format or a height past the tail.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if from_height < 0 or from_height > self.ledger.height + 1:
+            raise ValueError(f"from_height must be between 0 and {self.ledger.height + 1}")
+        return export_chain(
+            self.ledger.iter_blocks(from_height), fmt, running_hash, header=from_height == 0
+        )
+
     def get_full_chain(self) -> list:
         return self.ledger.chain
+
+
+# Global blockchain service instance, built on first use rather than at import
+_blockchain_service = None
+
+
+def get_blockchain_service() -> BlockchainService:
+    """Get or create the global blockchain service instance (FastAPI dependency)."""
+    global _blockchain_service
+    if _blockchain_service is None:
+        _blockchain_service = BlockchainService()
+    return _blockchain_service
@@ -1,12 +1,16 @@
+import logging
 from typing import List, Optional
 from models.donor_schema import DonorModel
 from repositories.donor_repository import DonorRepository
+from repositories.match_repository import MatchRepository
+from repositories.request_repository import RequestRepository
 
 from services.blockchain_service import BlockchainService
 
 class DonorService:
     def __init__(self):
         self.repository = DonorRepository()
+        self.match_repository = MatchRepository()
         self.blockchain_service = BlockchainService()
 
     def create_donor(self, donor: DonorModel) -> DonorModel:
@@ -21,9 +25,9 @@ class DonorService:
                 donor_name=f"{created_donor.first_name} {created_donor.last_name}",
                 blood_group=created_donor.blood_group
             )
-        except Exception:
-            # Don't fail the request if blockchain logging fails, but maybe log error
-            pass
+        except Exception as e:
+            # Don't fail the request if blockchain logging fails
+            logging.getLogger(__name__).warning(f"Blockchain logging failed for donor {created_donor.id}: {e}")
         
         return created_donor
 
@@ -42,6 +46,33 @@ class DonorService:
             return None
         return self.repository.update(donor.id, update_data)
 
+    def get_matched_requests(self, user_id: str, skip: int = 0, limit: int = 20) -> Optional[List[dict]]:
+        """Requests this donor has been matched to, best score first."""
+        donor = self.repository.get_by_user_id(user_id)
+        if not donor:
+            return None
+        matches = self.match_repository.get_for_donor(str(donor.id), skip=skip, limit=limit)
+        requests = {
+            str(r.id): r
+            for r in RequestRepository().get_many([m["request_id"] for m in matches])
+        }
+        results = []
+        for m in matches:
+            request = requests.get(m["request_id"])
+            if not request:
+                continue
+            results.append({
+                "request_id": m["request_id"],
+                "match_score": m["match_score"],
+                "organ": request.organ,
+                "blood_group": request.blood_group,
+                "urgency": request.urgency,
+                "hospital_location": request.hospital_location,
+                "required_date": request.required_date,
+                "status": request.status,
+            })
+        return results
+
     def get_donation_history(self, user_id: str) -> List[dict]:
         # Returns logic for matching requests
         # Filter requests where status is 'MATCHED' and matched_donor_id == donor.id
@@ -49,3 +80,15 @@ class DonorService:
         # Ideally, we should inject RequestService or Repo.
         # For now, simplistic approximation or placeholder.
         return []
+
+
+# Global donor service instance, built on first use rather than at import
+_donor_service = None
+
+
+def get_donor_service() -> DonorService:
+    """Get or create the global donor service instance (FastAPI dependency)."""
+    global _donor_service
+    if _donor_service is None:
+        _donor_service = DonorService()
+    return _donor_service
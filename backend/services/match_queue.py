@@ -0,0 +1,223 @@
+"""
+Match Job Queue - Background Donor Matching
+============================================
+
+Request creation only enqueues a matching job; worker threads pick jobs
+up in priority order (critical urgency first, then earliest
+required_date) and write the matches back to the request.
+
+When MATCH_QUEUE_PERSIST is enabled, pending jobs are mirrored into the
+`match_jobs` collection and re-enqueued on startup, so a restart does
+not lose work that was accepted but not yet matched.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from core.config import settings
+from core.metrics import LatencyWindow, register_metrics
+
+URGENCY_PRIORITY = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+# Finished jobs kept for status lookups before the oldest are forgotten
+MAX_TRACKED_JOBS = 10000
+
+logger = logging.getLogger(__name__)
+
+
+class MatchJobQueue:
+    """Priority queue of matching jobs drained by a pool of worker threads."""
+
+    def __init__(self, workers: int = 2, persist: bool = False):
+        self.workers = workers
+        self.persist = persist
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._seq = itertools.count()
+        self._threads = []
+        self._started = False
+        self._start_lock = threading.Lock()
+        self.wait_latency = LatencyWindow()
+        self.run_latency = LatencyWindow()
+        self.failed = 0
+
+    # ---- lifecycle -------------------------------------------------------
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            if self.persist:
+                self._recover_pending()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"match-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal workers to exit once the queue is drained."""
+        with self._start_lock:
+            if not self._started:
+                return
+            for _ in self._threads:
+                # Sentinels sort after every real job
+                self._queue.put((len(URGENCY_PRIORITY), "", next(self._seq), None))
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+            self._started = False
+
+    # ---- public API ------------------------------------------------------
+
+    def submit(self, request_id: str, urgency: str, required_date: Optional[str]) -> Dict[str, Any]:
+        """Enqueue matching for a request and return its job status."""
+        self.start()
+        job = {
+            "request_id": request_id,
+            "state": "queued",
+            "urgency": urgency,
+            "required_date": required_date,
+            "enqueued_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "match_count": None,
+            "error": None,
+        }
+        with self._jobs_lock:
+            self._jobs[request_id] = job
+            self._jobs.move_to_end(request_id)
+            self._prune()
+        if self.persist:
+            self._persist(job)
+        self._enqueue(job, time.monotonic())
+        return dict(job)
+
+    def status(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._jobs_lock:
+            job = self._jobs.get(request_id)
+            return dict(job) if job else None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._jobs_lock:
+            running = sum(1 for j in self._jobs.values() if j["state"] == "running")
+        return {
+            "queue_depth": self._queue.qsize(),
+            "running": running,
+            "workers": len(self._threads),
+            "failed": self.failed,
+            "wait_latency": self.wait_latency.summary(),
+            "run_latency": self.run_latency.summary(),
+        }
+
+    # ---- internals -------------------------------------------------------
+
+    def _enqueue(self, job: Dict[str, Any], enqueued: float) -> None:
+        priority = URGENCY_PRIORITY.get(job["urgency"], URGENCY_PRIORITY["medium"])
+        self._queue.put((priority, job["required_date"] or "9999", next(self._seq), (job["request_id"], enqueued)))
+
+    def _worker(self) -> None:
+        from services.request_service import RequestService
+        service = RequestService()
+        while True:
+            _, _, _, item = self._queue.get()
+            if item is None:
+                return
+            request_id, enqueued = item
+            started = time.monotonic()
+            self.wait_latency.observe(started - enqueued)
+            self._update(request_id, state="running", started_at=datetime.utcnow().isoformat())
+            try:
+                matches = service.run_matching(request_id)
+                self._update(request_id, state="completed", match_count=len(matches))
+            except Exception as e:
+                self.failed += 1
+                logger.exception("Matching job failed for request %s", request_id)
+                self._update(request_id, state="failed", error=str(e))
+            finally:
+                self.run_latency.observe(time.monotonic() - started)
+                self._update(request_id, finished_at=datetime.utcnow().isoformat())
+                if self.persist:
+                    self._unpersist(request_id)
+
+    def _update(self, request_id: str, **fields) -> None:
+        with self._jobs_lock:
+            job = self._jobs.get(request_id)
+            if job:
+                job.update(fields)
+
+    def _prune(self) -> None:
+        excess = len(self._jobs) - MAX_TRACKED_JOBS
+        for request_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[request_id]["finished_at"]:
+                del self._jobs[request_id]
+                excess -= 1
+
+    def _persist(self, job: Dict[str, Any]) -> None:
+        try:
+            from core.db_instance import get_collection
+            get_collection("match_jobs").insert_one({
+                "request_id": job["request_id"],
+                "urgency": job["urgency"],
+                "required_date": job["required_date"],
+                "enqueued_at": job["enqueued_at"],
+            })
+        except Exception as e:
+            logger.warning(f"Could not persist matching job {job['request_id']}: {e}")
+
+    def _unpersist(self, request_id: str) -> None:
+        try:
+            from core.db_instance import get_collection
+            get_collection("match_jobs").delete_many({"request_id": request_id})
+        except Exception as e:
+            logger.warning(f"Could not clear persisted matching job {request_id}: {e}")
+
+    def _recover_pending(self) -> None:
+        try:
+            from core.db_instance import get_collection
+            pending = list(get_collection("match_jobs").find({}))
+        except Exception as e:
+            logger.warning(f"Could not recover persisted matching jobs: {e}")
+            return
+        for doc in pending:
+            job = {
+                "request_id": doc["request_id"],
+                "state": "queued",
+                "urgency": doc.get("urgency", "medium"),
+                "required_date": doc.get("required_date"),
+                "enqueued_at": doc.get("enqueued_at"),
+                "started_at": None,
+                "finished_at": None,
+                "match_count": None,
+                "error": None,
+            }
+            with self._jobs_lock:
+                self._jobs[job["request_id"]] = job
+            self._enqueue(job, time.monotonic())
+        if pending:
+            logger.info(f"Recovered {len(pending)} pending matching jobs")
+
+
+# Global match queue instance
+_match_queue = None
+
+
+def get_match_queue() -> MatchJobQueue:
+    """Get or create the global match job queue."""
+    global _match_queue
+    if _match_queue is None:
+        _match_queue = MatchJobQueue(
+            workers=settings.MATCH_QUEUE_WORKERS,
+            persist=settings.MATCH_QUEUE_PERSIST
+        )
+        register_metrics("match_queue", _match_queue.metrics)
+    return _match_queue
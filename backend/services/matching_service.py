@@ -1,53 +1,109 @@
-from typing import List, Dict, Optional
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from repositories.donor_repository import DonorRepository
 from repositories.request_repository import RequestRepository
 from services.blockchain_service import BlockchainService
 from ai.advanced_matching import AdvancedDonorMatcher
+from ai.matching import match_donors
+from ai.geo import haversine_km
+from core.config import settings
 
 class MatchingService:
     def __init__(self):
         self.donor_repository = DonorRepository()
         self.request_repository = RequestRepository()
         self.blockchain_service = BlockchainService()
-        self.matcher = AdvancedDonorMatcher()
+        self.matcher = AdvancedDonorMatcher(
+            parallel_threshold=settings.MATCH_PARALLEL_THRESHOLD,
+            parallel_workers=settings.MATCH_PARALLEL_WORKERS
+        )
 
-    def find_matches_for_request(self, request_id: str) -> List[Dict]:
+    def find_matches_for_request(self, request_id: str, explain: bool = False) -> List[Dict]:
         """
         Find best donor matches for a given request.
         Logs high-confidence matches to the blockchain.
+        Matches are compact (donor_id, match_score, components) unless
+        explain is set, in which case breakdowns and recommendations are rendered.
         """
+        request, donor_dicts, request_dict = self._prepare_candidates(request_id)
+
+        # 4. Tier 2: full AI scoring of the candidates
+        matches = self.matcher.rank_donor_matches(
+            donors=donor_dicts,
+            recipient=request_dict,
+            urgency=request.urgency,
+            limit=5,
+            compact=True
+        )
+
+        self._log_matches(request_id, matches)
+        if explain:
+            by_id = {d['id']: d for d in donor_dicts}
+            return [self.matcher.explain_match(m, by_id.get(m['donor_id'])) for m in matches]
+        return matches
+
+    def explain_matches(self, matches: List[Dict]) -> List[Dict]:
+        """
+        Render stored compact matches in full, fetching all their donors in one query.
+        Matches saved before compaction already carry a breakdown and pass through.
+        """
+        pending = [m for m in matches if 'breakdown' not in m and m.get('donor_id')]
+        if not pending:
+            return matches
+        donors = {d['id']: d for d in self.donor_repository.get_many_dicts([m['donor_id'] for m in pending])}
+        return [self.matcher.explain_match(m, donors.get(m.get('donor_id'))) for m in matches]
+
+    def stream_matches_for_request(self, request_id: str, limit: int = 5, explain: bool = False) -> Iterator[Dict]:
+        """
+        Progressive variant of find_matches_for_request.
+        Raises ValueError up front for unknown requests; the returned iterator
+        yields 'partial' top-k snapshots while scoring and closes with one
+        'final' snapshot, the authoritative ranking, logged like find_matches.
+        """
+        request, donor_dicts, request_dict = self._prepare_candidates(request_id)
+
+        def snapshots():
+            total = len(donor_dicts)
+            matches: List[Dict] = []
+            for processed, matches in self.matcher.iter_ranking_snapshots(
+                donor_dicts, request_dict, request.urgency, limit, compact=not explain
+            ):
+                if processed < total:
+                    yield {"type": "partial", "processed": processed, "total": total, "matches": matches}
+
+            self._log_matches(request_id, matches)
+            yield {"type": "final", "processed": total, "total": total, "matches": matches}
+
+        return snapshots()
+
+    def _prepare_candidates(self, request_id: str) -> Tuple[Any, List[Dict], Dict]:
         # 1. Fetch Request
         request = self.request_repository.get(request_id)
         if not request:
             raise ValueError(f"Request with ID {request_id} not found")
 
-        # 2. Fetch Potential Donors
-        if request.organ == "Whole Blood":
-            # Matching blood donors based on blood group compatibility
-            donors = self.donor_repository.get_by_blood_group(request.blood_group)
-        else:
-            # Matching organ donors based on organ type
-            donors = self.donor_repository.get_by_organ(request.organ)
-        
-        # Convert models to dicts for the AI module
+        # 2. Tier 1: bounded, index-backed candidate set
+        # (available, blood-compatible donors of the requested organ, near the
+        # request, so the limit never cuts nearby donors in favour of distant ones)
         donor_dicts = []
-        for d in donors:
-            d_dict = d.dict()
-            d_dict['id'] = str(d.id)
-            donor_dicts.append(d_dict)
+        for d in match_donors(request, max_results=settings.MATCH_CANDIDATE_LIMIT, radius_km=settings.MATCH_RADIUS_KM):
+            d['location'] = d.get('address')
+            donor_dicts.append(d)
 
         request_dict = request.dict()
         request_dict['id'] = str(request.id)
+        request_dict['location'] = request.hospital_location
 
-        # 3. Running AI Matching
-        matches = self.matcher.rank_donor_matches(
-            donors=donor_dicts,
-            recipient=request_dict,
-            urgency=request.urgency,
-            limit=5
-        )
+        # 3. Drop donors in the corners of the bounding box before scoring
+        if request.latitude is not None and settings.MATCH_RADIUS_KM > 0:
+            donor_dicts = self._filter_by_radius(
+                donor_dicts, (request.latitude, request.longitude), settings.MATCH_RADIUS_KM
+            )
+
+        return request, donor_dicts, request_dict
 
-        # 4. Log meaningful matches to Blockchain
+    def _log_matches(self, request_id: str, matches: List[Dict]) -> None:
+        # 5. Log meaningful matches to Blockchain
         for match in matches:
             if match.get('match_score', 0) > 0.8: # High confidence threshold
                 try:
@@ -56,7 +112,36 @@ class MatchingService:
                         donor_id=str(match.get('donor_id')),
                         compatibility_score=match.get('match_score')
                     )
-                except Exception:
-                    pass 
+                except Exception as e:
+                    logging.getLogger(__name__).warning(
+                        f"Blockchain logging failed for match {request_id}/{match.get('donor_id')}: {e}"
+                    )
 
-        return matches
+    def _filter_by_radius(self, donor_dicts: List[Dict], center, radius_km: float) -> List[Dict]:
+        """
+        Keep donors within radius_km of center, measured from the coordinates
+        just loaded with each donor. Donors without coordinates are kept and
+        scored on address text instead.
+        """
+        kept = []
+        for d in donor_dicts:
+            if d.get('latitude') is None or d.get('longitude') is None:
+                kept.append(d)
+                continue
+            distance = haversine_km(center, (d['latitude'], d['longitude']))
+            if distance <= radius_km:
+                d['distance_km'] = distance
+                kept.append(d)
+        return kept
+
+
+# Global matching service instance, built on first use rather than at import
+_matching_service = None
+
+
+def get_matching_service() -> MatchingService:
+    """Get or create the global matching service instance (FastAPI dependency)."""
+    global _matching_service
+    if _matching_service is None:
+        _matching_service = MatchingService()
+    return _matching_service
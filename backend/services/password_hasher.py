@@ -0,0 +1,122 @@
+"""
+Password Hasher - Bounded Hashing Executor
+==========================================
+
+pbkdf2 is deliberately expensive. Running it on the request thread let a
+login burst occupy the whole Starlette threadpool, so hashing and
+verification now run on a small dedicated pool (PASSWORD_HASH_WORKERS).
+At most PASSWORD_HASH_QUEUE calls may wait behind it; beyond that callers
+get HasherBusy (a 503 with Retry-After) instead of piling up.
+
+The work factor is PASSWORD_HASH_ROUNDS. Stored hashes with fewer rounds
+still verify, and are flagged by passlib's needs_update so the caller can
+rehash them with the current parameters after a successful login.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from core.config import settings
+from core.error_handlers import AppError
+from core.metrics import LatencyWindow, register_metrics
+
+
+class HasherBusy(AppError):
+    """Raised when the hashing queue is full; surfaces as 503 with Retry-After."""
+
+    def __init__(self):
+        super().__init__("Authentication is busy, please retry shortly", status_code=503, headers={"Retry-After": "1"})
+
+
+def build_password_context(rounds: int) -> CryptContext:
+    # min_rounds makes hashes below the current work factor "need update"
+    return CryptContext(
+        schemes=["pbkdf2_sha256"],
+        deprecated="auto",
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+    )
+
+
+class PasswordHasher:
+    def __init__(self, rounds: int, workers: int, max_pending: int):
+        self.rounds = rounds
+        self.workers = max(1, workers)
+        self.context = build_password_context(rounds)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, max_pending))
+        self.queue_time = LatencyWindow()
+        self.hash_time = LatencyWindow()
+        self.rejected = 0
+        self.rehashed = 0
+
+    def _submit(self, fn: Callable[..., Any], *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HasherBusy()
+        enqueued = time.perf_counter()
+
+        def run():
+            started = time.perf_counter()
+            self.queue_time.observe(started - enqueued)
+            try:
+                return fn(*args)
+            finally:
+                self.hash_time.observe(time.perf_counter() - started)
+
+        try:
+            future = self._executor.submit(run)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Also runs when a waiting call is cancelled, so the slot is never lost
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def hash(self, password: str) -> str:
+        return self._submit(self.context.hash, password).result()
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._submit(self.context.verify, password, password_hash).result()
+
+    def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash); new_hash is set when the stored hash needs_update."""
+        return self._submit(self.context.verify_and_update, password, password_hash).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self.context.hash, password))
+
+    async def verify_and_update_async(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self._submit(self.context.verify_and_update, password, password_hash))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "queue_time": self.queue_time.summary(),
+            "hash_time": self.hash_time.summary(),
+        }
+
+
+# Global password hasher instance
+_password_hasher = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get or create the global password hasher."""
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(
+            rounds=settings.PASSWORD_HASH_ROUNDS,
+            workers=settings.PASSWORD_HASH_WORKERS,
+            max_pending=settings.PASSWORD_HASH_QUEUE
+        )
+        register_metrics("password_hasher", _password_hasher.metrics)
+    return _password_hasher
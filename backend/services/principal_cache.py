@@ -0,0 +1,134 @@
+"""
+Principal Cache - Authenticated User Lookup
+===========================================
+
+get_current_user used to decode the JWT, query the users collection and
+validate a User model on every authenticated request. Resolved principals
+are now kept for a short TTL, keyed by the access token itself (which
+carries the subject and a unique jti), so a repeat request costs one dict
+lookup and skips both the signature check and the database.
+
+Entries never outlive their token, and every entry of a user is dropped
+when the user is deactivated or changes password. Invalidation is local to
+the process; other workers pick the change up within the TTL. Each entry
+also keeps the token's refresh family ("fam"), so callers can still check
+family revocation, which is shared across processes, on a hit.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from core.config import settings
+from core.metrics import register_metrics
+from models.user import User
+
+
+class PrincipalCache:
+    def __init__(self, ttl_s: float, max_entries: int):
+        self.ttl = ttl_s
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        # token -> (user, family, expires_at); oldest first for LRU eviction
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._by_subject: Dict[str, Set[str]] = {}
+        self._by_user_id: Dict[str, Set[str]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, token: str) -> Optional[Tuple[User, Optional[str]]]:
+        """(user, refresh family) cached for `token`, or None."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                user, family, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(token)
+                    self.hits += 1
+                    return user, family
+                self._drop_locked(token)
+            self.misses += 1
+            return None
+
+    def put(self, token: str, user: User, token_exp: Optional[float] = None, family: Optional[str] = None) -> None:
+        """Cache `user` for `token`; token_exp (epoch seconds) caps the entry's lifetime."""
+        if not self.enabled:
+            return
+        lifetime = self.ttl
+        if token_exp is not None:
+            lifetime = min(lifetime, token_exp - time.time())
+            if lifetime <= 0:
+                return
+        with self._lock:
+            if token in self._entries:
+                self._drop_locked(token)
+            self._entries[token] = (user, family, time.monotonic() + lifetime)
+            self._by_subject.setdefault(user.email, set()).add(token)
+            if user.id:
+                self._by_user_id.setdefault(str(user.id), set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._drop_locked(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop_locked(self, token: str) -> None:
+        user, _, _ = self._entries.pop(token)
+        for index, key in ((self._by_subject, user.email), (self._by_user_id, str(user.id) if user.id else None)):
+            tokens = index.get(key)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del index[key]
+
+    def invalidate_user(self, email: Optional[str] = None, user_id: Optional[str] = None) -> int:
+        """Drop every cached principal for a user; returns how many entries were removed."""
+        with self._lock:
+            tokens = set(self._by_subject.get(email, ())) if email else set()
+            if user_id:
+                tokens |= self._by_user_id.get(str(user_id), set())
+            for token in tokens:
+                self._drop_locked(token)
+            self.invalidations += 1
+            return len(tokens)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_subject.clear()
+            self._by_user_id.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "ttl_s": self.ttl,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Global principal cache instance
+_principal_cache = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get or create the global principal cache."""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache(
+            ttl_s=settings.PRINCIPAL_CACHE_TTL_S,
+            max_entries=settings.PRINCIPAL_CACHE_SIZE
+        )
+        register_metrics("principal_cache", _principal_cache.metrics)
+    return _principal_cache
@@ -1,43 +1,124 @@
 from typing import List, Optional
 from models.request import DonationRequest
 from repositories.request_repository import RequestRepository
+from repositories.hospital_repository import HospitalRepository
+from repositories.match_repository import MatchRepository
 from services.matching_service import MatchingService
+from services.match_queue import get_match_queue
+from ai.geo import geocode
 from datetime import datetime
 
 class RequestService:
     def __init__(self):
         self.repository = RequestRepository()
+        self.match_repository = MatchRepository()
         self.matching_service = MatchingService()
 
     def create_request(self, request: DonationRequest, user_id: str) -> DonationRequest:
         """
-        Handle request creation and immediately trigger AI matching.
+        Handle request creation and queue AI matching in the background.
+        The request is returned in 'pending'; poll get_match_status for progress.
         """
         # 1. Prepare data
-        request_data = request.dict(exclude={'id', 'matches', 'created_at'})
+        request_data = request.dict(exclude={'id', 'matches', 'match_count', 'created_at'})
         request_data['user_id'] = user_id
         request_data['status'] = 'pending'
         request_data['created_at'] = datetime.now().isoformat()
-        
+        if request_data.get('latitude') is None:
+            coords = self._geocode_location(request.hospital_location)
+            if coords:
+                request_data['latitude'], request_data['longitude'] = coords
+
         # 2. Save to database
         created_request = self.repository.create(DonationRequest(**request_data))
-        request_id = str(created_request.id)
-        
-        # 3. Synchronously run matching logic
-        # For production, this could be backgrounded if it's too slow.
+
+        # 3. Hand matching to the background queue
+        get_match_queue().submit(
+            str(created_request.id), created_request.urgency, created_request.required_date
+        )
+
+        return created_request
+
+    def run_matching(self, request_id: str) -> List[dict]:
+        """
+        Run AI matching for a stored request and save the results
+        to the matches collection; the request only keeps the count.
+        Matches are stored compact; explain_matches renders them on read.
+        Called by the match queue workers.
+        """
         matches = self.matching_service.find_matches_for_request(request_id)
-        
-        # 4. Update request with matches
+
+        self.match_repository.replace_for_request(request_id, matches)
         status = 'matched' if matches else 'pending'
-        updated_request = self.repository.update(request_id, {
-            "matches": matches,
+        self.repository.update(request_id, {
+            "matches": [],  # drop any legacy embedded list
+            "match_count": len(matches),
             "status": status
         })
-        
-        return updated_request
+        return matches
+
+    def get_match_status(self, request_id: str) -> Optional[dict]:
+        """Matching job progress, or the stored outcome if the job is no longer tracked."""
+        job = get_match_queue().status(request_id)
+        if job:
+            return job
+        request = self.repository.get(request_id)
+        if not request:
+            return None
+        match_count = request.match_count or len(request.matches)
+        return {
+            "request_id": request_id,
+            "state": "completed" if request.status != "pending" or match_count else "unknown",
+            "match_count": match_count,
+        }
 
-    def list_requests(self, filter_query: dict = None) -> List[DonationRequest]:
-        return self.repository.get_multi(filter_query=filter_query)
+    def _geocode_location(self, hospital_location: str):
+        """Resolve the request location, falling back to the named hospital's city."""
+        coords = geocode(hospital_location)
+        if coords:
+            return coords
+        hospital = HospitalRepository().get_by_name(hospital_location)
+        if hospital:
+            return geocode(f"{hospital.address or ''}, {hospital.city}")
+        return None
+
+    def list_requests(self, filter_query: dict = None, explain: bool = False) -> List[DonationRequest]:
+        """
+        List requests with their top matches attached from the matches
+        collection in a single batched lookup.
+        """
+        requests = self.repository.get_multi(filter_query=filter_query)
+        matched = [str(r.id) for r in requests if r.match_count]
+        grouped = self.match_repository.get_for_requests(matched) if matched else {}
+        for req in requests:
+            # Requests matched before the matches collection keep their embedded list
+            req.matches = grouped.get(str(req.id), req.matches)
+        if explain:
+            # One donor lookup for the matches of every listed request
+            explained = iter(self.matching_service.explain_matches(
+                [m for req in requests for m in (req.matches or [])]
+            ))
+            for req in requests:
+                if req.matches:
+                    req.matches = [next(explained) for _ in req.matches]
+        return requests
+
+    def get_matches(self, request_id: str, skip: int = 0, limit: int = 20, explain: bool = False) -> List[dict]:
+        """One page of a request's matches, best first."""
+        matches = self.match_repository.get_for_request(request_id, skip=skip, limit=limit)
+        return self.matching_service.explain_matches(matches) if explain else matches
 
     def get_request_by_id(self, request_id: str) -> Optional[DonationRequest]:
         return self.repository.get(request_id)
+
+
+# Global request service instance, built on first use rather than at import
+_request_service = None
+
+
+def get_request_service() -> RequestService:
+    """Get or create the global request service instance (FastAPI dependency)."""
+    global _request_service
+    if _request_service is None:
+        _request_service = RequestService()
+    return _request_service
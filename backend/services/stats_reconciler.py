@@ -0,0 +1,88 @@
+"""
+Stats Reconciler - Background Counter Repair
+============================================
+
+The admin statistics are served from counters maintained on write (see
+repositories/counter_repository.py). This job recounts the source
+collections every STATS_RECONCILE_INTERVAL_S, logs any drift it finds and
+corrects counters that show the same drift two runs in a row. The first
+run happens right after startup and creates any missing counters, which
+backfills an existing database.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from core.config import settings
+from core.metrics import register_metrics
+from repositories.repository import RepositoryFactory
+
+logger = logging.getLogger(__name__)
+
+
+class StatsReconciler:
+    def __init__(self, interval_s: float):
+        self.interval = interval_s
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.runs = 0
+        self.drifted_runs = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stats-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self) -> Dict[str, Any]:
+        """Recount now; returns the drift report."""
+        with self._lock:
+            report = RepositoryFactory.get_counter_repository().reconcile()
+            self.runs += 1
+            self.last_report = report
+            if report["drift"]:
+                self.drifted_runs += 1
+                repaired = sum(1 for d in report["drift"].values() if d["repaired"])
+                logger.warning(f"Stats counters drifted, repaired {repaired} of {len(report['drift'])}: {report['drift']}")
+            return report
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.exception(f"Stats reconciliation failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "interval_s": self.interval,
+            "running": self._thread is not None,
+            "runs": self.runs,
+            "drifted_runs": self.drifted_runs,
+            "last_report": self.last_report,
+        }
+
+
+# Global stats reconciler instance
+_stats_reconciler = None
+
+
+def get_stats_reconciler() -> StatsReconciler:
+    """Get or create the global stats reconciler."""
+    global _stats_reconciler
+    if _stats_reconciler is None:
+        _stats_reconciler = StatsReconciler(settings.STATS_RECONCILE_INTERVAL_S)
+        register_metrics("stats_reconciler", _stats_reconciler.metrics)
+    return _stats_reconciler
@@ -0,0 +1,196 @@
+"""
+Token Revocation Store - Refresh Rotation and Family Revocation
+===============================================================
+
+Every login starts a token family ("fam" claim); each refresh consumes the
+presented refresh token's jti and issues a new pair in the same family.
+Presenting a consumed jti again means the token was copied, so the whole
+family is revoked, including its outstanding access tokens.
+
+Records live in the `revoked_tokens` collection (Mongo expires them via a
+TTL index on expires_at) and are mirrored in memory:
+
+- consume() is an insert keyed by the jti, so two processes racing on the
+  same refresh token cannot both succeed.
+- is_revoked() runs on every authenticated request. A Bloom filter over
+  revoked keys answers the common "not revoked" case with a few bit
+  probes; only possible hits consult the in-memory map. New records made
+  by other processes are pulled in every REVOCATION_SYNC_S.
+- Expired entries are swept from memory and the filter is rebuilt without
+  them.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from core.config import settings
+from core.metrics import register_metrics
+from utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "revoked_tokens"
+
+
+def _jti_key(jti: str) -> str:
+    return f"jti:{jti}"
+
+
+def _family_key(family: str) -> str:
+    return f"fam:{family}"
+
+
+class RevocationStore:
+    def __init__(self, bloom_capacity: int, sync_interval_s: float):
+        self.sync_interval = sync_interval_s
+        self._lock = threading.Lock()
+        self._expiry: Dict[str, float] = {}
+        self._bloom = BloomFilter(bloom_capacity)
+        self._last_sync: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._next_sweep = 0.0
+
+        self.checks = 0
+        self.bloom_negatives = 0
+        self.reuse_detected = 0
+        self.families_revoked = 0
+
+    @property
+    def collection(self):
+        from core.db_instance import get_collection
+        return get_collection(COLLECTION)
+
+    def _remember_locked(self, key: str, expires_at: float) -> None:
+        if key not in self._expiry:
+            self._bloom.add(key)
+        self._expiry[key] = expires_at
+        if self._bloom.saturated:
+            self._rebuild_locked()
+
+    def _rebuild_locked(self) -> None:
+        capacity = self._bloom.capacity
+        while capacity < len(self._expiry) * 2:
+            capacity *= 2
+        self._bloom = BloomFilter(capacity, self._bloom.error_rate)
+        self._bloom.update(self._expiry)
+
+    def _sweep_locked(self, now: float) -> None:
+        expired = [key for key, expires_at in self._expiry.items() if expires_at <= now]
+        for key in expired:
+            del self._expiry[key]
+        if expired:
+            self._rebuild_locked()
+
+    def _record(self, key: str, kind: str, subject: Optional[str], expires_at: float) -> Dict[str, Any]:
+        return {
+            "_id": key,
+            "kind": kind,
+            "sub": subject,
+            "expires_at": datetime.utcfromtimestamp(expires_at),
+            "created_at": datetime.utcnow(),
+        }
+
+    def consume(self, jti: str, subject: Optional[str], expires_at: float) -> bool:
+        """
+        Mark a refresh token as used. Returns False when it already was,
+        i.e. the token is being replayed.
+        """
+        key = _jti_key(jti)
+        with self._lock:
+            replayed = self._expiry.get(key, 0) > time.time()
+        if not replayed:
+            try:
+                self.collection.insert_one(self._record(key, "rotated", subject, expires_at))
+            except DuplicateKeyError:
+                replayed = True  # consumed by another process
+        with self._lock:
+            self._remember_locked(key, expires_at)
+            if replayed:
+                self.reuse_detected += 1
+        return not replayed
+
+    def revoke_family(self, family: str, subject: Optional[str], expires_at: float) -> None:
+        key = _family_key(family)
+        self.collection.update_one(
+            {"_id": key},
+            {"$set": self._record(key, "family", subject, expires_at)},
+            upsert=True
+        )
+        with self._lock:
+            self._remember_locked(key, expires_at)
+            self.families_revoked += 1
+
+    def is_revoked(self, family: Optional[str] = None, jti: Optional[str] = None) -> bool:
+        """True when the token's family was revoked or its jti was consumed."""
+        self._maybe_sync()
+        keys = [k for k in (family and _family_key(family), jti and _jti_key(jti)) if k]
+        now = time.time()
+        with self._lock:
+            self.checks += 1
+            possible = [k for k in keys if k in self._bloom]
+            if not possible:
+                self.bloom_negatives += 1
+                return False
+            return any(self._expiry.get(k, 0) > now for k in possible)
+
+    def _maybe_sync(self) -> None:
+        """Pull records written by other processes since the last sync."""
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        with self._lock:
+            if now < self._next_sync:
+                return
+            self._next_sync = now + self.sync_interval
+            since = self._last_sync
+        # Overlap the window so records stamped by a slightly slower clock are not missed
+        query = {"created_at": {"$gt": since - timedelta(seconds=30)}} if since else {}
+        synced_at = datetime.utcnow()
+        try:
+            docs = list(self.collection.find(query, {"expires_at": 1}))
+        except Exception as e:
+            logger.warning(f"Revocation sync failed: {e}")
+            return
+        with self._lock:
+            for doc in docs:
+                expires_at = doc["expires_at"]
+                if isinstance(expires_at, datetime):
+                    expires_at = (expires_at - datetime(1970, 1, 1)).total_seconds()
+                self._remember_locked(doc["_id"], expires_at)
+            self._last_sync = synced_at
+            if now >= self._next_sweep:
+                self._next_sweep = now + max(60.0, self.sync_interval)
+                self._sweep_locked(time.time())
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._expiry),
+                "bloom_capacity": self._bloom.capacity,
+                "bloom_bits": self._bloom.size,
+                "checks": self.checks,
+                "bloom_negatives": self.bloom_negatives,
+                "reuse_detected": self.reuse_detected,
+                "families_revoked": self.families_revoked,
+            }
+
+
+# Global revocation store instance
+_revocation_store = None
+
+
+def get_revocation_store() -> RevocationStore:
+    """Get or create the global token revocation store."""
+    global _revocation_store
+    if _revocation_store is None:
+        _revocation_store = RevocationStore(
+            bloom_capacity=settings.REVOCATION_BLOOM_CAPACITY,
+            sync_interval_s=settings.REVOCATION_SYNC_S
+        )
+        register_metrics("token_revocation", _revocation_store.metrics)
+    return _revocation_store
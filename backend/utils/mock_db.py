@@ -1,5 +1,91 @@
 from typing import List, Dict, Any, Optional
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+def _project(doc: Dict[str, Any], projection: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a Mongo-style inclusion or exclusion projection."""
+    if any(v for k, v in projection.items() if k != "_id"):
+        projected = {k: doc[k] for k, v in projection.items() if v and k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            projected["_id"] = doc["_id"]
+        return projected
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+def _match_value(value: Any, condition: Any) -> bool:
+    """Match one field value against a literal or an operator dict."""
+    values = value if isinstance(value, list) else [value]
+    if isinstance(condition, dict) and any(str(k).startswith("$") for k in condition):
+        for op, arg in condition.items():
+            present = [v for v in values if v is not None]
+            if op == "$in":
+                ok = any(v in arg for v in values) or (value is None and None in arg)
+            elif op == "$nin":
+                ok = not any(v in arg for v in values)
+            elif op == "$ne":
+                ok = arg not in values
+            elif op == "$exists":
+                ok = (value is not None) == bool(arg)
+            elif op == "$gt":
+                ok = any(v > arg for v in present)
+            elif op == "$gte":
+                ok = any(v >= arg for v in present)
+            elif op == "$lt":
+                ok = any(v < arg for v in present)
+            elif op == "$lte":
+                ok = any(v <= arg for v in present)
+            else:
+                raise NotImplementedError(f"MockCollection does not support {op}")
+            if not ok:
+                return False
+        return True
+    # Array fields match when any element equals the literal
+    return value == condition or condition in values
+
+def _matches(item: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a (subset of a) MongoDB query against one document."""
+    for k, v in (query or {}).items():
+        if not _match_value(item.get(k), v):
+            return False
+    return True
+
+def _field(doc: Dict[str, Any], expr: Any) -> Any:
+    """Resolve a "$field" path (or return a literal) for aggregation stages."""
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = doc
+        for part in expr[1:].split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+    return expr
+
+def _group(docs: List[Dict[str, Any]], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    groups: Dict[Any, Dict[str, Any]] = {}
+    counts: Dict[Any, Dict[str, int]] = {}
+    for doc in docs:
+        key = _field(doc, spec["_id"])
+        hashable = tuple(key) if isinstance(key, list) else key
+        out = groups.setdefault(hashable, {"_id": key})
+        seen = counts.setdefault(hashable, {})
+        for name, accumulator in spec.items():
+            if name == "_id":
+                continue
+            (op, arg), = accumulator.items()
+            value = _field(doc, arg)
+            if op in ("$sum", "$avg"):
+                # Non-numeric values are ignored, as in MongoDB
+                number = value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+                out[name] = out.get(name, 0) + (number or 0)
+                seen[name] = seen.get(name, 0) + (number is not None)
+            elif op in ("$min", "$max"):
+                if value is not None and (name not in out or (value < out[name] if op == "$min" else value > out[name])):
+                    out[name] = value
+            else:
+                raise NotImplementedError(f"MockCollection does not support {op}")
+    for hashable, out in groups.items():
+        for name, accumulator in spec.items():
+            if name != "_id" and "$avg" in accumulator:
+                n = counts[hashable].get(name, 0)
+                out[name] = out[name] / n if n else None
+    return list(groups.values())
 
 class MockCursor:
     def __init__(self, data: List[Dict[str, Any]]):
@@ -7,6 +93,18 @@ class MockCursor:
         self._skip = 0
         self._limit = None
 
+    def sort(self, key, direction: int = 1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        # Apply the least significant key first; Python's sort is stable.
+        # Missing values sort first ascending, as in MongoDB.
+        for field, field_direction in reversed(keys):
+            self.data = sorted(
+                self.data,
+                key=lambda d: (d.get(field) is not None, d.get(field) if d.get(field) is not None else 0),
+                reverse=field_direction < 0
+            )
+        return self
+
     def skip(self, n: int):
         self._skip = n
         return self
@@ -30,54 +128,94 @@ class MockCollection:
 
     def find_one(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         id_val = query.get("_id")
-        if id_val and isinstance(id_val, ObjectId):
-            return self.data.get(str(id_val))
-        
+        if id_val is not None and not isinstance(id_val, dict):
+            item = self.data.get(str(id_val))
+            return item if item is not None and _matches(item, query) else None
+
         for item in self.data.values():
-            match = True
-            for k, v in query.items():
-                if item.get(k) != v:
-                    match = False
-                    break
-            if match:
+            if _matches(item, query):
                 return item
         return None
 
-    def find(self, query: Dict[str, Any] = None) -> MockCursor:
-        if not query:
-            return MockCursor(list(self.data.values()))
-        
-        results = []
-        for item in self.data.values():
-            match = True
-            for k, v in query.items():
-                if item.get(k) != v:
-                    match = False
-                    break
-            if match:
-                results.append(item)
+    def find(self, query: Dict[str, Any] = None, projection: Dict[str, Any] = None) -> MockCursor:
+        results = [item for item in self.data.values() if _matches(item, query)]
+        if projection:
+            results = [_project(item, projection) for item in results]
         return MockCursor(results)
 
+    def aggregate(self, pipeline: List[Dict[str, Any]]) -> MockCursor:
+        """Run the $match / $unwind / $group / $sort / $limit subset of an aggregation pipeline."""
+        docs = list(self.data.values())
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if _matches(d, arg)]
+            elif op == "$unwind":
+                path = arg if isinstance(arg, str) else arg["path"]
+                keep_empty = isinstance(arg, dict) and arg.get("preserveNullAndEmptyArrays", False)
+                unwound = []
+                for d in docs:
+                    value = _field(d, path)
+                    if isinstance(value, list) and value:
+                        unwound.extend({**d, path[1:]: item} for item in value)
+                    elif keep_empty or (value is not None and not isinstance(value, list)):
+                        unwound.append(d if not isinstance(value, list) else {k: v for k, v in d.items() if k != path[1:]})
+                docs = unwound
+            elif op == "$group":
+                docs = _group(docs, arg)
+            elif op == "$sort":
+                docs = MockCursor(docs).sort(list(arg.items())).data
+            elif op == "$limit":
+                docs = docs[:arg]
+            else:
+                raise NotImplementedError(f"MockCollection does not support {op}")
+        return MockCursor(docs)
+
+    def count_documents(self, query: Dict[str, Any] = None) -> int:
+        return sum(1 for item in self.data.values() if _matches(item, query))
+
     def insert_one(self, document: Dict[str, Any]):
         if "_id" not in document:
             document["_id"] = ObjectId()
+        elif str(document["_id"]) in self.data:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} _id: {document['_id']}")
         self.data[str(document["_id"])] = document
         return type('obj', (object,), {'inserted_id': document["_id"]})
 
-    def update_one(self, query: Dict[str, Any], update: Dict[str, Any]):
+    def insert_many(self, documents: List[Dict[str, Any]]):
+        ids = [self.insert_one(document).inserted_id for document in documents]
+        return type('obj', (object,), {'inserted_ids': ids})
+
+    def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
         doc = self.find_one(query)
-        if doc and "$set" in update:
-            doc.update(update["$set"])
-            return type('obj', (object,), {'modified_count': 1})
-        return type('obj', (object,), {'modified_count': 0})
+        modified = 1
+        if doc is None:
+            if not upsert:
+                return type('obj', (object,), {'modified_count': 0})
+            doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            doc.update(update.get("$setOnInsert", {}))
+            self.insert_one(doc)
+            modified = 0
+        doc.update(update.get("$set", {}))
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        return type('obj', (object,), {'modified_count': modified})
 
     def find_one_and_update(self, query: Dict[str, Any], update: Dict[str, Any], return_document=True):
         doc = self.find_one(query)
         if doc and "$set" in update:
+            before = dict(doc)
             doc.update(update["$set"])
-            return doc
+            # ReturnDocument.BEFORE is False, AFTER is True
+            return doc if return_document else before
         return None
 
+    def find_one_and_delete(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        doc = self.find_one(query)
+        if doc:
+            del self.data[str(doc["_id"])]
+        return doc
+
     def create_index(self, *args, **kwargs):
         pass
 
@@ -95,15 +233,7 @@ class MockCollection:
             return type('obj', (object,), {'deleted_count': count})
         
         # Simple query-based delete_many
-        to_delete = []
-        for k, v in self.data.items():
-            match = True
-            for qk, qv in query.items():
-                if v.get(qk) != qv:
-                    match = False
-                    break
-            if match:
-                to_delete.append(k)
+        to_delete = [k for k, v in self.data.items() if _matches(v, query)]
         
         for k in to_delete:
             del self.data[k]
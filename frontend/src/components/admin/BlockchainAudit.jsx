@@ -3,16 +3,18 @@ import API from '../../api';
 
 export default function BlockchainAudit() {
     const [logs, setLogs] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
         fetchAudit();
     }, []);
 
-    const fetchAudit = async () => {
+    const fetchAudit = async (cursor = null) => {
         try {
-            const res = await API.get('/api/admin/audit-trail');
-            setLogs(res.data);
+            const res = await API.get('/api/admin/audit-trail', { params: { cursor, limit: 50 } });
+            setLogs(prev => cursor ? [...prev, ...res.data.events] : res.data.events);
+            setNextCursor(res.data.next_cursor);
         } catch (e) {
             console.error(e);
         } finally {
@@ -30,23 +32,25 @@ export default function BlockchainAudit() {
             <div className="ap-card">
                 {logs.length === 0 ? <p>No blockchain records found.</p> : (
                     <div className="ap-audit-list">
-                        {logs.map((block, i) => (
-                            <div key={i} className="ap-audit-item">
+                        {logs.map((event) => (
+                            <div key={event.event_id} className="ap-audit-item">
                                 <div className="ap-audit-header">
-                                    <span className="ap-block-id">Block #{block.index}</span>
-                                    <span className="ap-timestamp">{new Date(block.timestamp).toLocaleString()}</span>
+                                    <span className="ap-block-id">Block #{event.block_index} · Event {event.event_id}</span>
+                                    <span className="ap-timestamp">{new Date(event.timestamp).toLocaleString()}</span>
                                 </div>
                                 <div className="ap-audit-data">
-                                    <pre>{JSON.stringify(block.data, null, 2)}</pre>
+                                    <pre>{JSON.stringify(event.data, null, 2)}</pre>
                                 </div>
                                 <div className="ap-audit-hash">
-                                    Hash: {block.hash}
-                                </div>
-                                <div className="ap-audit-prev-hash">
-                                    Prev Hash: {block.previous_hash}
+                                    Block Hash: {event.block_hash}
                                 </div>
                             </div>
                         ))}
+                        {nextCursor && (
+                            <button className="ap-action-btn" onClick={() => fetchAudit(nextCursor)}>
+                                Load more
+                            </button>
+                        )}
                     </div>
                 )}
             </div>
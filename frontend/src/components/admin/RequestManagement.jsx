@@ -40,7 +40,7 @@ export default function RequestManagement() {
     const fetchMatches = async (requestId) => {
         setMatchingLoading(true);
         try {
-            const res = await API.get(`/api/admin/requests/${requestId}/ai-matches`);
+            const res = await API.get(`/api/admin/requests/${requestId}/ai-matches`, { params: { explain: true } });
             setMatches(res.data);
         } catch (err) {
             console.error("Failed to fetch AI matches", err);
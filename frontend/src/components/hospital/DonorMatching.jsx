@@ -4,6 +4,10 @@ import API from '../../api';
 
 export default function DonorMatching({ requests, onRequestUpdate }) {
     const [processing, setProcessing] = useState(null);
+    // Explained matches (breakdown, donor location, recommendation) per request,
+    // fetched only when a request is expanded; the list itself stays compact
+    const [details, setDetails] = useState({});
+    const [loadingDetails, setLoadingDetails] = useState(null);
 
     // Filter requests that have matches and are not fulfilled
     const matchedRequests = requests.filter(r => r.status !== 'fulfilled' && r.matches && r.matches.length > 0);
@@ -24,6 +28,26 @@ export default function DonorMatching({ requests, onRequestUpdate }) {
         }
     };
 
+    const toggleDetails = async (requestId) => {
+        if (details[requestId]) {
+            setDetails(prev => {
+                const next = { ...prev };
+                delete next[requestId];
+                return next;
+            });
+            return;
+        }
+        setLoadingDetails(requestId);
+        try {
+            const res = await API.get(`/api/requests/${requestId}/matches`, { params: { explain: true } });
+            setDetails(prev => ({ ...prev, [requestId]: res.data }));
+        } catch (err) {
+            console.error("Failed to load match details", err);
+        } finally {
+            setLoadingDetails(null);
+        }
+    };
+
     const handleReject = async (requestId, matchIndex) => {
         // In a real app, this would call an API to "hide" or "reject" this specific match.
         // For now, since there is no API for rejecting a match in the provided docs, 
@@ -61,8 +85,18 @@ export default function DonorMatching({ requests, onRequestUpdate }) {
                                         Patient: {req.patient_name} • Urgency: {req.urgency}
                                     </div>
                                 </div>
-                                <div className="hp-badge hp-badge-info">
-                                    {req.matches.length} Candidates Found
+                                <div style={{ display: 'flex', alignItems: 'center', gap: '0.75rem' }}>
+                                    <div className="hp-badge hp-badge-info">
+                                        {req.matches.length} Candidates Found
+                                    </div>
+                                    <button
+                                        className="hp-btn hp-btn-outline"
+                                        style={{ padding: '0.4rem 0.8rem', fontSize: '0.85rem' }}
+                                        onClick={() => toggleDetails(req.id || req._id)}
+                                        disabled={loadingDetails === (req.id || req._id)}
+                                    >
+                                        {loadingDetails === (req.id || req._id) ? 'Loading...' : details[req.id || req._id] ? 'Hide Details' : 'Show Details'}
+                                    </button>
                                 </div>
                             </div>
 
@@ -79,7 +113,7 @@ export default function DonorMatching({ requests, onRequestUpdate }) {
                                         </tr>
                                     </thead>
                                     <tbody>
-                                        {req.matches.map((match, idx) => (
+                                        {(details[req.id || req._id] || req.matches).map((match, idx) => (
                                             <tr key={idx}>
                                                 <td>
                                                     <div style={{ fontWeight: 600 }}>#{match.donor_id ? match.donor_id.slice(-6) : '????'}</div>
@@ -103,6 +137,11 @@ export default function DonorMatching({ requests, onRequestUpdate }) {
                                                             {(match.match_score * 100).toFixed(0)}%
                                                         </span>
                                                     </div>
+                                                    {match.recommendation && (
+                                                        <div style={{ fontSize: '0.75rem', color: 'var(--hp-text-muted)', marginTop: '0.25rem' }}>
+                                                            {match.recommendation}
+                                                        </div>
+                                                    )}
                                                 </td>
                                                 <td>
                                                     {match.location || 'Unknown'}